@@ -33,60 +33,53 @@ class ExplanationAgent:
     def run(self, state: AgentState) -> AgentState:
         print("\n--- Explanation Agent Started (Rich Content Mode) ---")
         
-        sol = state.get("solution_output")
+        frame = state.get("solution_frame")
         params = state.get("params") 
 
-        if not sol or not params:
+        if frame is None or not params:
             state["explanation"] = "데이터 부족."
             return state
 
         try:
             # 1. 비용 데이터 분해
-            total_cost_final = sol.get("Total_Cost", 0)
-            fixed_base_cost = params.base_rate if params.base_rate else 0
-            variable_cost = total_cost_final - fixed_base_cost
+            total_cost_final = frame.total_cost
+            fixed_base_cost = frame.base_rate
+            variable_cost = frame.variable_cost
             
-            gen_names = list(params.generators.keys())
-            ess_names = list(params.ess.keys()) if params.ess else []
-            T = params.time_steps
+            gen_names = frame.gen_names
+            ess_names = frame.ess_names
             
-            # 2. TOU(시간대별) 상세 분석
-            prices = params.grid_price_profile if params.grid_price_profile else [0]*T
-            unique_prices = sorted(list(set(prices)))
+            # 2. TOU(시간대별) 상세 분석: 가격 수준별로 묶어 한 번에 합산
+            prices = frame['grid_price']
+            unique_prices, group = np.unique(prices, return_inverse=True)
             
-            tou_map = {} 
+            labels = ['Flat'] * len(unique_prices)
             if len(unique_prices) >= 3:
-                tou_map[unique_prices[0]] = 'Light (경부하)'
-                tou_map[unique_prices[-1]] = 'Peak (최대부하)'
-                for p in unique_prices[1:-1]: tou_map[p] = 'Mid (중간부하)'
+                labels = ['Mid (중간부하)'] * len(unique_prices)
+                labels[0], labels[-1] = 'Light (경부하)', 'Peak (최대부하)'
             elif len(unique_prices) == 2:
-                tou_map[unique_prices[0]] = 'Light'
-                tou_map[unique_prices[-1]] = 'Peak'
-            else:
-                tou_map[unique_prices[0]] = 'Flat'
+                labels = ['Light', 'Peak']
             
+            p_grid = frame['P_grid']
+            p_gen_sum = frame.gen_matrix().sum(axis=0)
+            p_ess_dis = frame.ess_discharge_matrix().sum(axis=0)
+            
+            n_groups = len(unique_prices)
+            sums = {
+                'count': np.bincount(group, minlength=n_groups),
+                'grid': np.bincount(group, weights=p_grid, minlength=n_groups),
+                'gen': np.bincount(group, weights=p_gen_sum, minlength=n_groups),
+                'ess': np.bincount(group, weights=p_ess_dis, minlength=n_groups),
+            }
+            # 같은 라벨(Mid 등)에 여러 가격이 있으면 합치고, 대표 가격은 첫 가격
             tou_stats = {}
-            total_supply = 0
+            for i, label in enumerate(labels):
+                stat = tou_stats.setdefault(label, {'count': 0, 'grid': 0.0, 'gen': 0.0, 'ess': 0.0,
+                                                    'price': unique_prices[i]})
+                for key in ('count', 'grid', 'gen', 'ess'):
+                    stat[key] += sums[key][i]
             
-            for t in range(T):
-                p = prices[t]
-                label = tou_map.get(p, 'Unknown')
-                if label not in tou_stats:
-                    tou_stats[label] = {'count':0, 'grid':0, 'gen':0, 'ess':0, 'price':p}
-                
-                row = sol.get(t, {})
-                if not row: continue
-                
-                p_grid = row.get('P_grid', 0)
-                p_gen_sum = sum(row.get(f'P_{g}', 0) for g in gen_names)
-                p_ess_dis = sum(row.get(f'P_dis_{e}', 0) for e in ess_names)
-                
-                tou_stats[label]['count'] += 1
-                tou_stats[label]['grid'] += p_grid
-                tou_stats[label]['gen'] += p_gen_sum
-                tou_stats[label]['ess'] += p_ess_dis
-                
-                total_supply += (p_grid + row.get('P_PV', 0) + p_gen_sum + p_ess_dis)
+            total_supply = float((p_grid + frame['P_PV'] + p_gen_sum + p_ess_dis).sum())
 
             # 3. LLM 입력 데이터 생성
             tou_summary_str = ""
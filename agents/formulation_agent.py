@@ -7,10 +7,41 @@ import numpy as np
 from openai import OpenAI
 from state.base_state import AgentState
 from state.schemas import EDParams, GeneratorSpec, StorageSpec
+from core.pwl_cost import convex_hull_points, read_fuel_curve
 
 client = OpenAI()
 
+def _step_hours_months(timestamps, T: int):
+    """
+    step 별 (시, 월) 배열. 라벨 목록을 한 번에 파싱한다.
+    - "YYYY-MM-DD HH:MM": 각 step 의 시/월
+    - "HH:MM" 만 있거나 못 읽는 라벨: 시는 09:00 시작 15분 간격으로 가정, 월은 첫 라벨에서 찾거나 4월
+    """
+    fallback_h = (9 + np.arange(T) // 4) % 24
+    if not timestamps:
+        return fallback_h, np.full(T, 4)
+    labels = pd.Series(list(timestamps[:T]) + [""] * (T - len(timestamps[:T])), dtype=str)
+    hours = pd.to_numeric(labels.str.split(" ").str[-1].str.split(":").str[0], errors="coerce").to_numpy()
+    hours = np.where(np.isnan(hours), fallback_h, hours).astype(int)
+
+    first_month = 4
+    try:
+        t_str = labels[0]
+        if "-" in t_str: first_month = int(t_str.split("-")[1])
+        elif "/" in t_str: first_month = int(t_str.split("/")[0])
+    except (ValueError, IndexError): pass
+    months = pd.to_numeric(labels.str.extract(r"^\d{4}-(\d{1,2})-", expand=False), errors="coerce").to_numpy()
+    months = np.where(np.isnan(months), first_month, months).astype(int)
+    return hours, months
+
+
 class FormulationAgent:
+    def __init__(self, gt_cost_mode: str = "quadratic"):
+        # gt_cost_mode: "quadratic" (polyfit 2차, QP) | "pwl" (gtfuel.csv breakpoint 볼록 PWL, LP)
+        if gt_cost_mode not in ("quadratic", "pwl"):
+            raise ValueError(f"Unknown gt_cost_mode: {gt_cost_mode}")
+        self.gt_cost_mode = gt_cost_mode
+
     def run(self, state: AgentState) -> AgentState:
         print("\n--- Formulation Agent Started (Fixed Base Cost Applied) ---")
         
@@ -33,34 +64,29 @@ class FormulationAgent:
         # [Step 1] GT 비용 함수 (KRW/15min)
         # =========================================================
         gt_coeffs = {"a": 0.0, "b": 0.0, "c": 0.0}
+        gt_pwl_points = None
         target_file = "gtfuel.csv"
         EXCHANGE_RATE = 1300.0 
         
         if os.path.exists(target_file):
             print(f">> [System] '{target_file}' 분석 중...")
             try:
-                df = pd.read_csv(target_file)
-                df.columns = [c.lower().strip().replace(" ", "_") for c in df.columns]
-                
-                pow_col = next((c for c in df.columns if 'power' in c and 'mw' in c), None)
-                cost_col = next((c for c in df.columns if 'cost' in c and 'sec' in c), None)
-
-                if pow_col and cost_col:
-                    X_power = pd.to_numeric(df[pow_col], errors='coerce')
-                    Y_cost_sec = pd.to_numeric(df[cost_col], errors='coerce')
-                    valid_mask = X_power.notnull() & Y_cost_sec.notnull()
-                    
-                    if valid_mask.any():
-                        X_power = X_power[valid_mask]
-                        Y_cost_sec = Y_cost_sec[valid_mask]
-                        # $/sec -> KRW/15min
-                        Y_cost_KRW_15min = Y_cost_sec * EXCHANGE_RATE * 900.0
-                        
-                        coeffs = np.polyfit(X_power, Y_cost_KRW_15min, 2)
-                        gt_coeffs["a"] = float(coeffs[0])
-                        gt_coeffs["b"] = float(coeffs[1])
-                        gt_coeffs["c"] = float(coeffs[2])
-                        print(f"   >> GT Cost (KRW/15min): {gt_coeffs['a']:.2f}P^2 + {gt_coeffs['b']:.0f}P + {gt_coeffs['c']:.0f}")
+                # $/sec -> KRW/15min
+                fuel_points = read_fuel_curve(target_file, exchange_rate=EXCHANGE_RATE, step_seconds=900.0)
+                if fuel_points:
+                    X_power = np.array([p for p, _ in fuel_points])
+                    Y_cost_KRW_15min = np.array([c for _, c in fuel_points])
+
+                    coeffs = np.polyfit(X_power, Y_cost_KRW_15min, 2)
+                    gt_coeffs["a"] = float(coeffs[0])
+                    gt_coeffs["b"] = float(coeffs[1])
+                    gt_coeffs["c"] = float(coeffs[2])
+                    print(f"   >> GT Cost (KRW/15min): {gt_coeffs['a']:.2f}P^2 + {gt_coeffs['b']:.0f}P + {gt_coeffs['c']:.0f}")
+
+                    if self.gt_cost_mode == "pwl":
+                        # 측정점을 그대로 breakpoint 로 사용 (볼록하지 않은 점은 하부 볼록 껍질로 정리)
+                        gt_pwl_points = convex_hull_points(fuel_points)
+                        print(f"   >> GT Cost mode: PWL ({len(gt_pwl_points)} breakpoints, LP)")
             except Exception as e:
                 print(f"   >> [Error] CSV Read Failed: {e}")
 
@@ -94,8 +120,10 @@ class FormulationAgent:
             g_type = conf.get("type", "Gen")
             count = int(conf.get("count", 1))
             
+            pwl_points = None
             if g_type == "GT":
                 base_a, base_b, base_c = gt_coeffs["a"], gt_coeffs["b"], gt_coeffs["c"]
+                pwl_points = gt_pwl_points
                 ramp = 50.0
             elif g_type == "SMR":
                 base_a, base_b, base_c = 0.0, 2500.0, 0.0 
@@ -108,9 +136,11 @@ class FormulationAgent:
                 name = f"{g_type}{i}"
                 penalty = (i - 1) * 10.0 
                 final_b = base_b + penalty
+                # PWL 모드에서도 같은 우선순위 penalty 를 선형항으로 더한다
+                final_pwl = [(p, c + penalty * p) for p, c in pwl_points] if pwl_points else None
                 
                 generators[name] = GeneratorSpec(
-                    name=name, a=base_a, b=final_b, c=base_c, cost_coeff=0.0,
+                    name=name, a=base_a, b=final_b, c=base_c, cost_coeff=0.0, pwl_points=final_pwl,
                     p_min=float(conf.get("p_min", 0)),
                     p_max=float(conf.get("p_max", 100)),
                     ramp_rate=float(conf.get("ramp_rate", ramp))
@@ -128,47 +158,30 @@ class FormulationAgent:
         # =========================================================
         # [Step 4] KEPCO TOU & Base Cost
         # =========================================================
-        current_month = 4
-        if timestamps:
-            try:
-                t_str = timestamps[0]
-                if "-" in t_str: current_month = int(t_str.split("-")[1])
-                elif "/" in t_str: current_month = int(t_str.split("/")[0])
-                print(f"   >> [System] Detected Month: {current_month}")
-            except: pass
-            
         SUMMER = {"light": 120000.0, "mid": 190000.0, "peak": 350000.0}
         SPRING = {"light": 120000.0, "mid": 140000.0, "peak": 280000.0}
         WINTER = {"light": 125000.0, "mid": 180000.0, "peak": 320000.0}
 
-        if current_month in [6, 7, 8]:
-            mode, rates_mwh = "SUMMER", SUMMER
-        elif current_month in [11, 12, 1, 2]:
-            mode, rates_mwh = "WINTER", WINTER
-        else:
-            mode, rates_mwh = "SPRING_FALL", SPRING
-        
+        hours, months = _step_hours_months(timestamps, T)
+        if timestamps:
+            print(f"   >> [System] Detected Month: {months[0]}")
+
+        # step 별 계절 (여러 날 구간이 계절 경계를 넘어도 step 마다 맞는 요금)
+        season = np.select([np.isin(months, [6, 7, 8]), np.isin(months, [11, 12, 1, 2])],
+                           [0, 2], default=1)                      # 0: SUMMER, 1: SPRING_FALL, 2: WINTER
+        mode = ("SUMMER", "SPRING_FALL", "WINTER")[int(season[0])]
+        rates_mwh = (SUMMER, SPRING, WINTER)[int(season[0])]
         rates_15min = {k: v / 4.0 for k, v in rates_mwh.items()}
         print(f"   >> [System] Season: {mode} (Peak: {rates_15min['peak']:.0f} KRW/15min)")
 
-        grid_price_profile = []
-        for i in range(T):
-            h = 0
-            if timestamps:
-                try: h = int(timestamps[i].split(" ")[-1].split(":")[0])
-                except: h = (9 + int(i/4)) % 24
-            else: h = (9 + int(i/4)) % 24
-
-            if h >= 23 or h < 9:
-                price = rates_15min["light"]
-            else:
-                if mode == "WINTER":
-                    if (10 <= h < 12) or (17 <= h < 20) or (22 <= h < 23): price = rates_15min["peak"]
-                    else: price = rates_15min["mid"]
-                else:
-                    if (10 <=  h < 17): price = rates_15min["peak"]
-                    else: price = rates_15min["mid"]
-            grid_price_profile.append(price)
+        # 시간대 등급 0: light / 1: mid / 2: peak
+        h = hours
+        winter_peak = ((10 <= h) & (h < 12)) | ((17 <= h) & (h < 20)) | ((22 <= h) & (h < 23))
+        other_peak = (10 <= h) & (h < 17)
+        level = np.where((h >= 23) | (h < 9), 0,
+                         np.where(np.where(season == 2, winter_peak, other_peak), 2, 1))
+        rate_table = np.array([[r["light"], r["mid"], r["peak"]] for r in (SUMMER, SPRING, WINTER)]) / 4.0
+        grid_price_profile = rate_table[season, level].tolist()
 
         # [핵심 수정] 요청하신 고정 기본요금 반영
         FIXED_BASE_COST = 107866666.0
@@ -1,16 +1,27 @@
 # agents/parsing_agent.py
 
-import pandas as pd
 import os
 from state.base_state import AgentState
+from utils.profile_reader import ProfileReader, ProfileSource
+from utils.pv_profile import read_pv_year_profile
+
+# ===== 설정 =====
+LOAD_PATH = "datacenter_load/dc_profile_15min_ED.csv"
+PV_CSV_PATH = "datacenter_load/pv_profile_15min_ED.csv"
+
+# PV 소스: 연간 PV 엑셀 (365일 × 24h p.u.) → read_pv_year_profile 의 15분 MW 연간 캐시를 구간만 잘라 쓴다
+# 엑셀이 없으면 PV_CSV_PATH 사용. kwargs 를 datacenter_load/pv_15min_profile.py 설정과 같게 두면 같은 캐시 항목을 공유
+PV_YEAR_XLSX = "datacenter_load/한국남부_남제주소내태양광_2020.xlsx"
+PV_YEAR_KWARGS = dict(start="2021-01-01", p_rated_mw=100.0, step_min=15, method="ffill", shift_hours=0)
+# ================
 
 class ParsingAgent:
     def run(self, state: AgentState) -> AgentState:
         print("\n--- Parsing Agent Started (Syncing Data) ---")
         
         # 파일 경로
-        load_path = "datacenter_load/dc_profile_15min_ED.csv"
-        pv_path = "datacenter_load/pv_profile_15min_ED.csv"
+        load_path = LOAD_PATH
+        pv_path = PV_YEAR_XLSX if os.path.exists(PV_YEAR_XLSX) else PV_CSV_PATH
         
         try:
             # 1. Load 읽기
@@ -18,52 +29,39 @@ class ParsingAgent:
                 print(f"[Error] Files not found.")
                 return state
                 
-            df_load = pd.read_csv(load_path)
-            df_pv = pd.read_csv(pv_path)
-            
-            # 2. 시간 컬럼 찾기 & 통일
-            t_col_load = [c for c in df_load.columns if 'time' in c.lower() or 'kst' in c.lower()][0]
-            t_col_pv = [c for c in df_pv.columns if 'time' in c.lower() or 'kst' in c.lower()][0]
-            
-            df_load.rename(columns={t_col_load: 'timestamp'}, inplace=True)
-            df_pv.rename(columns={t_col_pv: 'timestamp'}, inplace=True)
-            
-            df_load['timestamp'] = pd.to_datetime(df_load['timestamp'])
-            df_pv['timestamp'] = pd.to_datetime(df_pv['timestamp'])
-            
-            # 3. 데이터 컬럼 찾기
-            val_col_load = [c for c in df_load.columns if 'power' in c.lower() or 'load' in c.lower()][0]
-            val_col_pv = [c for c in df_pv.columns if 'pv' in c.lower()][0]
-            
-            # 4. [핵심] 시간 동기화 (Inner Merge)
-            # 09:00 Load와 09:00 PV를 정확히 매칭
-            df_merged = pd.merge(
-                df_load[['timestamp', val_col_load]], 
-                df_pv[['timestamp', val_col_pv]], 
-                on='timestamp', 
-                how='inner'
-            )
-            df_merged.sort_values('timestamp', inplace=True)
-            
-            # 24시간 제한
-            if len(df_merged) > 96:
-                df_merged = df_merged.iloc[:96]
-                
-            print(f">> Data synced! Start: {df_merged['timestamp'].iloc[0]}, Count: {len(df_merged)}")
+            # 파싱은 처음 한 번만: 이후에는 .npy 캐시를 memmap (원본이 바뀌면 자동 재변환)
+            pv_source = ProfileSource(pv_path, read_pv_year_profile, PV_YEAR_KWARGS) if pv_path == PV_YEAR_XLSX else pv_path
+            reader = ProfileReader(load_path, pv_source)
             
-            # 5. Net Load 계산
-            demand_raw = df_merged[val_col_load].tolist()
-            pv_raw = df_merged[val_col_pv].tolist()
+            # 2. 급전 구간 [start, end): 지정이 없으면 공통 데이터 시작부터 horizon_hours (기본 24시간)
+            # 3. [핵심] 시간 동기화: 구간만 이진 탐색으로 잘라 부하 해상도 격자에 맞춤
+            # 09:00 Load와 09:00 PV를 매칭 (해상도가 달라도 정렬, 빈 구간은 보고 후 앞뒤만 잘라냄)
+            window = reader.read_window(state.get("window_start"), state.get("window_end"),
+                                        hours=state.get("horizon_hours"))
+            if window.missing:
+                window.report()
+                try:
+                    trimmed = window.trim()
+                except ValueError as e:
+                    # 중간 빈 구간은 잘라 붙이면 ramp/SOC 가 끊긴 시각을 이어 버린다 → 급전하지 않음
+                    print(f"[Error] {e}")
+                    state["parsed_data"] = None
+                    return state
+                print(f"   >> [Align] {len(window) - len(trimmed)} steps with missing data trimmed at the window edges")
+                window = trimmed
+            if len(window) == 0:
+                print(f"[Error] No synced data in the requested window.")
+                state["parsed_data"] = None
+                return state
             
-            net_demand = []
-            for d, p in zip(demand_raw, pv_raw):
-                net_demand.append(max(d - p, 0.0))
+            times = window.timestamps()
+            print(f">> Data synced! Start: {times[0]}, Count: {len(window)}")
             
-            # 6. 결과 저장
+            # 4. Net Load 계산 & 결과 저장
             state["parsed_data"] = {
-                "net_demand_profile": net_demand,
-                "pv_profile": pv_raw,
-                "timestamps": df_merged['timestamp'].dt.strftime('%H:%M').tolist()
+                "net_demand_profile": window.net_demand.tolist(),
+                "pv_profile": window.pv.tolist(),
+                "timestamps": window.labels()
             }
             
         except Exception as e:
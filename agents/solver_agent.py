@@ -1,7 +1,8 @@
 # agents/solver_agent.py
 
 from state.base_state import AgentState
-from core.dynamic_solver import solve_dynamic_ed
+from state.solution_frame import SolutionFrame
+from core.solution_cache import cached_solve_dynamic_ed
 
 class SolverAgent:
     def run(self, state: AgentState) -> AgentState:
@@ -14,47 +15,13 @@ class SolverAgent:
 
         try:
             print(f">>> Solving Dynamic ED for {len(params.generators)} gens...")
-            sol = solve_dynamic_ed(params)
+            # 같은 입력(EDParams)은 디스크 캐시에서 바로 반환
+            sol = cached_solve_dynamic_ed(params, duals=True)
             
             state["solution"] = sol
             
-            # 결과 변환 (Dict)
-            output_dict = {}
-            output_dict['Total_Cost'] = sol.cost
-            
-            # 동적 키 생성
-            gen_names = list(params.generators.keys())
-            ess_names = list(params.ess.keys()) if params.ess else []
-
-            for t in range(params.time_steps):
-                row = {}
-                row['P_grid'] = sol.schedule.get('P_grid', [0]*params.time_steps)[t]
-                
-                # 발전기
-                for g in gen_names:
-                    key = f'P_{g}'
-                    if key in sol.schedule:
-                        row[key] = sol.schedule[key][t]
-                    else:
-                        row[key] = 0.0
-                
-                # ESS
-                if sol.ess_schedule:
-                    for e in ess_names:
-                        if e in sol.ess_schedule:
-                            row[f'P_dis_{e}'] = sol.ess_schedule[e]['discharge'][t]
-                            row[f'P_chg_{e}'] = sol.ess_schedule[e]['charge'][t]
-                            row[f'SOC_{e}'] = sol.ess_schedule[e]['soc'][t]
-                
-                # PV
-                if params.pv_profile:
-                    row['P_PV'] = params.pv_profile[t]
-                else:
-                    row['P_PV'] = 0.0
-                
-                output_dict[t] = row
-            
-            state["solution_output"] = output_dict
+            # 결과 변환 (열 단위 frame, 배열 복사 없음)
+            state["solution_frame"] = SolutionFrame.from_solution(sol, params)
             print(f"Optimization completed. Cost: {sol.cost:,.0f} KRW")
 
         except Exception as e:
@@ -62,5 +29,6 @@ class SolverAgent:
             import traceback
             traceback.print_exc()
             state["solution"] = None
+            state["solution_frame"] = None
 
         return state
\ No newline at end of file
@@ -1,79 +1,97 @@
 # core/analytic_solver.py
 
-from state.schemas import EDParams, EDSolution
-
-def analytic_solve_two_gen(params: EDParams) -> EDSolution:
-    g1 = params.generators["G1"]
-    g2 = params.generators["G2"]
-    D = params.demand
-
-    a1, b1, c1 = g1.a, g1.b, g1.c
-    a2, b2, c2 = g2.a, g2.b, g2.c
-
-    # 1) 등식 제약 P2 = D - P1 사용해서 F(P1)를 2차식으로 만들고 미분 → 무제약 최적 P1*
-    A = a1 + a2
-    B = b1 - 2 * a2 * D - b2
-    P1_star = -B / (2 * A)
-
-    # 2) 발전기 출력 bounds 적용
-    P1 = min(max(P1_star, g1.p_min), g1.p_max)
-    P2 = D - P1
-
-    # 3) 비용 계산
-    F1 = a1 * P1**2 + b1 * P1 + c1
-    F2 = a2 * P2**2 + b2 * P2 + c2
-    cost = F1 + F2
-
-    # 4) 한계비용(MC) 계산
-    MC1 = 2 * a1 * P1 + b1
-    MC2 = 2 * a2 * P2 + b2
-
-    # 5) λ (system marginal cost) 추정
-    #    - bounds에 걸려있지 않은 발전기의 MC를 λ로 사용
-    #    - 둘 다 interior면 두 MC의 평균
-    #    - 둘 다 bound면 None (정의 애매)
-    interior_mcs = []
-
-    def is_interior(P, g):
-        return (P > g.p_min + 1e-6) and (P < g.p_max - 1e-6)
-
-    if is_interior(P1, g1):
-        interior_mcs.append(MC1)
-    if is_interior(P2, g2):
-        interior_mcs.append(MC2)
-
-    if len(interior_mcs) == 1:
-        lambda_val = interior_mcs[0]
-    elif len(interior_mcs) == 2:
-        lambda_val = sum(interior_mcs) / 2.0
-    else:
-        lambda_val = None  # 둘 다 bound에 걸린 경우 등
-
-    # 6) 수요 제약 체크: (P1+P2) - D (0에 가까우면 OK)
-    balance_violation = (P1 + P2) - D
-
-    # 7) 출력 제약 slack 계산
-    slacks = {
-        "G1": {
-            "lower": P1 - g1.p_min,
-            "upper": g1.p_max - P1,
-        },
-        "G2": {
-            "lower": P2 - g2.p_min,
-            "upper": g2.p_max - P2,
-        },
-    }
-
-    fuel_costs = {"G1": F1, "G2": F2}
-
-    note = "analytic optimum (with MC, lambda, slacks)"
-
-    return EDSolution(
-        Pg={"G1": P1, "G2": P2},
-        cost=cost,
-        note=note,
-        lambda_val=lambda_val,
-        fuel_costs=fuel_costs,
-        balance_violation=balance_violation,
-        slacks=slacks,
+from dataclasses import dataclass
+from typing import Dict, List
+
+import numpy as np
+
+from state.schemas import EDParams, EDSolution, GeneratorSpec
+
+
+@dataclass
+class LambdaDispatch:
+    gen_names: List[str]
+    P: np.ndarray           # (N, G) 발전기 출력 [MW]
+    lambda_val: np.ndarray  # (N,) 계통 한계비용 λ (모든 발전기가 bound 에 걸리면 NaN)
+    cost: np.ndarray        # (N,) 총 연료비
+    balance_violation: np.ndarray  # (N,) sum(P) - D (공급 가능 범위 밖 수요일 때만 0 이 아님)
+
+
+def _coeffs(generators: Dict[str, GeneratorSpec]):
+    names = list(generators.keys())
+    specs = [generators[g] for g in names]
+    a = np.array([s.a for s in specs], dtype=float)
+    # a, b 가 모두 0 이면 cost_coeff 를 선형 단가로 사용 (dynamic_solver 와 동일)
+    b = np.array([s.b if (s.a != 0 or s.b != 0) else s.cost_coeff for s in specs], dtype=float)
+    c = np.array([s.c if (s.a != 0 or s.b != 0) else 0.0 for s in specs], dtype=float)
+    p_min = np.array([s.p_min for s in specs], dtype=float)
+    p_max = np.array([s.p_max for s in specs], dtype=float)
+    return names, a, b, c, p_min, p_max
+
+
+def _output_at(lam: np.ndarray, a, b, p_min, p_max) -> np.ndarray:
+    # 등증분비용: 2a P + b = λ → P = (λ - b) / 2a, 출력 한계로 clip
+    # 선형 발전기(a=0)는 λ > b 이면 p_max, 아니면 p_min (계단)
+    lam = lam[:, None]
+    quad = a > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p_quad = (lam - b) / (2.0 * np.where(quad, a, 1.0))
+    p_lin = np.where(lam > b, p_max, p_min)
+    return np.clip(np.where(quad, p_quad, p_lin), p_min, p_max)
+
+
+def lambda_dispatch(generators: Dict[str, GeneratorSpec], demand,
+                    tol: float = 1e-6, max_iter: int = 200) -> LambdaDispatch:
+    """
+    N 대 2차 비용 발전기의 equal-incremental-cost 경제급전 (λ bisection).
+    demand 는 스칼라 또는 배열. 모든 수요 수준을 한 번에 벡터화해서 푼다.
+    """
+    names, a, b, c, p_min, p_max = _coeffs(generators)
+    D = np.atleast_1d(np.asarray(demand, dtype=float))
+
+    # 공급 가능 범위 밖 수요는 범위 안으로 잘라서 풀고 위반량으로 보고
+    D_eff = np.clip(D, p_min.sum(), p_max.sum())
+
+    # λ 탐색 구간: 모든 발전기 p_min 의 MC 아래 ~ p_max 의 MC 위
+    lo = np.full_like(D_eff, np.min(2 * a * p_min + b) - 1.0)
+    hi = np.full_like(D_eff, np.max(2 * a * p_max + b) + 1.0)
+
+    for _ in range(max_iter):
+        mid = 0.5 * (lo + hi)
+        short = _output_at(mid, a, b, p_min, p_max).sum(axis=1) < D_eff
+        lo = np.where(short, mid, lo)
+        hi = np.where(short, hi, mid)
+        if np.max(hi - lo) < tol:
+            break
+
+    # 구간 양 끝 출력 사이를 보간 → 선형 발전기의 계단(λ = b)에서 잔여분을 정확히 배분
+    P_lo = _output_at(lo, a, b, p_min, p_max)
+    P_hi = _output_at(hi, a, b, p_min, p_max)
+    tot_lo, tot_hi = P_lo.sum(axis=1), P_hi.sum(axis=1)
+    span = tot_hi - tot_lo
+    w = np.divide(D_eff - tot_lo, span, out=np.zeros_like(span), where=span > 1e-12)
+    P = P_lo + (P_hi - P_lo) * np.clip(w, 0.0, 1.0)[:, None]
+
+    lam = 0.5 * (lo + hi)
+    interior = (P > p_min + 1e-6) & (P < p_max - 1e-6)
+    linear_marginal = (a == 0) & (np.abs(lam[:, None] - b) <= max(tol, 1e-6) * 10)
+    defined = (interior | linear_marginal).any(axis=1)
+    lam = np.where(defined, lam, np.nan)
+
+    cost = (a * P**2 + b * P + c).sum(axis=1)
+    return LambdaDispatch(
+        gen_names=names, P=P, lambda_val=lam, cost=cost,
+        balance_violation=P.sum(axis=1) - D,
     )
+
+
+def analytic_solve(params: EDParams) -> EDSolution:
+    # 정적(시간 결합 없음) what-if: ramp / ESS / grid 를 무시하고 각 스텝 수요를 발전기만으로 급전
+    demand = params.demand_profile[:params.time_steps]
+    res = lambda_dispatch(params.generators, demand)
+
+    sol = EDSolution()
+    sol.cost = float(res.cost.sum()) + (params.base_rate if hasattr(params, 'base_rate') else 0.0)
+    sol.schedule = {f'P_{g}': res.P[:, i].copy() for i, g in enumerate(res.gen_names)}
+    sol.schedule['P_grid'] = -res.balance_violation
+    return sol
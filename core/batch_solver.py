@@ -0,0 +1,145 @@
+# core/batch_solver.py
+
+import multiprocessing as mp
+import os
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+
+from state.schemas import EDParams, EDSolution
+from core.dispatch_model import DispatchModel
+from core.dynamic_solver import model_structure
+
+# worker 프로세스 전역 상태 (initializer 에서 설정)
+_LICENSE = None
+_SOLVER = None
+_MODELS: "OrderedDict[tuple, DispatchModel]" = OrderedDict()
+_MAX_MODELS_PER_WORKER = 4
+
+
+@dataclass
+class ScenarioResult:
+    index: int
+    solution: Optional[EDSolution] = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+    worker_pid: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _fleet_key(params: EDParams) -> tuple:
+    # 모델 모양만 결정하는 값 (core/dynamic_solver.model_structure). 나머지 숫자는 DispatchModel.bind 로 교체
+    return model_structure(params)
+
+
+def _init_worker(license_sema, solver: Optional[str]):
+    global _LICENSE, _SOLVER
+    _LICENSE = license_sema
+    _SOLVER = solver
+
+
+def _get_model(params: EDParams) -> DispatchModel:
+    # 같은 구조면 worker 안에서 만든 DispatchModel 을 재사용 (Param 값만 교체)
+    key = _fleet_key(params)
+    model = _MODELS.get(key)
+    if model is None:
+        model = DispatchModel(params, solver=_SOLVER, tee=False)
+        _MODELS[key] = model
+        if len(_MODELS) > _MAX_MODELS_PER_WORKER:
+            _MODELS.popitem(last=False)
+    else:
+        _MODELS.move_to_end(key)
+    return model
+
+
+def _solve_one(index: int, params: EDParams) -> ScenarioResult:
+    t0 = time.perf_counter()
+    try:
+        model = _get_model(params)
+        # 프로파일·경계 조건 등 모든 값을 이 시나리오로 다시 채운다 (None 프로파일은 기본값 요금 200000, PV 0)
+        model.bind(params)
+        # 라이선스 동시 사용 개수 제한 (빌드는 병렬, solve 만 제한)
+        if _LICENSE is not None:
+            with _LICENSE:
+                sol = model.solve()
+        else:
+            sol = model.solve()
+        return ScenarioResult(index, sol, None, time.perf_counter() - t0, os.getpid())
+    except Exception as e:
+        # 실패한 모델은 상태가 애매하므로 버린다
+        _MODELS.pop(_fleet_key(params), None)
+        return ScenarioResult(index, None, f"{type(e).__name__}: {e}", time.perf_counter() - t0, os.getpid())
+
+
+def solve_many(params_iterable: Iterable[EDParams], workers: Optional[int] = None,
+               max_concurrent_solves: Optional[int] = None,
+               solver: Optional[str] = None) -> Iterator[ScenarioResult]:
+    """
+    여러 EDParams 시나리오를 프로세스 풀에서 병렬로 풀고, 끝나는 순서대로 ScenarioResult 를 yield.
+    - workers: 프로세스 수 (기본: CPU 수)
+    - max_concurrent_solves: 동시에 solve 중인 시나리오 수 상한 (솔버 라이선스 개수)
+    - 시나리오별 예외는 ScenarioResult.error 로 돌려주고 나머지는 계속 진행
+    - worker 프로세스가 죽으면 그때 돌던 시나리오를 새 풀에서 하나씩 다시 풀어, 다시 죽게 만든 것만 실패 처리
+    """
+    workers = workers or os.cpu_count() or 1
+    ctx = mp.get_context("spawn")
+    license_sema = ctx.BoundedSemaphore(max_concurrent_solves) if max_concurrent_solves else None
+
+    def new_pool():
+        return ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                   initializer=_init_worker, initargs=(license_sema, solver))
+
+    # 입력이 generator 여도 메모리가 커지지 않도록 in-flight 개수를 제한
+    max_in_flight = 2 * workers
+    scenarios = enumerate(params_iterable)
+    pending = {}      # future → (index, params, 단독 재시도 여부)
+    retry = deque()   # 풀이 깨질 때 돌던 시나리오: 하나씩 따로 다시 돌려 worker 를 죽인 것만 실패 처리
+    pool = new_pool()
+    try:
+        exhausted = False
+        while True:
+            if retry:
+                if not pending:
+                    index, params = retry.popleft()
+                    pending[pool.submit(_solve_one, index, params)] = (index, params, True)
+            else:
+                while not exhausted and len(pending) < max_in_flight:
+                    try:
+                        index, params = next(scenarios)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending[pool.submit(_solve_one, index, params)] = (index, params, False)
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            broken = False
+            for fut in done:
+                index, params, isolated = pending.pop(fut)
+                try:
+                    yield fut.result()
+                except BrokenProcessPool as e:
+                    broken = True
+                    if isolated:
+                        # 혼자 돌다가 worker 가 죽었으면 이 시나리오가 원인
+                        yield ScenarioResult(index, None, f"BrokenProcessPool: {e}")
+                    else:
+                        retry.append((index, params))
+
+            if broken:
+                # worker 가 죽으면 풀 전체가 망가지므로, 같이 돌던 작업은 새 풀에서 하나씩 다시 돌린다
+                retry.extend((index, params) for index, params, _ in pending.values())
+                retry = deque(sorted(retry, key=lambda item: item[0]))
+                pending.clear()
+                pool.shutdown(wait=False, cancel_futures=True)
+                pool = new_pool()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
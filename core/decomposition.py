@@ -0,0 +1,228 @@
+# core/decomposition.py
+
+import multiprocessing as mp
+import os
+import time
+import traceback
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pyomo.environ as pyo
+
+from state.schemas import EDParams, EDSolution
+from core.dynamic_solver import build_dynamic_ed_model, extract_solution
+from core.solver_interface import PersistentSolver, is_quadratic
+from core.rolling_horizon import window_params
+
+
+@dataclass
+class DecompositionReport:
+    n_blocks: int
+    block_len: int
+    iterations: int = 0
+    converged: bool = False
+    # 반복별 기록: primal residual(블록 경계 불일치), dual residual(consensus 변화량), rho, 비용
+    history: List[Dict[str, float]] = field(default_factory=list)
+    max_boundary_mismatch: float = 0.0
+    elapsed: float = 0.0
+
+
+class _BlockModel:
+    """
+    블록 하나의 ED 모델 + ADMM 항.
+    - in  경계: 앞 블록에서 넘어오는 SOC_init / P_gen_init (첫 블록 제외)
+    - out 경계: 다음 블록으로 넘기는 마지막 스텝 SOC / P_gen (마지막 블록 제외)
+    각 경계 변수 v 에 λ(v - z) + ρ/2 (v - z)^2 를 더하고, λ, z, ρ 는 mutable Param.
+    """
+
+    def __init__(self, params: EDParams, has_in: bool, has_out: bool, solver: Optional[str]):
+        self.gen_names = list(params.generators.keys())
+        self.ess_names = list(params.ess.keys()) if params.ess else []
+        self.base_rate = params.base_rate
+        m = build_dynamic_ed_model(params, free_initial_state=has_in)
+        last = params.time_steps - 1
+
+        in_vars, out_vars = [], []
+        if has_in:
+            in_vars = [m.SOC_init[e] for e in self.ess_names] + [m.P_gen_init[g] for g in self.gen_names]
+        if has_out:
+            out_vars = [m.SOC[e, last] for e in self.ess_names] + [m.P_gen[g, last] for g in self.gen_names]
+        self.in_vars, self.out_vars = in_vars, out_vars
+
+        m.admm_rho = pyo.Param(mutable=True, initialize=1.0)
+        m.admm_lam_in = pyo.Param(range(len(in_vars)), mutable=True, initialize=0.0)
+        m.admm_z_in = pyo.Param(range(len(in_vars)), mutable=True, initialize=0.0)
+        m.admm_lam_out = pyo.Param(range(len(out_vars)), mutable=True, initialize=0.0)
+        m.admm_z_out = pyo.Param(range(len(out_vars)), mutable=True, initialize=0.0)
+
+        penalty = 0
+        for i, v in enumerate(in_vars):
+            penalty += m.admm_lam_in[i] * (v - m.admm_z_in[i]) + m.admm_rho / 2 * (v - m.admm_z_in[i])**2
+        for i, v in enumerate(out_vars):
+            penalty += m.admm_lam_out[i] * (v - m.admm_z_out[i]) + m.admm_rho / 2 * (v - m.admm_z_out[i])**2
+
+        m.Obj.deactivate()
+        m.ADMM_Obj = pyo.Objective(expr=m.Obj.expr + penalty, sense=pyo.minimize)
+        self.m = m
+        # DispatchModel 과 같이: 가장 빠른 persistent backend, 라이선스/설치 문제면 다음 것으로
+        self.solver = PersistentSolver(is_quadratic(m), prefer=solver)
+
+    def solve(self, lam_in, z_in, lam_out, z_out, rho):
+        m = self.m
+        m.admm_rho = rho
+        m.admm_lam_in.store_values(dict(enumerate(lam_in)))
+        m.admm_z_in.store_values(dict(enumerate(z_in)))
+        m.admm_lam_out.store_values(dict(enumerate(lam_out)))
+        m.admm_z_out.store_values(dict(enumerate(z_out)))
+        self.solver.solve(m)
+        x_in = [pyo.value(v) for v in self.in_vars]
+        x_out = [pyo.value(v) for v in self.out_vars]
+        # 벌칙항을 뺀 원래 비용 (기본요금 제외)
+        return x_in, x_out, pyo.value(m.Obj) - self.base_rate
+
+    def solution(self) -> EDSolution:
+        return extract_solution(self.m, self.gen_names, self.ess_names)
+
+
+def _block_worker(conn, blocks, solver: Optional[str]):
+    # blocks: [(k, params, has_in, has_out)] - 이 프로세스가 끝까지 맡는 블록들 (모델 재사용)
+    try:
+        models = {k: _BlockModel(p, has_in, has_out, solver) for k, p, has_in, has_out in blocks}
+        conn.send(("ok", None))
+        while True:
+            cmd, payload = conn.recv()
+            if cmd == "solve":
+                conn.send(("ok", {k: models[k].solve(*args) for k, args in payload.items()}))
+            elif cmd == "result":
+                conn.send(("ok", {k: mdl.solution() for k, mdl in models.items()}))
+            else:
+                break
+    except Exception:
+        conn.send(("error", traceback.format_exc()))
+    finally:
+        conn.close()
+
+
+def _recv(conn):
+    status, payload = conn.recv()
+    if status == "error":
+        raise RuntimeError(f"Decomposition worker failed:\n{payload}")
+    return payload
+
+
+def solve_decomposed(params: EDParams, block_len: int = 96, workers: Optional[int] = None,
+                     rho: float = 1000.0, tol: float = 0.05, max_iter: int = 200,
+                     solver: Optional[str] = None) -> Tuple[EDSolution, DecompositionReport]:
+    """
+    다기간 ED 를 시간 블록(예: 하루 = 96 스텝)으로 나눠 병렬로 풀고,
+    블록 경계의 결합 제약(ESS SOC 연속, 발전기 ramp)을 consensus ADMM 가격으로 조정한다.
+    수렴 기준: 경계 불일치(primal)와 consensus 변화량(dual)이 모두 tol [MW, MWh] 이하.
+    """
+    t_start = time.perf_counter()
+    T = params.time_steps
+    bounds = [(s, min(s + block_len, T)) for s in range(0, T, block_len)]
+    K = len(bounds)
+    report = DecompositionReport(n_blocks=K, block_len=block_len)
+
+    soc0 = {e: s.initial_soc * s.capacity_mwh for e, s in (params.ess or {}).items()}
+    block_params = [window_params(params, s, e, soc0, params.initial_gen_output) for s, e in bounds]
+
+    # 경계 k (블록 k-1 의 끝 ↔ 블록 k 의 시작), k = 1..K-1
+    n_couple = len(params.ess or {}) + len(params.generators)
+    z = {k: np.zeros(n_couple) for k in range(1, K)}
+    lam_out = {k: np.zeros(n_couple) for k in range(1, K)}  # 블록 k-1 쪽
+    lam_in = {k: np.zeros(n_couple) for k in range(1, K)}   # 블록 k 쪽
+
+    # 블록을 연속 구간으로 묶어 worker 에 고정 배정 → 각 worker 가 자기 블록 모델을 계속 재사용
+    workers = max(1, min(workers or os.cpu_count() or 1, K))
+    assign = np.array_split(np.arange(K), workers)
+    ctx = mp.get_context("spawn")
+    procs, conns, owner = [], [], {}
+    for w, ks in enumerate(assign):
+        parent, child = ctx.Pipe()
+        blocks = [(int(k), block_params[k], k > 0, k < K - 1) for k in ks]
+        proc = ctx.Process(target=_block_worker, args=(child, blocks, solver), daemon=True)
+        proc.start()
+        procs.append(proc)
+        conns.append(parent)
+        for k in ks:
+            owner[int(k)] = w
+
+    try:
+        for conn in conns:
+            _recv(conn)
+
+        x_in, x_out, cost = {}, {}, {}
+        for it in range(1, max_iter + 1):
+            # 1) 블록별 병렬 solve (첫 반복은 벌칙 없이 독립적으로 풀어 z 초기값을 얻는다)
+            rho_it = rho if it > 1 else 0.0
+            payloads = [dict() for _ in conns]
+            for k in range(K):
+                args = (
+                    lam_in[k] if k > 0 else [], z[k] if k > 0 else [],
+                    lam_out[k + 1] if k < K - 1 else [], z[k + 1] if k < K - 1 else [],
+                    rho_it,
+                )
+                payloads[owner[k]][k] = args
+            for conn, payload in zip(conns, payloads):
+                conn.send(("solve", payload))
+            for conn in conns:
+                for k, (xi, xo, c) in _recv(conn).items():
+                    x_in[k], x_out[k], cost[k] = np.array(xi), np.array(xo), c
+
+            # 2) consensus / 가격 갱신
+            primal, dual = 0.0, 0.0
+            for k in range(1, K):
+                a, b = x_out[k - 1], x_in[k]
+                z_new = 0.5 * (a + b)
+                if rho_it > 0:
+                    z_new += (lam_out[k] + lam_in[k]) / (2.0 * rho_it)
+                    lam_out[k] = lam_out[k] + rho_it * (a - z_new)
+                    lam_in[k] = lam_in[k] + rho_it * (b - z_new)
+                primal = max(primal, float(np.max(np.abs(a - b), initial=0.0)))
+                dual = max(dual, float(np.max(np.abs(z_new - z[k]), initial=0.0)))
+                z[k] = z_new
+
+            total = sum(cost.values()) + params.base_rate
+            report.history.append({"iter": it, "primal": primal, "dual": dual, "rho": rho_it, "cost": total})
+            report.iterations = it
+            if it > 1 and primal <= tol and dual <= tol:
+                report.converged = True
+                break
+
+            # 3) residual balancing: 한쪽 residual 이 훨씬 크면 rho 조정 (λ 는 unscaled 라 그대로)
+            if primal > 10 * dual:
+                rho *= 2.0
+            elif dual > 10 * primal:
+                rho /= 2.0
+
+        for conn in conns:
+            conn.send(("result", None))
+        block_sols = {}
+        for conn in conns:
+            block_sols.update(_recv(conn))
+    finally:
+        for conn in conns:
+            try:
+                conn.send(("stop", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for proc in procs:
+            proc.join(timeout=10)
+
+    # 3. 블록 결과 이어붙이기
+    sol = EDSolution()
+    blocks = [block_sols[k] for k in range(K)]
+    sol.schedule = {key: np.concatenate([b.schedule[key] for b in blocks]) for key in blocks[0].schedule}
+    sol.ess_schedule = {
+        e: {key: np.concatenate([b.ess_schedule[e][key] for b in blocks]) for key in ('charge', 'discharge', 'soc')}
+        for e in (blocks[0].ess_schedule or {})
+    }
+    sol.cost = sum(cost.values()) + params.base_rate
+
+    report.max_boundary_mismatch = report.history[-1]["primal"] if report.history else 0.0
+    report.elapsed = time.perf_counter() - t_start
+    print(f">> [Decomposition] {K} blocks, {report.iterations} iters, "
+          f"converged={report.converged}, boundary mismatch={report.max_boundary_mismatch:.4f}")
+    return sol, report
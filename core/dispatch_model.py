@@ -0,0 +1,107 @@
+# core/dispatch_model.py
+
+import time
+from dataclasses import replace
+from typing import List, Optional
+
+from state.schemas import EDParams, EDSolution
+from core.dynamic_solver import build_dynamic_ed_model, extract_solution, model_structure
+from core.model_template import bind_params
+from core.solver_interface import DEFAULT_TIME_LIMIT, PersistentSolver, is_quadratic
+
+
+def _own_params(params: EDParams) -> EDParams:
+    # update/set_ess 가 호출자의 EDParams 를 건드리지 않도록 바뀌는 필드(프로파일, ESS dict)는 복사해 둔다
+    def copied(values):
+        return list(values) if values is not None else None
+    return replace(params, ess=dict(params.ess) if params.ess else None,
+                   demand_profile=copied(params.demand_profile), pv_profile=copied(params.pv_profile),
+                   grid_price_profile=copied(params.grid_price_profile))
+
+
+class DispatchModel:
+    """
+    같은 설비(fleet)를 반복 재급전할 때 쓰는 장기 보관용 모델.
+    demand / pv / grid price 만 mutable Param 으로 바꿔 끼우고,
+    persistent 솔버가 이전 해(basis)에서 바로 다시 푼다 (재빌드, 파일 I/O 없음).
+    """
+
+    def __init__(self, params: EDParams, solver: Optional[str] = None, tee: bool = False,
+                 time_limit: Optional[float] = DEFAULT_TIME_LIMIT):
+        self.params = _own_params(params)
+        self.gen_names = list(params.generators.keys())
+        self.ess_names = list(params.ess.keys()) if params.ess else []
+
+        t0 = time.perf_counter()
+        self.model = build_dynamic_ed_model(params, mutable=True)
+        self.build_time = time.perf_counter() - t0
+
+        # solver=None 이면 사용 가능한 persistent backend 중 가장 빠른 것, 실패(time_limit 초과 포함) 시 다음 것으로
+        self.solver = PersistentSolver(is_quadratic(self.model), prefer=solver, tee=tee, time_limit=time_limit)
+
+    def _set_profile(self, param, values: Optional[List[float]], name: str):
+        if values is None:
+            return
+        if len(values) != len(self.model.T):
+            raise ValueError(f"{name} length {len(values)} != time_steps {len(self.model.T)}")
+        param.store_values(dict(enumerate(values)))
+
+    def update(self, demand_profile: Optional[List[float]] = None,
+               pv_profile: Optional[List[float]] = None,
+               grid_price_profile: Optional[List[float]] = None):
+        self._set_profile(self.model.demand, demand_profile, "demand_profile")
+        self._set_profile(self.model.pv, pv_profile, "pv_profile")
+        self._set_profile(self.model.grid_price, grid_price_profile, "grid_price_profile")
+
+        if demand_profile is not None:
+            self.params.demand_profile = list(demand_profile)
+        if pv_profile is not None:
+            self.params.pv_profile = list(pv_profile)
+        if grid_price_profile is not None:
+            self.params.grid_price_profile = list(grid_price_profile)
+
+    def bind(self, params: EDParams):
+        # 같은 구조(model_structure)의 다른 시나리오로 교체: 프로파일뿐 아니라 설비 계수, 초기 출력/SOC,
+        # 마지막 목표까지 모든 Param 을 params 값으로 다시 채운다 (없는 프로파일은 기본값)
+        if model_structure(params) != model_structure(self.params):
+            raise ValueError("params has a different model structure; build a new DispatchModel")
+        bind_params(self.model, params)
+        self.params = _own_params(params)
+
+    def set_ess(self, name: str, capacity_mwh: Optional[float] = None,
+                max_power_mw: Optional[float] = None, efficiency: Optional[float] = None):
+        # ESS 규격만 교체 (SOC 한계/초기 SOC 는 capacity 비율이므로 같이 따라간다)
+        if name not in self.ess_names:
+            raise KeyError(f"Unknown ESS: {name}")
+        changes = {}
+        if capacity_mwh is not None:
+            self.model.ess_capacity[name] = capacity_mwh
+            changes["capacity_mwh"] = float(capacity_mwh)
+        if max_power_mw is not None:
+            self.model.ess_max_power[name] = max_power_mw
+            changes["max_power_mw"] = float(max_power_mw)
+        if efficiency is not None:
+            if not 0.0 < efficiency <= 1.0:
+                raise ValueError(f"efficiency must be in (0, 1], got {efficiency}")
+            self.model.ess_efficiency[name] = efficiency
+            changes["efficiency"] = float(efficiency)
+        ess = dict(self.params.ess)
+        ess[name] = replace(ess[name], **changes)
+        self.params.ess = ess
+
+    def solve(self, demand_profile: Optional[List[float]] = None,
+              pv_profile: Optional[List[float]] = None,
+              grid_price_profile: Optional[List[float]] = None) -> EDSolution:
+        self.update(demand_profile, pv_profile, grid_price_profile)
+
+        # 첫 solve 때만 솔버 모델을 만들고, 이후에는 auto_updates 가 바뀐 Param 만 전달
+        t0 = time.perf_counter()
+        res = self.solver.solve(self.model, load=False)
+
+        # 해는 Pyomo 변수로 옮기지 않고 솔버 열 벡터에서 한 번에 꺼낸다
+        sol = extract_solution(self.model, self.gen_names, self.ess_names, cost=res.incumbent_objective,
+                               solver=self.solver.solver, backend=self.solver.name)
+        sol.backend = self.solver.name
+        sol.status = str(res.termination_condition)
+        sol.solve_time = time.perf_counter() - t0
+        return sol
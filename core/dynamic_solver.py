@@ -1,108 +1,368 @@
 # core/dynamic_solver.py
 
+from typing import Optional
+
+import numpy as np
 import pyomo.environ as pyo
 from state.schemas import EDParams, EDSolution
+from core.matrix_model import build_dispatch_matrix, solve_dispatch_matrix
+from core.pwl_cost import pwl_segments
+from core.solver_interface import DEFAULT_TIME_LIMIT, load_primals, primal_values, solve_model, solver_columns
+from core.instrumentation import SolveTrace, pyomo_model_size
+
+def _gen_cost_kind(spec) -> str:
+    # 발전 비용 형태 (모델 구조를 바꾸므로 structure key 에 들어간다)
+    if spec.pwl_points:
+        return "pwl"
+    return "quadratic" if spec.a != 0 else "linear"
+
+
+def model_structure(params: EDParams) -> tuple:
+    """
+    모델의 '모양'만 결정하는 값: horizon, 발전기/ESS 이름, 발전기 비용 형태(PWL 선분 수),
+    초기 출력/마지막 목표가 걸린 자산 집합. 나머지 숫자는 모두 Param 이라 model_data 로 바꿔 끼운다.
+    """
+    gens = tuple(
+        (g, _gen_cost_kind(spec), len(pwl_segments(spec.pwl_points)[0]) if spec.pwl_points else 0)
+        for g, spec in params.generators.items()
+    )
+    ess = tuple(params.ess.keys()) if params.ess else ()
+    return (
+        params.time_steps, gens, ess,
+        tuple(g for g in params.generators if g in (params.initial_gen_output or {})),
+        tuple(e for e in ess if e in (params.terminal_soc or {})),
+        tuple(g for g in params.generators if g in (params.terminal_gen_output or {})),
+    )
+
+
+# grid_price_profile / pv_profile 이 없을 때 쓰는 값 (build_dynamic_ed_model, model_template.bind_params 공용)
+DEFAULT_GRID_PRICE = 200000.0
+DEFAULT_PV = 0.0
+
+
+def default_profiles(params: EDParams):
+    # (demand, pv, grid_price) 길이 time_steps. 없는 프로파일은 기본값으로 채운다
+    T = params.time_steps
+    grid_price = params.grid_price_profile if params.grid_price_profile else [DEFAULT_GRID_PRICE] * T
+    pv = params.pv_profile if params.pv_profile else [DEFAULT_PV] * T
+    return list(params.demand_profile[:T]), list(pv[:T]), list(grid_price[:T])
+
+
+def model_data(params: EDParams) -> dict:
+    # Param 이름 → 값 (스칼라 또는 {index: 값}). build_dynamic_ed_model 초기값과 core/model_template.bind_params 공용
+    T = params.time_steps
+    if len(params.demand_profile) < T:
+        raise ValueError(f"demand_profile length {len(params.demand_profile)} < time_steps {T}")
+    _, pv, grid_price = default_profiles(params)
+    gens = params.generators
+    ess = params.ess or {}
+    # 선형 비용: a,b 가 있으면 b·P + c, 없으면 cost_coeff·P (c 무시) - 기존 목적함수와 동일
+    has_poly = {g: spec.a != 0 or spec.b != 0 for g, spec in gens.items()}
 
-def solve_dynamic_ed(params: EDParams) -> EDSolution:
+    data = {
+        "demand": dict(enumerate(params.demand_profile[:T])),
+        "grid_price": dict(enumerate(grid_price[:T])),
+        "pv": dict(enumerate(pv[:T])),
+        "dt": params.dt_hours,
+        "base_rate": params.base_rate if hasattr(params, 'base_rate') else 0.0,
+        "gen_p_min": {g: spec.p_min for g, spec in gens.items()},
+        "gen_p_max": {g: spec.p_max for g, spec in gens.items()},
+        "gen_ramp": {g: spec.ramp_rate for g, spec in gens.items()},
+        "gen_a": {g: spec.a for g, spec in gens.items() if _gen_cost_kind(spec) == "quadratic"},
+        "gen_lin": {g: (spec.b if has_poly[g] else spec.cost_coeff or 0.0)
+                    for g, spec in gens.items() if not spec.pwl_points},
+        "gen_const": {g: (spec.c if has_poly[g] else 0.0) for g, spec in gens.items() if not spec.pwl_points},
+        "gen_init": {g: v for g, v in (params.initial_gen_output or {}).items() if g in gens},
+        "terminal_gen": {g: v for g, v in (params.terminal_gen_output or {}).items() if g in gens},
+        "pwl_slope": {}, "pwl_intercept": {},
+        "ess_capacity": {e: spec.capacity_mwh for e, spec in ess.items()},
+        "ess_max_power": {e: spec.max_power_mw for e, spec in ess.items()},
+        "ess_efficiency": {e: spec.efficiency for e, spec in ess.items()},
+        "ess_init_soc": {e: spec.initial_soc for e, spec in ess.items()},
+        "ess_min_soc": {e: spec.min_soc for e, spec in ess.items()},
+        "ess_max_soc": {e: spec.max_soc for e, spec in ess.items()},
+        "ess_aging": {e: spec.aging_cost for e, spec in ess.items()},
+        "terminal_soc": {e: v for e, v in (params.terminal_soc or {}).items() if e in ess},
+    }
+    for g, spec in gens.items():
+        if spec.pwl_points:
+            slopes, intercepts = pwl_segments(spec.pwl_points)
+            for k in range(len(slopes)):
+                data["pwl_slope"][g, k] = float(slopes[k])
+                data["pwl_intercept"][g, k] = float(intercepts[k])
+    return data
+
+
+def build_dynamic_ed_model(params: EDParams, mutable: bool = False,
+                           free_initial_state: bool = False) -> pyo.ConcreteModel:
+    # 모든 숫자 입력(프로파일, 요금, 설비 한계/비용, ESS 규격, 경계 조건)은 Param 으로 둔다.
+    # mutable=True 이면 재빌드 없이 값만 교체 가능 → DispatchModel, core/model_template.py
     m = pyo.ConcreteModel()
     T_len = params.time_steps
     m.T = pyo.RangeSet(0, T_len - 1)
-    
+    data = model_data(params)
+
+    def param(index, name):
+        values = data[name]
+        if index is None:
+            return pyo.Param(mutable=mutable, initialize=values)
+        return pyo.Param(index, mutable=mutable, initialize=lambda model, *i: values[i[0] if len(i) == 1 else i])
+
+    m.demand = param(m.T, "demand")
+    m.grid_price = param(m.T, "grid_price")
+    # PV 는 demand_profile(순부하)에 이미 반영되어 있음 → 결과 보고용으로만 보관
+    m.pv = param(m.T, "pv")
+    m.dt = param(None, "dt")
+    m.base_rate = param(None, "base_rate")
+
     gen_names = list(params.generators.keys())
     m.P_gen = pyo.Var(gen_names, m.T, domain=pyo.NonNegativeReals)
-    
+    m.gen_p_min = param(gen_names, "gen_p_min")
+    m.gen_p_max = param(gen_names, "gen_p_max")
+    m.gen_ramp = param(gen_names, "gen_ramp")
+    m.gen_a = param(list(data["gen_a"]), "gen_a")
+    m.gen_lin = param(list(data["gen_lin"]), "gen_lin")
+    m.gen_const = param(list(data["gen_const"]), "gen_const")
+
     ess_names = list(params.ess.keys()) if params.ess else []
     if ess_names:
         m.P_chg = pyo.Var(ess_names, m.T, domain=pyo.NonNegativeReals)
         m.P_dis = pyo.Var(ess_names, m.T, domain=pyo.NonNegativeReals)
         m.SOC = pyo.Var(ess_names, m.T, domain=pyo.NonNegativeReals)
 
+        # ESS 규격 (mutable=True 이면 용량/출력/효율만 바꿔 재급전 → core/ess_sizing.py)
+        m.ess_capacity = param(ess_names, "ess_capacity")
+        m.ess_max_power = param(ess_names, "ess_max_power")
+        m.ess_efficiency = param(ess_names, "ess_efficiency")
+        m.ess_init_soc = param(ess_names, "ess_init_soc")
+        m.ess_min_soc = param(ess_names, "ess_min_soc")
+        m.ess_max_soc = param(ess_names, "ess_max_soc")
+        m.ess_aging = param(ess_names, "ess_aging")
+
     m.P_grid_import = pyo.Var(m.T, domain=pyo.NonNegativeReals) 
     m.P_grid_export = pyo.Var(m.T, domain=pyo.NonNegativeReals)
 
+    # free_initial_state=True: t=0 직전 상태(발전기 출력, SOC)를 상수 대신 변수로 둔다
+    # (시간 분해에서 앞 블록과의 연결을 가격으로 조정할 때 사용 → core/decomposition.py)
+    if free_initial_state:
+        m.P_gen_init = pyo.Var(gen_names, bounds=lambda model, g: (
+            params.generators[g].p_min, params.generators[g].p_max))
+        if ess_names:
+            m.SOC_init = pyo.Var(ess_names, bounds=lambda model, e: (
+                params.ess[e].min_soc * params.ess[e].capacity_mwh,
+                params.ess[e].max_soc * params.ess[e].capacity_mwh))
+
     # Constraints
     def balance_rule(model, t):
         supply = model.P_grid_import[t] + sum(model.P_gen[g, t] for g in gen_names)
         if ess_names: supply += sum(model.P_dis[e, t] for e in ess_names)
-        demand = params.demand_profile[t] + model.P_grid_export[t]
+        demand = model.demand[t] + model.P_grid_export[t]
         if ess_names: demand += sum(model.P_chg[e, t] for e in ess_names)
         return supply == demand
     m.Balance = pyo.Constraint(m.T, rule=balance_rule)
 
     def gen_bounds_rule(model, g, t):
-        spec = params.generators[g]
-        return (spec.p_min, model.P_gen[g, t], spec.p_max)
+        return (model.gen_p_min[g], model.P_gen[g, t], model.gen_p_max[g])
     m.GenBounds = pyo.Constraint(gen_names, m.T, rule=gen_bounds_rule)
     
+    m.gen_init = param(list(data["gen_init"]), "gen_init")
     def ramp_rule(model, g, t):
-        if t == 0: return pyo.Constraint.Skip
-        spec = params.generators[g]
-        return (-spec.ramp_rate, model.P_gen[g, t] - model.P_gen[g, t-1], spec.ramp_rate)
+        ramp = model.gen_ramp[g]
+        if t == 0:
+            if free_initial_state:
+                return (-ramp, model.P_gen[g, t] - model.P_gen_init[g], ramp)
+            if g not in data["gen_init"]: return pyo.Constraint.Skip
+            return (model.gen_init[g] - ramp, model.P_gen[g, t], model.gen_init[g] + ramp)
+        return (-ramp, model.P_gen[g, t] - model.P_gen[g, t-1], ramp)
     m.Ramp = pyo.Constraint(gen_names, m.T, rule=ramp_rule)
     
     if ess_names:
-        dt = 0.25
         def soc_rule(model, e, t):
-            spec = params.ess[e]
-            prev = model.SOC[e, t-1] if t > 0 else spec.initial_soc * spec.capacity_mwh
-            return model.SOC[e, t] == prev + (model.P_chg[e, t]*spec.efficiency - model.P_dis[e, t]/spec.efficiency) * dt
+            if t > 0:
+                prev = model.SOC[e, t-1]
+            elif free_initial_state:
+                prev = model.SOC_init[e]
+            else:
+                prev = model.ess_init_soc[e] * model.ess_capacity[e]
+            eff = model.ess_efficiency[e]
+            return model.SOC[e, t] == prev + (model.P_chg[e, t]*eff - model.P_dis[e, t]/eff) * model.dt
         m.SOC_Dyn = pyo.Constraint(ess_names, m.T, rule=soc_rule)
         
         def soc_limit(model, e, t):
-            spec = params.ess[e]
-            return (spec.min_soc * spec.capacity_mwh, model.SOC[e, t], spec.max_soc * spec.capacity_mwh)
+            cap = model.ess_capacity[e]
+            return (model.ess_min_soc[e] * cap, model.SOC[e, t], model.ess_max_soc[e] * cap)
         m.SOC_Limit = pyo.Constraint(ess_names, m.T, rule=soc_limit)
         
         def ess_power_limit(model, e, t):
-            return model.P_chg[e, t] + model.P_dis[e, t] <= params.ess[e].max_power_mw
+            return model.P_chg[e, t] + model.P_dis[e, t] <= model.ess_max_power[e]
         m.ESS_Power = pyo.Constraint(ess_names, m.T, rule=ess_power_limit)
 
+    # 마지막 스텝 목표 (terminal_soc / terminal_gen_output 에 있는 자산만)
+    last = T_len - 1
+    if data["terminal_soc"]:
+        m.terminal_soc = param(list(data["terminal_soc"]), "terminal_soc")
+        m.Terminal_SOC = pyo.Constraint(list(data["terminal_soc"]),
+                                        rule=lambda model, e: model.SOC[e, last] == model.terminal_soc[e])
+    if data["terminal_gen"]:
+        m.terminal_gen = param(list(data["terminal_gen"]), "terminal_gen")
+        m.Terminal_Gen = pyo.Constraint(list(data["terminal_gen"]),
+                                        rule=lambda model, g: model.P_gen[g, last] == model.terminal_gen[g])
+
+    # PWL 비용 발전기: epigraph 변수 C_gen >= slope_k * P_gen + intercept_k (볼록이므로 LP 유지)
+    pwl_gens = [g for g in gen_names if params.generators[g].pwl_points]
+    if pwl_gens:
+        m.C_gen = pyo.Var(pwl_gens, m.T)
+        m.pwl_slope = param(list(data["pwl_slope"]), "pwl_slope")
+        m.pwl_intercept = param(list(data["pwl_intercept"]), "pwl_intercept")
+        def pwl_cost_rule(model, g, k, t):
+            return model.C_gen[g, t] >= model.pwl_slope[g, k] * model.P_gen[g, t] + model.pwl_intercept[g, k]
+        m.PWL_Cost = pyo.Constraint(list(data["pwl_slope"]), m.T, rule=pwl_cost_rule)
+
     # [핵심] Objective Function: 변동비 + 고정비(base_rate)
     def obj_rule(model):
         variable_cost = 0
         for t in model.T:
             # 1. 발전 비용
             for g in gen_names:
-                spec = params.generators[g]
                 p = model.P_gen[g, t]
-                if spec.a != 0 or spec.b != 0:
-                    variable_cost += spec.a * p**2 + spec.b * p + spec.c
-                elif spec.cost_coeff:
-                    variable_cost += p * spec.cost_coeff
+                if g in pwl_gens:
+                    variable_cost += model.C_gen[g, t]
+                    continue
+                if g in data["gen_a"]:
+                    variable_cost += model.gen_a[g] * p**2
+                variable_cost += model.gen_lin[g] * p + model.gen_const[g]
             
             # 2. 전력망 구입 비용
-            grid_price = params.grid_price_profile[t] if params.grid_price_profile else 200000.0
-            variable_cost += model.P_grid_import[t] * grid_price
+            variable_cost += model.P_grid_import[t] * model.grid_price[t]
             
             # 3. ESS 노화 비용
             if ess_names:
                 for e in ess_names:
-                    variable_cost += model.P_dis[e, t] * params.ess[e].aging_cost
+                    variable_cost += model.P_dis[e, t] * model.ess_aging[e]
         
         # [여기서 더함!] 기본요금 합산
-        total_cost = variable_cost + (params.base_rate if hasattr(params, 'base_rate') else 0.0)
-        return total_cost
+        return variable_cost + model.base_rate
     
     m.Obj = pyo.Objective(rule=obj_rule, sense=pyo.minimize)
-    
-    solver = pyo.SolverFactory('gurobi')
-    res = solver.solve(m, tee=True)
-    
+    return m
+
+def solve_dynamic_ed(params: EDParams, method: str = "rules", tee: bool = True,
+                     backend: Optional[str] = None, duals: bool = False,
+                     trace_path: Optional[str] = None, reuse_model: bool = True,
+                     time_limit: Optional[float] = DEFAULT_TIME_LIMIT) -> EDSolution:
+    # backend=None 이면 사용 가능한 가장 빠른 솔버를 자동 선택 (solution.backend 에 기록)
+    # method="matrix": NumPy 배열로 바로 행렬을 만들어 솔버에 전달 (장기 horizon용)
+    # duals=True: Balance / Ramp / SOC_Dyn 쌍대 변수 → sol.marginal_price, sol.duals (core/sensitivity.py)
+    # build / transfer / solve / extract 단계별 시간·메모리는 sol.trace, trace_path 가 있으면 JSON 으로도 저장
+    # reuse_model=False: 템플릿 캐시를 쓰지 않고 매번 새로 빌드
+    # time_limit: backend 하나당 최대 시간 [s]. 넘기면 다음 backend 로 (None 이면 제한 없음)
+    trace = SolveTrace()
+    if method == "matrix":
+        with trace.phase("build"):
+            mat = build_dispatch_matrix(params)
+        sol = solve_dispatch_matrix(mat, solver=backend, tee=tee, duals=duals, trace=trace, time_limit=time_limit)
+    else:
+        from core.model_template import get_template_entry
+        with trace.phase("build"):
+            # 같은 fleet 구조는 한 번 컴파일한 템플릿에 값만 바인딩하고, 템플릿에 붙은 persistent 솔버를 다시 쓴다
+            # (core/model_template.py)
+            m, solvers = get_template_entry(params) if reuse_model else (build_dynamic_ed_model(params), None)
+            gen_names = list(params.generators.keys())
+            ess_names = list(params.ess.keys()) if params.ess else []
+            if duals and m.component("dual") is None:
+                m.dual = pyo.Suffix(direction=pyo.Suffix.IMPORT)
+            elif not duals and m.component("dual") is not None:
+                m.del_component("dual")
+
+        # 템플릿 경로에서는 persistent 해를 Pyomo 변수로 옮기지 않고 extract 에서 솔버 열 벡터로 한 번에 꺼낸다
+        name, status, solve_time = solve_model(m, backend=backend, tee=tee, trace=trace, time_limit=time_limit,
+                                               solvers=solvers, load_solutions=solvers is None)
+
+        with trace.phase("extract"):
+            solver = solvers.get(name) if solvers is not None else None
+            sol = extract_solution(m, gen_names, ess_names, cost=trace.solver_stats.get("objective"),
+                                   solver=solver, backend=name)
+            if duals:
+                extract_duals(m, sol, gen_names, ess_names)
+        sol.backend, sol.status, sol.solve_time = name, status, solve_time
+        # nonzero 는 솔버가 보고한 값을 쓰고, 없을 때(cbc/ipopt)만 직접 센다
+        nnz = trace.solver_stats.get("nonzeros")
+        trace.model_size = pyomo_model_size(m, nonzeros=nnz is None)
+        if nnz is not None:
+            trace.model_size["nonzeros"] = nnz
+
+    sol.build_time = trace.time_of("build")
+    sol.trace = trace.to_dict()
+    if trace_path:
+        trace.write_json(trace_path, backend=sol.backend, status=sol.status, method=method)
+    return sol
+
+def _primal_layout(m: pyo.ConcreteModel, gen_names, ess_names):
+    # 추출할 변수를 블록 순서대로 한 번만 펼쳐 모델에 보관 (템플릿 재사용 시 다시 만들지 않는다)
+    # 순서: P_grid_import[T], P_grid_export[T], P_gen[G, T], (P_chg, P_dis, SOC)[E, T]
+    key = (tuple(gen_names), tuple(ess_names))
+    layout = getattr(m, "_primal_layout", None)
+    if layout is not None and layout[0] == key:
+        return layout[1]
+    T = list(m.T)
+    var_list = [m.P_grid_import[t] for t in T] + [m.P_grid_export[t] for t in T]
+    var_list += [m.P_gen[g, t] for g in gen_names for t in T]
+    for comp in ((m.P_chg, m.P_dis, m.SOC) if ess_names else ()):
+        var_list += [comp[e, t] for e in ess_names for t in T]
+    m._primal_layout = (key, var_list)
+    return var_list
+
+
+def _primal_columns(m: pyo.ConcreteModel, backend: str, solver, var_list):
+    # _primal_layout 순서의 솔버 열 (solver 가 같으면 재사용). 솔버 모델을 새로 만들면 다시 계산
+    cached = getattr(m, "_primal_columns", None)
+    if cached is not None and cached[0] is solver and cached[1] is var_list:
+        return cached[2]
+    columns = solver_columns(backend, solver, var_list)
+    m._primal_columns = (solver, var_list, columns)
+    return columns
+
+
+def extract_solution(m: pyo.ConcreteModel, gen_names, ess_names, cost: Optional[float] = None,
+                     solver=None, backend: Optional[str] = None) -> EDSolution:
+    # 변수 값을 _primal_layout 순서의 연속 float64 배열 하나에 모으고 schedule / ess_schedule 은 그 view 로 채운다
+    # - solver (persistent, 해를 Pyomo 에 적재하지 않은 경우): 솔버의 열 벡터를 한 번에 꺼내 흩어 담는다
+    # - 그 밖(cbc/ipopt, 적재된 해): Pyomo 변수 값을 한 번 순회
+    # cost: 솔버가 보고한 목적함수 값 (없으면 Pyomo 식으로 다시 평가 - 긴 horizon 에서는 느림)
+    T, G, E = len(m.T), len(gen_names), len(ess_names)
+    var_list = _primal_layout(m, gen_names, ess_names)
+    columns = _primal_columns(m, backend, solver, var_list) if solver is not None else None
+    if columns is not None:
+        values = primal_values(backend, solver, columns)
+    else:
+        if solver is not None:
+            # 솔버 모델에 없는 변수가 있으면 Pyomo 쪽으로 적재해서 읽는다
+            load_primals(solver, var_list)
+        values = np.fromiter((v.value for v in var_list), dtype=np.float64, count=len(var_list))
+
     sol = EDSolution()
-    sol.cost = pyo.value(m.Obj)
-    sol.schedule = {}
-    sol.schedule['P_grid'] = [pyo.value(m.P_grid_import[t]) - pyo.value(m.P_grid_export[t]) for t in m.T]
-    
-    for g in gen_names:
-        sol.schedule[f'P_{g}'] = [pyo.value(m.P_gen[g, t]) for t in m.T]
-        
+    sol.cost = pyo.value(m.Obj) if cost is None else cost
+    sol.schedule = {'P_grid': values[:T] - values[T:2 * T]}
+    P_gen = values[2 * T:(2 + G) * T].reshape(G, T)
+    for i, g in enumerate(gen_names):
+        sol.schedule[f'P_{g}'] = P_gen[i]
+
     if ess_names:
+        P_chg, P_dis, SOC = values[(2 + G) * T:].reshape(3, E, T)
         sol.ess_schedule = {}
-        for e in ess_names:
-            sol.ess_schedule[e] = {
-                'charge': [pyo.value(m.P_chg[e, t]) for t in m.T],
-                'discharge': [pyo.value(m.P_dis[e, t]) for t in m.T],
-                'soc': [pyo.value(m.SOC[e, t]) for t in m.T]
-            }
+        for i, e in enumerate(ess_names):
+            sol.ess_schedule[e] = {'charge': P_chg[i], 'discharge': P_dis[i], 'soc': SOC[i]}
             
-    return sol
\ No newline at end of file
+    return sol
+
+
+def extract_duals(m: pyo.ConcreteModel, sol: EDSolution, gen_names, ess_names):
+    # 최소화 문제: 쌍대 = 우변(수요 등) 1 단위 증가 시 목적함수 변화량. Skip 된 제약(t=0 ramp)은 0
+    dual = m.dual
+    sol.marginal_price = [dual.get(m.Balance[t], 0.0) for t in m.T]
+    sol.duals = {
+        'Ramp': {g: [dual.get(m.Ramp[g, t], 0.0) if (g, t) in m.Ramp else 0.0 for t in m.T] for g in gen_names},
+    }
+    if ess_names:
+        sol.duals['SOC_Dyn'] = {e: [dual.get(m.SOC_Dyn[e, t], 0.0) for t in m.T] for e in ess_names}
+    return sol
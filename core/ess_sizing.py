@@ -0,0 +1,140 @@
+# core/ess_sizing.py
+
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from state.schemas import EDParams
+from core.dispatch_model import DispatchModel
+from core.dynamic_solver import solve_dynamic_ed
+
+
+@dataclass
+class SizingPoint:
+    capacity_mwh: float
+    max_power_mw: float
+    efficiency: float
+    cost: float = float("nan")
+    savings: float = float("nan")   # ESS 없는 경우 대비 비용 절감 [KRW]
+    solve_time: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class SizingResult:
+    capacities: List[float]
+    powers: List[float]
+    efficiencies: List[float]
+    baseline_cost: float
+    points: List[SizingPoint] = field(default_factory=list)
+    # cost[i_cap, i_pow, i_eff], 실패한 점은 NaN
+    cost_surface: Optional[np.ndarray] = None
+    # 효율별 Pareto frontier (용량·출력은 작을수록, 절감액은 클수록 좋음)
+    pareto: Dict[float, List[SizingPoint]] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+
+def serpentine_order(shape: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+    # boustrophedon 순서: 연속한 두 점이 항상 한 축으로만 한 칸 차이 → 이전 basis 로 warm start
+    if len(shape) == 1:
+        return [(i,) for i in range(shape[0])]
+    order = []
+    inner = serpentine_order(shape[1:])
+    for i in range(shape[0]):
+        seq = inner if i % 2 == 0 else inner[::-1]
+        order.extend((i,) + idx for idx in seq)
+    return order
+
+
+def _sweep_chunk(params: EDParams, ess_name: str, points: List[Tuple[int, float, float, float]],
+                 solver: Optional[str]) -> List[Tuple[int, float, float, Optional[str]]]:
+    # worker 하나가 모델 하나를 만들고, 인접한 격자점을 차례로 bound 만 바꿔 다시 푼다
+    results = []
+    model = None
+    for idx, cap, power, eff in points:
+        t0 = time.perf_counter()
+        try:
+            if model is None:
+                model = DispatchModel(params, solver=solver, tee=False)
+            model.set_ess(ess_name, capacity_mwh=cap, max_power_mw=power, efficiency=eff)
+            sol = model.solve()
+            results.append((idx, sol.cost, time.perf_counter() - t0, None))
+        except Exception as e:
+            # 실패한 점만 기록하고, 모델 상태가 애매하므로 다음 점에서 새로 만든다
+            model = None
+            results.append((idx, float("nan"), time.perf_counter() - t0, f"{type(e).__name__}: {e}"))
+    return results
+
+
+def pareto_frontier(points: Sequence[SizingPoint]) -> List[SizingPoint]:
+    # (capacity ↓, power ↓, savings ↑) 에서 지배당하지 않는 점들, 용량 순 정렬
+    valid = [p for p in points if p.ok and np.isfinite(p.savings)]
+    if not valid:
+        return []
+    X = np.array([[p.capacity_mwh, p.max_power_mw, -p.savings] for p in valid])
+    no_worse = (X[None, :, :] <= X[:, None, :]).all(axis=2)
+    better = (X[None, :, :] < X[:, None, :]).any(axis=2)
+    dominated = (no_worse & better).any(axis=1)
+    frontier = [p for p, d in zip(valid, dominated) if not d]
+    return sorted(frontier, key=lambda p: (p.capacity_mwh, p.max_power_mw))
+
+
+def sweep_ess_sizing(params: EDParams, capacities: Sequence[float], powers: Sequence[float],
+                     efficiencies: Sequence[float] = (0.95,), ess_name: Optional[str] = None,
+                     workers: Optional[int] = None, solver: Optional[str] = None) -> SizingResult:
+    """
+    ESS (capacity_mwh × max_power_mw × efficiency) 격자 sweep.
+    - 격자를 serpentine 순서로 펼쳐 worker 수만큼 연속 구간으로 나눈다
+    - worker 마다 DispatchModel 하나를 재사용하고 ESS Param 만 바꿔 persistent 솔버로 warm start
+    - 절감액은 ESS 를 뺀 기준 급전 대비
+    """
+    t_start = time.perf_counter()
+    if not params.ess:
+        raise ValueError("params.ess is empty - sizing sweep needs an ESS to resize")
+    ess_name = ess_name or next(iter(params.ess))
+
+    baseline = solve_dynamic_ed(replace(params, ess=None), tee=False, backend=solver).cost
+
+    shape = (len(capacities), len(powers), len(efficiencies))
+    order = serpentine_order(shape)
+    grid = [(k, float(capacities[i]), float(powers[j]), float(efficiencies[l]))
+            for k, (i, j, l) in enumerate(order)]
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(grid)))
+    chunks = [[grid[k] for k in ks] for ks in np.array_split(np.arange(len(grid)), workers) if len(ks)]
+
+    print(f">> [Sizing] {len(grid)} points ({shape[0]}x{shape[1]}x{shape[2]}) on {len(chunks)} workers")
+    if len(chunks) == 1:
+        raw = _sweep_chunk(params, ess_name, chunks[0], solver)
+    else:
+        ctx = mp.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=len(chunks), mp_context=ctx) as pool:
+            futures = [pool.submit(_sweep_chunk, params, ess_name, c, solver) for c in chunks]
+            raw = [r for f in futures for r in f.result()]
+
+    result = SizingResult(list(capacities), list(powers), list(efficiencies), baseline)
+    surface = np.full(shape, np.nan)
+    by_index = {k: (cost, dt, err) for k, cost, dt, err in raw}
+    for k, (i, j, l) in enumerate(order):
+        cost, dt, err = by_index[k]
+        point = SizingPoint(grid[k][1], grid[k][2], grid[k][3], cost, baseline - cost, dt, err)
+        result.points.append(point)
+        surface[i, j, l] = cost
+    result.cost_surface = surface
+
+    for eff in efficiencies:
+        result.pareto[float(eff)] = pareto_frontier([p for p in result.points if p.efficiency == float(eff)])
+
+    failed = sum(not p.ok for p in result.points)
+    result.elapsed = time.perf_counter() - t_start
+    print(f">> [Sizing] done in {result.elapsed:.2f} s ({failed} failed), baseline cost {baseline:,.0f} KRW")
+    return result
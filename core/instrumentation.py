@@ -0,0 +1,155 @@
+# core/instrumentation.py
+
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+import pyomo.environ as pyo
+
+try:
+    import resource  # Windows 에는 없음 → 메모리 항목은 None
+except ImportError:
+    resource = None
+
+
+def _proc_status_mb(key: str) -> Optional[float]:
+    # /proc/self/status 의 VmRSS / VmHWM (kB) — 같은 커널 카운터라 서로 비교 가능
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(key + ":"):
+                    return int(line.split()[1]) / 1024.0
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def reset_peak_rss() -> bool:
+    # Linux: VmHWM 을 현재 RSS 로 되돌린다 (/proc/self/clear_refs 에 "5"). 이후 peak_rss_mb 는 이 시점부터의 최대값
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb() -> Optional[float]:
+    # 마지막 reset_peak_rss 이후 최대 RSS (VmHWM, Linux)
+    return _proc_status_mb("VmHWM")
+
+
+def _maxrss_mb() -> Optional[float]:
+    # 프로세스 시작 이후 최대 RSS (Linux: KB, macOS: bytes). VmHWM 을 되돌릴 수 없을 때만 쓴다
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+def current_rss_mb() -> Optional[float]:
+    rss = _proc_status_mb("VmRSS")
+    if rss is not None:
+        return rss
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024.0 * 1024.0)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+@dataclass
+class PhaseStat:
+    name: str
+    wall_time: float
+    rss_mb: Optional[float]        # phase 끝 시점 RSS
+    peak_rss_mb: Optional[float]   # phase 동안의 최대 RSS (모르면 None)
+    rss_delta_mb: Optional[float]  # phase 동안 RSS 증가량
+
+
+@dataclass
+class SolveTrace:
+    """
+    solve 한 번의 phase 별 시간/메모리 + 모델 크기 + 솔버 통계.
+    phase: build(모델 생성) → transfer(솔버로 전달/파일 쓰기) → solve → extract(결과 꺼내기)
+    """
+    phases: List[PhaseStat] = field(default_factory=list)
+    model_size: Dict[str, Optional[int]] = field(default_factory=dict)
+    solver_stats: Dict[str, Any] = field(default_factory=dict)
+
+    @contextmanager
+    def phase(self, name: str):
+        rss0 = current_rss_mb()
+        # phase 시작에서 high-water mark 를 현재 RSS 로 되돌려, 끝에서 읽은 VmHWM 이 이 phase 의 최대값이 되게 한다
+        scoped = reset_peak_rss()
+        maxrss0 = None if scoped else _maxrss_mb()
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            rss = current_rss_mb()
+            if scoped:
+                peak = peak_rss_mb()
+            else:
+                # 되돌릴 수 없으면(macOS 등) 프로세스 최대값이 이 phase 에서 늘었을 때만 그 값이 phase 최대값
+                maxrss = _maxrss_mb()
+                peak = maxrss if maxrss is not None and maxrss0 is not None and maxrss > maxrss0 else None
+            if peak is not None and rss is not None:
+                peak = max(peak, rss)
+            self.phases.append(PhaseStat(
+                name=name, wall_time=time.perf_counter() - t0, rss_mb=rss, peak_rss_mb=peak,
+                rss_delta_mb=(rss - rss0) if rss is not None and rss0 is not None else None,
+            ))
+
+    def time_of(self, *names: str) -> float:
+        return sum(p.wall_time for p in self.phases if p.name in names)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def write_json(self, path: str, **extra):
+        # extra: backend / status 등 같이 남길 값
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({**extra, **self.to_dict()}, f, indent=2, ensure_ascii=False)
+
+
+def phase(trace: Optional[SolveTrace], name: str):
+    # trace 가 없으면 아무 것도 하지 않는 context
+    return trace.phase(name) if trace is not None else nullcontext()
+
+
+def pyomo_model_size(model, nonzeros: bool = False) -> Dict[str, Optional[int]]:
+    # 변수/제약 개수는 component 순회로 바로, nonzero 는 제약식을 다시 훑어야 하므로 요청할 때만
+    n_vars = sum(1 for _ in model.component_data_objects(pyo.Var, active=True))
+    cons = list(model.component_data_objects(pyo.Constraint, active=True))
+    nnz = None
+    if nonzeros:
+        from pyomo.core.expr.visitor import identify_variables
+        nnz = sum(sum(1 for _ in identify_variables(c.body, include_fixed=False)) for c in cons)
+    return {"variables": n_vars, "constraints": len(cons), "nonzeros": nnz}
+
+
+def gurobi_stats(gm) -> Dict[str, Any]:
+    return {
+        "status": int(gm.Status), "iterations": int(gm.IterCount),
+        "barrier_iterations": int(gm.BarIterCount), "solver_time": float(gm.Runtime),
+        "nonzeros": int(gm.NumNZs), "quadratic_nonzeros": int(gm.NumQNZs),
+    }
+
+
+def highs_stats(h) -> Dict[str, Any]:
+    info = h.getInfo()
+    return {
+        "status": h.modelStatusToString(h.getModelStatus()),
+        "iterations": int(info.simplex_iteration_count),
+        "barrier_iterations": int(info.ipm_iteration_count),
+        "qp_iterations": int(info.qp_iteration_count),
+        "solver_time": float(h.getRunTime()),
+        "nonzeros": int(h.getNumNz()),
+    }
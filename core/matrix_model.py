@@ -0,0 +1,396 @@
+# core/matrix_model.py
+
+from dataclasses import dataclass, field
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from pyomo.contrib.solver.common.util import NoOptimalSolutionError
+
+from state.schemas import EDParams, EDSolution
+from core.pwl_cost import pwl_segments
+from core.solver_interface import DEFAULT_TIME_LIMIT, SolverLimitError, is_available, solve_with_fallback
+from core.instrumentation import SolveTrace, gurobi_stats, highs_stats, phase
+
+
+@dataclass
+class DispatchMatrix:
+    """
+    solve_dynamic_ed와 동일한 LP/QP 를 행(row) 단위 CSR 행렬로 표현.
+    min 0.5 x'diag(hess_diag)x + cost'x + obj_offset
+    s.t. row_lower <= A x <= row_upper, col_lower <= x <= col_upper
+    """
+    T: int
+    gen_names: List[str]
+    ess_names: List[str]
+    cost: np.ndarray
+    hess_diag: np.ndarray
+    obj_offset: float
+    col_lower: np.ndarray
+    col_upper: np.ndarray
+    row_start: np.ndarray
+    row_index: np.ndarray
+    row_value: np.ndarray
+    row_lower: np.ndarray
+    row_upper: np.ndarray
+    # 이름 -> (시작 offset, (자산 수, T)) : P_gen, P_chg, P_dis, SOC, P_grid_import, P_grid_export, C_gen
+    col_blocks: Dict[str, Tuple[int, Tuple[int, int]]] = field(default_factory=dict)
+    # 이름 -> 행 slice : Balance, GenBounds, Ramp, SOC_Dyn, SOC_Limit, ESS_Power, PWL_Cost_<발전기>
+    row_blocks: Dict[str, slice] = field(default_factory=dict)
+    # (G, T) Ramp 행이 있는 (발전기, 스텝) - t=0 은 initial_gen_output 이 있는 발전기만
+    ramp_mask: Optional[np.ndarray] = None
+
+    @property
+    def num_cols(self) -> int:
+        return len(self.cost)
+
+    @property
+    def num_rows(self) -> int:
+        return len(self.row_lower)
+
+    @property
+    def num_nonzeros(self) -> int:
+        return len(self.row_value)
+
+
+def _cols(offset: int, n: int, T: int) -> np.ndarray:
+    # (n, T) 변수 블록의 열 번호
+    return offset + np.arange(n * T, dtype=np.int64).reshape(n, T)
+
+
+def build_dispatch_matrix(params: EDParams) -> DispatchMatrix:
+    # dynamic_solver 가 이 모듈을 import 하므로 기본 요금은 함수 안에서 가져온다
+    from core.dynamic_solver import DEFAULT_GRID_PRICE
+
+    T = params.time_steps
+    gen_names = list(params.generators.keys())
+    ess_names = list(params.ess.keys()) if params.ess else []
+    G, E = len(gen_names), len(ess_names)
+    dt = params.dt_hours
+    # PWL 비용 발전기 (C_gen epigraph 열은 이 발전기들만)
+    pwl_idx = [i for i, g in enumerate(gen_names) if params.generators[g].pwl_points]
+
+    # ------------------------------------------------------------
+    # 1. 열(변수) 배치
+    # ------------------------------------------------------------
+    col_blocks = {}
+    offset = 0
+    for name, n in [("P_gen", G), ("P_chg", E), ("P_dis", E), ("SOC", E),
+                    ("P_grid_import", 1), ("P_grid_export", 1), ("C_gen", len(pwl_idx))]:
+        col_blocks[name] = (offset, (n, T))
+        offset += n * T
+    n_cols = offset
+
+    c_gen = _cols(col_blocks["P_gen"][0], G, T)
+    c_chg = _cols(col_blocks["P_chg"][0], E, T)
+    c_dis = _cols(col_blocks["P_dis"][0], E, T)
+    c_soc = _cols(col_blocks["SOC"][0], E, T)
+    c_imp = _cols(col_blocks["P_grid_import"][0], 1, T)[0]
+    c_exp = _cols(col_blocks["P_grid_export"][0], 1, T)[0]
+    c_pwl = _cols(col_blocks["C_gen"][0], len(pwl_idx), T)
+
+    p_min = np.array([params.generators[g].p_min for g in gen_names], dtype=float)
+    p_max = np.array([params.generators[g].p_max for g in gen_names], dtype=float)
+    ramp = np.array([params.generators[g].ramp_rate for g in gen_names], dtype=float)
+
+    ess_specs = [params.ess[e] for e in ess_names]
+    eff = np.array([s.efficiency for s in ess_specs], dtype=float)
+    cap = np.array([s.capacity_mwh for s in ess_specs], dtype=float)
+    soc0 = np.array([s.initial_soc for s in ess_specs], dtype=float) * cap
+    soc_lo = np.array([s.min_soc for s in ess_specs], dtype=float) * cap
+    soc_hi = np.array([s.max_soc for s in ess_specs], dtype=float) * cap
+    p_ess = np.array([s.max_power_mw for s in ess_specs], dtype=float)
+    aging = np.array([s.aging_cost for s in ess_specs], dtype=float)
+
+    # ------------------------------------------------------------
+    # 2. 행(제약) 블록 - 블록별로 행 순서대로 (cols, vals) 를 만든다
+    # ------------------------------------------------------------
+    blocks = []  # (name, cols[n_rows, k], vals[n_rows, k], lower, upper)
+
+    # Balance: imp + sum(P_gen) + sum(P_dis) - exp - sum(P_chg) == demand
+    demand = np.asarray(params.demand_profile[:T], dtype=float)
+    bal_cols = np.vstack([c_imp[None, :], c_gen, c_dis, c_exp[None, :], c_chg]).T
+    bal_vals = np.broadcast_to(
+        np.concatenate([np.ones(1 + G + E), -np.ones(1 + E)]), bal_cols.shape)
+    blocks.append(("Balance", bal_cols, bal_vals, demand, demand))
+
+    # GenBounds: p_min <= P_gen <= p_max
+    blocks.append(("GenBounds", c_gen.reshape(-1, 1), np.ones((G * T, 1)),
+                   np.repeat(p_min, T), np.repeat(p_max, T)))
+
+    # Ramp: -r <= P_gen[t] - P_gen[t-1] <= r  (t >= 1)
+    #       t=0 은 initial_gen_output 이 있는 발전기만: p0 - r <= P_gen[0] <= p0 + r
+    p_init = params.initial_gen_output or {}
+    has_init = np.array([g in p_init for g in gen_names], dtype=bool)
+    p0 = np.array([p_init.get(g, 0.0) for g in gen_names], dtype=float)
+    r_cols = np.concatenate([c_gen[:, :1], c_gen[:, :-1]], axis=1)
+    r_cols = np.stack([c_gen, r_cols], axis=-1)
+    r_vals = np.empty((G, T, 2))
+    r_vals[..., 0] = 1.0
+    r_vals[..., 1] = -1.0
+    r_vals[:, 0, 1] = 0.0
+    r_lo = -np.repeat(ramp[:, None], T, axis=1)
+    r_up = np.repeat(ramp[:, None], T, axis=1)
+    r_lo[:, 0] += p0
+    r_up[:, 0] += p0
+    keep_rows = np.ones((G, T), dtype=bool)
+    keep_rows[:, 0] = has_init
+    blocks.append(("Ramp", r_cols[keep_rows], r_vals[keep_rows], r_lo[keep_rows], r_up[keep_rows]))
+
+    if E:
+        # SOC_Dyn: SOC[t] - SOC[t-1] - eff*dt*P_chg[t] + dt/eff*P_dis[t] == 0 (t=0: == soc0)
+        prev = np.concatenate([c_soc[:, :1], c_soc[:, :-1]], axis=1)
+        s_cols = np.stack([c_soc, c_chg, c_dis, prev], axis=-1).reshape(-1, 4)
+        s_vals = np.empty((E, T, 4))
+        s_vals[..., 0] = 1.0
+        s_vals[..., 1] = (-eff * dt)[:, None]
+        s_vals[..., 2] = (dt / eff)[:, None]
+        s_vals[..., 3] = -1.0
+        # t=0 행은 prev 항이 없으므로 계수 0 (아래에서 0 계수 제거)
+        s_vals[:, 0, 3] = 0.0
+        s_rhs = np.zeros((E, T))
+        s_rhs[:, 0] = soc0
+        blocks.append(("SOC_Dyn", s_cols, s_vals.reshape(-1, 4), s_rhs.ravel(), s_rhs.ravel()))
+
+        # SOC_Limit: min_soc*cap <= SOC <= max_soc*cap
+        blocks.append(("SOC_Limit", c_soc.reshape(-1, 1), np.ones((E * T, 1)),
+                       np.repeat(soc_lo, T), np.repeat(soc_hi, T)))
+
+        # ESS_Power: P_chg + P_dis <= max_power
+        blocks.append(("ESS_Power", np.stack([c_chg, c_dis], axis=-1).reshape(-1, 2),
+                       np.ones((E * T, 2)), np.full(E * T, -np.inf), np.repeat(p_ess, T)))
+
+    if pwl_idx:
+        # PWL_Cost: C_gen[t] - slope_k * P_gen[t] >= intercept_k  (발전기별 선분 k 마다 T 행)
+        for j, i in enumerate(pwl_idx):
+            slopes, intercepts = pwl_segments(params.generators[gen_names[i]].pwl_points)
+            K = len(slopes)
+            p_cols = np.stack([np.broadcast_to(c_pwl[j], (K, T)), np.broadcast_to(c_gen[i], (K, T))], axis=-1)
+            p_vals = np.empty((K, T, 2))
+            p_vals[..., 0] = 1.0
+            p_vals[..., 1] = -slopes[:, None]
+            blocks.append((f"PWL_Cost_{gen_names[i]}", p_cols.reshape(-1, 2), p_vals.reshape(-1, 2),
+                           np.repeat(intercepts, T), np.full(K * T, np.inf)))
+
+    # ------------------------------------------------------------
+    # 3. CSR 조립 (행이 이미 정렬되어 있으므로 정렬 없이 선형 시간)
+    # ------------------------------------------------------------
+    row_blocks = {}
+    idx_parts, val_parts, cnt_parts, lo_parts, up_parts = [], [], [], [], []
+    n_rows = 0
+    for name, cols, vals, lo, up in blocks:
+        cols = np.ascontiguousarray(cols)
+        vals = np.ascontiguousarray(vals, dtype=float)
+        keep = vals != 0.0
+        idx_parts.append(cols[keep])
+        val_parts.append(vals[keep])
+        cnt_parts.append(keep.sum(axis=1))
+        lo_parts.append(np.asarray(lo, dtype=float))
+        up_parts.append(np.asarray(up, dtype=float))
+        row_blocks[name] = slice(n_rows, n_rows + cols.shape[0])
+        n_rows += cols.shape[0]
+
+    row_start = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.concatenate(cnt_parts), out=row_start[1:])
+
+    # ------------------------------------------------------------
+    # 4. 목적함수 (변동비 + 기본요금)
+    # ------------------------------------------------------------
+    cost = np.zeros(n_cols)
+    hess_diag = np.zeros(n_cols)
+    obj_offset = params.base_rate if hasattr(params, 'base_rate') else 0.0
+    for i, g in enumerate(gen_names):
+        spec = params.generators[g]
+        if spec.pwl_points:
+            cost[c_pwl[pwl_idx.index(i)]] = 1.0
+        elif spec.a != 0 or spec.b != 0:
+            hess_diag[c_gen[i]] = 2.0 * spec.a
+            cost[c_gen[i]] = spec.b
+            obj_offset += spec.c * T
+        elif spec.cost_coeff:
+            cost[c_gen[i]] = spec.cost_coeff
+    if params.grid_price_profile:
+        cost[c_imp] = np.asarray(params.grid_price_profile[:T], dtype=float)
+    else:
+        cost[c_imp] = DEFAULT_GRID_PRICE
+    if E:
+        cost[c_dis] = aging[:, None]
+
+    # C_gen (비용 epigraph) 만 하한 없음, 나머지 변수는 NonNegativeReals
+    col_lower = np.zeros(n_cols)
+    col_upper = np.full(n_cols, np.inf)
+    col_lower[c_pwl.ravel()] = -np.inf
+
+    # 마지막 스텝 목표는 해당 열의 bound 를 고정
+    for i, g in enumerate(gen_names):
+        if g in (params.terminal_gen_output or {}):
+            col_lower[c_gen[i, -1]] = col_upper[c_gen[i, -1]] = params.terminal_gen_output[g]
+    for i, e in enumerate(ess_names):
+        if e in (params.terminal_soc or {}):
+            col_lower[c_soc[i, -1]] = col_upper[c_soc[i, -1]] = params.terminal_soc[e]
+
+    return DispatchMatrix(
+        T=T, gen_names=gen_names, ess_names=ess_names,
+        cost=cost, hess_diag=hess_diag, obj_offset=float(obj_offset),
+        col_lower=col_lower, col_upper=col_upper,
+        row_start=row_start,
+        row_index=np.concatenate(idx_parts),
+        row_value=np.concatenate(val_parts),
+        row_lower=np.concatenate(lo_parts),
+        row_upper=np.concatenate(up_parts),
+        col_blocks=col_blocks, row_blocks=row_blocks, ramp_mask=keep_rows,
+    )
+
+
+def _solve_highs(mat: DispatchMatrix, tee: bool, trace: Optional[SolveTrace] = None,
+                 time_limit: Optional[float] = None) -> Tuple[float, np.ndarray, np.ndarray, str]:
+    import highspy
+
+    h = highspy.Highs()
+    h.setOptionValue("output_flag", bool(tee))
+    if time_limit is not None:
+        h.setOptionValue("time_limit", float(time_limit))
+
+    with phase(trace, "transfer"):
+        _pass_highs(h, mat)
+
+    with phase(trace, "solve"):
+        h.run()
+    if trace is not None:
+        trace.solver_stats.update(highs_stats(h))
+    status = h.modelStatusToString(h.getModelStatus())
+    if h.getModelStatus() in (highspy.HighsModelStatus.kTimeLimit, highspy.HighsModelStatus.kIterationLimit):
+        raise SolverLimitError(f"stopped by {status} (time_limit={time_limit} s)")
+    if h.getModelStatus() != highspy.HighsModelStatus.kOptimal:
+        raise NoOptimalSolutionError()
+    x = np.asarray(h.getSolution().col_value, dtype=float)
+    y = np.asarray(h.getSolution().row_dual, dtype=float)
+    return float(h.getInfo().objective_function_value), x, y, status
+
+
+def _pass_highs(h, mat: DispatchMatrix):
+    import highspy
+
+    lp = highspy.HighsLp()
+    lp.num_col_ = mat.num_cols
+    lp.num_row_ = mat.num_rows
+    lp.col_cost_ = mat.cost
+    lp.col_lower_ = np.where(np.isinf(mat.col_lower), -highspy.kHighsInf, mat.col_lower)
+    lp.col_upper_ = np.where(np.isinf(mat.col_upper), highspy.kHighsInf, mat.col_upper)
+    lp.row_lower_ = np.where(np.isinf(mat.row_lower), -highspy.kHighsInf, mat.row_lower)
+    lp.row_upper_ = np.where(np.isinf(mat.row_upper), highspy.kHighsInf, mat.row_upper)
+    lp.offset_ = mat.obj_offset
+    lp.a_matrix_.format_ = highspy.MatrixFormat.kRowwise
+    lp.a_matrix_.num_col_ = mat.num_cols
+    lp.a_matrix_.num_row_ = mat.num_rows
+    lp.a_matrix_.start_ = mat.row_start
+    lp.a_matrix_.index_ = mat.row_index
+    lp.a_matrix_.value_ = mat.row_value
+    h.passModel(lp)
+
+    q_cols = np.flatnonzero(mat.hess_diag)
+    if len(q_cols):
+        # 대각 Hessian (kTriangular, column-wise)
+        start = np.searchsorted(q_cols, np.arange(mat.num_cols + 1)).astype(np.int32)
+        h.passHessian(mat.num_cols, len(q_cols), highspy.HessianFormat.kTriangular,
+                      start, q_cols.astype(np.int32), mat.hess_diag[q_cols])
+
+
+def _solve_gurobi(mat: DispatchMatrix, tee: bool, trace: Optional[SolveTrace] = None,
+                  time_limit: Optional[float] = None) -> Tuple[float, np.ndarray, np.ndarray, str]:
+    import gurobipy as gp
+    import scipy.sparse as sp
+
+    gm = gp.Model()
+    gm.Params.OutputFlag = int(tee)
+    if time_limit is not None:
+        gm.Params.TimeLimit = time_limit
+    with phase(trace, "transfer"):
+        x = gm.addMVar(mat.num_cols, lb=mat.col_lower, ub=mat.col_upper)
+        A = sp.csr_matrix((mat.row_value, mat.row_index, mat.row_start),
+                          shape=(mat.num_rows, mat.num_cols))
+
+        eq = mat.row_lower == mat.row_upper
+        has_lo = ~eq & np.isfinite(mat.row_lower)
+        has_up = ~eq & np.isfinite(mat.row_upper)
+        constrs = []
+        for mask, sense, rhs in [(eq, '=', mat.row_lower), (has_lo, '>', mat.row_lower),
+                                 (has_up, '<', mat.row_upper)]:
+            if mask.any():
+                constrs.append((mask, gm.addMConstr(A[mask], x, sense, rhs[mask])))
+
+        # Gurobi 는 x'Qx 형태이므로 0.5 * hess_diag
+        Q = sp.diags(0.5 * mat.hess_diag, format="csr")
+        gm.setMObjective(Q, mat.cost, mat.obj_offset, sense=gp.GRB.MINIMIZE)
+        gm.update()
+
+    with phase(trace, "solve"):
+        gm.optimize()
+    if trace is not None:
+        trace.solver_stats.update(gurobi_stats(gm))
+    if gm.Status in (gp.GRB.TIME_LIMIT, gp.GRB.ITERATION_LIMIT):
+        raise SolverLimitError(f"stopped by status {gm.Status} (time_limit={time_limit} s)")
+    if gm.Status != gp.GRB.OPTIMAL:
+        raise NoOptimalSolutionError()
+    # 양쪽 bound 가 있는 행은 두 제약으로 나뉘므로 쌍대를 합친다 (최적해에서 많아야 한쪽만 0 이 아님)
+    y = np.zeros(mat.num_rows)
+    for mask, c in constrs:
+        y[mask] += np.asarray(c.Pi, dtype=float)
+    return float(gm.ObjVal), np.asarray(x.X, dtype=float), y, str(gm.Status)
+
+
+# 행렬 경로 backend (gurobipy 행렬 API, highspy 직접 전달) - 빠른 순서
+MATRIX_BACKENDS = {"gurobi": ("gurobi_persistent", _solve_gurobi), "highs": ("highs", _solve_highs)}
+
+
+def solve_dispatch_matrix(mat: DispatchMatrix, solver: Optional[str] = None, tee: bool = False,
+                          duals: bool = False, trace: Optional[SolveTrace] = None,
+                          time_limit: Optional[float] = DEFAULT_TIME_LIMIT) -> EDSolution:
+    # solver=None 이면 설치/라이선스가 있는 가장 빠른 backend, 실패(time_limit 초과 포함)하면 다음 backend 로
+    if solver is not None and solver not in MATRIX_BACKENDS:
+        raise ValueError(f"Unknown matrix solver: {solver}")
+    names = ([solver] if solver else []) + [b for b in MATRIX_BACKENDS if b != solver]
+    names = [b for b in names if is_available(MATRIX_BACKENDS[b][0])]
+    if not names:
+        raise RuntimeError(f"No available matrix solver backend (tried: {list(MATRIX_BACKENDS)})")
+
+    def attempt(name):
+        t0 = time.perf_counter()
+        result = MATRIX_BACKENDS[name][1](mat, tee, trace, time_limit)
+        return result, time.perf_counter() - t0
+
+    name, ((obj, x, y, status), solve_time) = solve_with_fallback(names, attempt, trace)
+
+    with phase(trace, "extract"):
+        def block(name):
+            off, shape = mat.col_blocks[name]
+            return x[off:off + shape[0] * shape[1]].reshape(shape)
+
+        sol = EDSolution(backend=name, status=status, solve_time=solve_time)
+        sol.cost = obj
+        sol.schedule = {}
+        sol.schedule['P_grid'] = block("P_grid_import")[0] - block("P_grid_export")[0]
+
+        P_gen = block("P_gen")
+        for i, g in enumerate(mat.gen_names):
+            sol.schedule[f'P_{g}'] = P_gen[i]
+
+        if mat.ess_names:
+            P_chg, P_dis, SOC = block("P_chg"), block("P_dis"), block("SOC")
+            sol.ess_schedule = {}
+            for i, e in enumerate(mat.ess_names):
+                sol.ess_schedule[e] = {'charge': P_chg[i], 'discharge': P_dis[i], 'soc': SOC[i]}
+
+        if duals:
+            sol.marginal_price = y[mat.row_blocks["Balance"]].tolist()
+            ramp = np.zeros((len(mat.gen_names), mat.T))
+            ramp[mat.ramp_mask] = y[mat.row_blocks["Ramp"]]
+            sol.duals = {'Ramp': {g: ramp[i].tolist() for i, g in enumerate(mat.gen_names)}}
+            if mat.ess_names:
+                soc = y[mat.row_blocks["SOC_Dyn"]].reshape(len(mat.ess_names), mat.T)
+                sol.duals['SOC_Dyn'] = {e: soc[i].tolist() for i, e in enumerate(mat.ess_names)}
+
+    if trace is not None:
+        trace.model_size = {"variables": mat.num_cols, "constraints": mat.num_rows,
+                            "nonzeros": mat.num_nonzeros}
+    return sol
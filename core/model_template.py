@@ -0,0 +1,71 @@
+# core/model_template.py
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+import pyomo.environ as pyo
+
+from state.schemas import EDParams
+from core.dynamic_solver import build_dynamic_ed_model, model_data, model_structure
+
+# 프로세스 안 템플릿 캐시: model_structure(params) → (모든 숫자가 mutable Param 인 모델, {backend: persistent 솔버})
+# 솔버는 solve_model(solvers=...) 이 처음 풀 때 채우고, 다음 dispatch 부터는 바뀐 Param 만 넘겨 다시 푼다.
+# 모듈 전역의 공유 모델이므로 단일 스레드 전용 (스레드마다 값을 바인딩하면 서로 덮어쓴다 → 병렬은 프로세스로)
+_TEMPLATES: "OrderedDict[tuple, Tuple[pyo.ConcreteModel, Dict[str, Any]]]" = OrderedDict()
+_MAX_TEMPLATES = 16
+_STATS: Dict[str, float] = {"hits": 0, "misses": 0, "compile_time": 0.0, "bind_time": 0.0}
+
+
+def bind_params(model: pyo.ConcreteModel, params: EDParams) -> pyo.ConcreteModel:
+    # 같은 구조의 템플릿에 params 의 숫자(비용, 한계, 프로파일, 요금, 경계 조건)만 다시 채운다
+    t0 = time.perf_counter()
+    for name, values in model_data(params).items():
+        component = model.component(name)
+        if component is None:
+            continue
+        if isinstance(values, dict):
+            component.store_values(values)
+        else:
+            component.set_value(values)
+    _STATS["bind_time"] += time.perf_counter() - t0
+    return model
+
+
+def get_template_entry(params: EDParams) -> Tuple[pyo.ConcreteModel, Dict[str, Any]]:
+    """
+    같은 fleet 구조(horizon, 발전기/ESS 이름, 비용 형태)면 한 번만 컴파일한 모델을 꺼내 params 값을 바인딩하고,
+    그 모델 전용 persistent 솔버 보관함과 같이 돌려준다 (core/solver_interface.solve_model 의 solvers).
+    반환 모델은 캐시에 남아 있는 공유 객체이므로, 다음 get_template 호출 전에 풀고 결과를 꺼내야 한다.
+    단일 스레드 전용: 두 스레드가 같은 fleet 을 동시에 급전하면 서로의 Param 값을 덮어쓴다.
+    모델을 오래 들고 직접 바꿔가며 쓰려면 core/dispatch_model.DispatchModel 을 쓴다.
+    """
+    key = model_structure(params)
+    entry = _TEMPLATES.get(key)
+    if entry is None:
+        _STATS["misses"] += 1
+        t0 = time.perf_counter()
+        entry = (build_dynamic_ed_model(params, mutable=True), {})
+        _STATS["compile_time"] += time.perf_counter() - t0
+        _TEMPLATES[key] = entry
+        if len(_TEMPLATES) > _MAX_TEMPLATES:
+            _TEMPLATES.popitem(last=False)
+        return entry
+    _STATS["hits"] += 1
+    _TEMPLATES.move_to_end(key)
+    bind_params(entry[0], params)
+    return entry
+
+
+def get_template(params: EDParams) -> pyo.ConcreteModel:
+    # 모델만 필요할 때 (get_template_entry 참고)
+    return get_template_entry(params)[0]
+
+
+def template_stats() -> Dict[str, float]:
+    return {**_STATS, "templates": len(_TEMPLATES)}
+
+
+def clear_templates():
+    _TEMPLATES.clear()
+    _STATS.update(hits=0, misses=0, compile_time=0.0, bind_time=0.0)
@@ -0,0 +1,169 @@
+# core/multi_resolution.py
+
+import time
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from state.schemas import EDParams, EDSolution
+from core.batch_solver import solve_many
+from core.dynamic_solver import DEFAULT_GRID_PRICE, solve_dynamic_ed
+from core.rolling_horizon import _committed_cost, window_params
+
+
+@dataclass
+class MultiResolutionReport:
+    factor: int
+    n_intervals: int
+    coarse_cost: float = 0.0
+    fine_cost: float = 0.0
+    coarse_time: float = 0.0
+    refine_time: float = 0.0
+    elapsed: float = 0.0
+    # 세분화에 실패해 coarse 계획을 그대로 유지한 구간
+    failed_intervals: List[int] = field(default_factory=list)
+    # 발전기별: coarse 계획을 fine 해상도에서 계단식으로 유지하면 구간 경계 점프가 fine ramp 한계를 넘는 횟수
+    coarse_ramp_violations: Dict[str, int] = field(default_factory=dict)
+    # 발전기별 fine 스텝당 최대 |ΔP| [MW]: coarse 계단 유지 vs 세분화 결과
+    coarse_max_step_ramp: Dict[str, float] = field(default_factory=dict)
+    fine_max_step_ramp: Dict[str, float] = field(default_factory=dict)
+
+
+def _block_sum(x: np.ndarray, factor: int) -> np.ndarray:
+    return x.reshape(-1, factor).sum(axis=1)
+
+
+def aggregate_params(params: EDParams, factor: int) -> EDParams:
+    """
+    fine 해상도 EDParams 를 factor 스텝씩 묶은 coarse EDParams 로 변환.
+    이 repo 의 비용 계수는 모두 '스텝당' 값이므로 coarse 스텝 비용 = fine 스텝 비용 × factor,
+    ramp 한계(스텝당 MW)도 × factor. 수요/PV 는 구간 평균, 요금은 구간 합.
+    """
+    T = params.time_steps
+    if T % factor:
+        raise ValueError(f"time_steps {T} is not a multiple of factor {factor}")
+
+    demand = np.asarray(params.demand_profile[:T], dtype=float)
+    pv = np.asarray(params.pv_profile[:T], dtype=float) if params.pv_profile else None
+    price = np.asarray(params.grid_price_profile[:T], dtype=float) if params.grid_price_profile \
+        else np.full(T, DEFAULT_GRID_PRICE)
+
+    generators = {
+        g: replace(
+            spec, a=spec.a * factor, b=spec.b * factor, c=spec.c * factor,
+            cost_coeff=spec.cost_coeff * factor, ramp_rate=spec.ramp_rate * factor,
+            pwl_points=[(p, c * factor) for p, c in spec.pwl_points] if spec.pwl_points else None,
+        )
+        for g, spec in params.generators.items()
+    }
+    ess = {e: replace(spec, aging_cost=spec.aging_cost * factor) for e, spec in params.ess.items()} \
+        if params.ess else None
+
+    return replace(
+        params,
+        time_steps=T // factor,
+        demand_profile=(_block_sum(demand, factor) / factor).tolist(),
+        pv_profile=(_block_sum(pv, factor) / factor).tolist() if pv is not None else None,
+        grid_price_profile=_block_sum(price, factor).tolist(),
+        timestamps=list(params.timestamps[:T:factor]) if params.timestamps else None,
+        dt_hours=params.dt_hours * factor,
+        generators=generators,
+        ess=ess,
+    )
+
+
+def _interval_params(params: EDParams, coarse: EDSolution, k: int, factor: int) -> EDParams:
+    # coarse 구간 k 를 fine 해상도로 다시 푸는 sub-problem
+    # 시작 상태 = coarse 해의 구간 k-1 끝, 끝 상태 목표 = coarse 해의 구간 k
+    gen_names = list(params.generators.keys())
+    if k > 0:
+        soc_start = {e: coarse.ess_schedule[e]['soc'][k - 1] for e in (params.ess or {})}
+        gen_prev = {g: coarse.schedule[f'P_{g}'][k - 1] for g in gen_names}
+    else:
+        soc_start = {e: s.initial_soc * s.capacity_mwh for e, s in (params.ess or {}).items()}
+        gen_prev = params.initial_gen_output
+    sub = window_params(params, k * factor, (k + 1) * factor, soc_start, gen_prev)
+    return replace(
+        sub,
+        terminal_soc={e: coarse.ess_schedule[e]['soc'][k] for e in (params.ess or {})} or None,
+        terminal_gen_output={g: coarse.schedule[f'P_{g}'][k] for g in gen_names},
+    )
+
+
+def _held(values: List[float], factor: int) -> np.ndarray:
+    # coarse 값을 fine 해상도에서 계단식으로 유지
+    return np.repeat(np.asarray(values, dtype=float), factor)
+
+
+def solve_coarse_to_fine(params: EDParams, factor: int = 15, workers: Optional[int] = None,
+                         solver: Optional[str] = None,
+                         max_concurrent_solves: Optional[int] = None) -> Tuple[EDSolution, MultiResolutionReport]:
+    """
+    계층형 급전: params (fine 해상도, 예: 1분) 를 factor 스텝씩 묶어 coarse (예: 15분) 로 먼저 풀고,
+    각 coarse 구간을 fine 해상도로 병렬 세분화한다. 구간 시작/끝의 SOC 와 발전기 출력은 coarse 해에 고정되어
+    구간끼리 독립이므로 solve_many 로 동시에 푼다.
+    """
+    t_start = time.perf_counter()
+    T = params.time_steps
+    K = T // factor
+    report = MultiResolutionReport(factor=factor, n_intervals=K)
+    gen_names = list(params.generators.keys())
+    ess_names = list(params.ess.keys()) if params.ess else []
+
+    # 1) coarse
+    coarse_params = aggregate_params(params, factor)
+    coarse = solve_dynamic_ed(coarse_params, tee=False, backend=solver)
+    report.coarse_cost = coarse.cost
+    report.coarse_time = time.perf_counter() - t_start
+    print(f">> [Multi-Resolution] coarse {K} x {coarse_params.dt_hours * 60:.0f} min solved "
+          f"({report.coarse_time:.2f} s)")
+
+    # 2) fine 세분화 (구간별 병렬)
+    t0 = time.perf_counter()
+    subs = (_interval_params(params, coarse, k, factor) for k in range(K))
+    fine: Dict[int, EDSolution] = {}
+    for res in solve_many(subs, workers=workers, max_concurrent_solves=max_concurrent_solves, solver=solver):
+        if res.ok:
+            fine[res.index] = res.solution
+        else:
+            print(f"   >> [Multi-Resolution] interval {res.index} failed: {res.error}")
+            report.failed_intervals.append(res.index)
+    report.refine_time = time.perf_counter() - t0
+
+    # 3) 이어붙이기 (실패한 구간은 coarse 계획을 계단식으로 유지)
+    sol = EDSolution(backend=coarse.backend, status=coarse.status)
+    keys = ['P_grid'] + [f'P_{g}' for g in gen_names]
+    parts: List[EDSolution] = []
+    cost = 0.0
+    for k in range(K):
+        if k in fine:
+            parts.append(fine[k])
+            cost += fine[k].cost - params.base_rate
+        else:
+            held = EDSolution()
+            held.schedule = {key: np.full(factor, coarse.schedule[key][k]) for key in keys}
+            held.ess_schedule = {e: {key: np.full(factor, coarse.ess_schedule[e][key][k])
+                                     for key in ('charge', 'discharge', 'soc')} for e in ess_names}
+            parts.append(held)
+            # 유지한 계단 계획을 fine 해상도 비용으로 평가
+            cost += _committed_cost(_interval_params(params, coarse, k, factor), held, factor)
+    sol.schedule = {key: np.concatenate([p.schedule[key] for p in parts]) for key in keys}
+    sol.ess_schedule = {e: {key: np.concatenate([p.ess_schedule[e][key] for p in parts])
+                            for key in ('charge', 'discharge', 'soc')} for e in ess_names}
+    sol.cost = cost + params.base_rate
+    report.fine_cost = sol.cost
+
+    # 4) ramp 점검: coarse 계단 유지 시 fine 해상도 ramp 위반 vs 세분화 결과
+    for g in gen_names:
+        limit = params.generators[g].ramp_rate
+        held = np.abs(np.diff(_held(coarse.schedule[f'P_{g}'], factor)))
+        refined = np.abs(np.diff(np.asarray(sol.schedule[f'P_{g}'], dtype=float)))
+        report.coarse_ramp_violations[g] = int(np.sum(held > limit + 1e-6))
+        report.coarse_max_step_ramp[g] = float(held.max(initial=0.0))
+        report.fine_max_step_ramp[g] = float(refined.max(initial=0.0))
+
+    report.elapsed = time.perf_counter() - t_start
+    print(f">> [Multi-Resolution] {K} intervals refined in {report.refine_time:.2f} s "
+          f"({len(report.failed_intervals)} failed), total {report.elapsed:.2f} s")
+    return sol, report
@@ -0,0 +1,71 @@
+# core/pwl_cost.py
+
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def read_fuel_curve(path: str = "gtfuel.csv", exchange_rate: float = 1300.0,
+                    step_seconds: float = 900.0) -> Optional[List[Tuple[float, float]]]:
+    """
+    gtfuel.csv 의 (출력 [MW], 연료비 [$/sec]) 측정점을 (MW, KRW/스텝) 점 목록으로 변환.
+    파일이나 컬럼이 없으면 None.
+    """
+    if not os.path.exists(path):
+        return None
+    df = pd.read_csv(path)
+    df.columns = [c.lower().strip().replace(" ", "_") for c in df.columns]
+
+    pow_col = next((c for c in df.columns if 'power' in c and 'mw' in c), None)
+    cost_col = next((c for c in df.columns if 'cost' in c and 'sec' in c), None)
+    if not (pow_col and cost_col):
+        return None
+
+    x = pd.to_numeric(df[pow_col], errors='coerce')
+    y = pd.to_numeric(df[cost_col], errors='coerce')
+    valid = x.notnull() & y.notnull()
+    if not valid.any():
+        return None
+
+    # $/sec -> KRW/스텝 (기본 15분 = 900초)
+    y = y[valid] * exchange_rate * step_seconds
+    return sorted(zip(x[valid].astype(float).tolist(), y.astype(float).tolist()))
+
+
+def convex_hull_points(points: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    # 하부 볼록 껍질 (monotone chain). 측정값의 작은 요철 때문에 기울기가 줄어드는 구간을 없앤다
+    pts = sorted(set((float(p), float(c)) for p, c in points))
+    hull: List[Tuple[float, float]] = []
+    for p in pts:
+        while len(hull) >= 2:
+            (x1, y1), (x2, y2) = hull[-2], hull[-1]
+            if (x2 - x1) * (p[1] - y1) - (y2 - y1) * (p[0] - x1) <= 0:
+                hull.pop()
+            else:
+                break
+        hull.append(p)
+    return hull
+
+
+def pwl_segments(points: List[Tuple[float, float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    breakpoint 목록 → epigraph 선분 (slope, intercept).
+    cost >= slope_k * P + intercept_k (모든 k) 가 볼록 PWL 비용과 같다.
+    """
+    hull = convex_hull_points(points)
+    if len(hull) < 2:
+        raise ValueError("PWL cost needs at least two distinct breakpoints")
+    x = np.array([p for p, _ in hull])
+    y = np.array([c for _, c in hull])
+    slopes = np.diff(y) / np.diff(x)
+    intercepts = y[:-1] - slopes * x[:-1]
+    return slopes, intercepts
+
+
+def evaluate_pwl(points: List[Tuple[float, float]], p) -> np.ndarray:
+    # epigraph 최적값 = 선분들의 최대값 (breakpoint 범위 밖은 끝 선분 연장)
+    slopes, intercepts = pwl_segments(points)
+    p = np.asarray(p, dtype=float)
+    return np.max(slopes * p[..., None] + intercepts, axis=-1)
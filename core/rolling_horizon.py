@@ -0,0 +1,117 @@
+# core/rolling_horizon.py
+
+from dataclasses import replace
+from typing import Dict, Optional
+
+import numpy as np
+
+from state.schemas import EDParams, EDSolution
+from core.dynamic_solver import DEFAULT_GRID_PRICE, solve_dynamic_ed
+from core.pwl_cost import evaluate_pwl
+
+
+def _slice(profile, start: int, end: int):
+    return list(profile[start:end]) if profile else profile
+
+
+def window_params(params: EDParams, start: int, end: int,
+                  soc_mwh: Dict[str, float], gen_prev: Dict[str, float]) -> EDParams:
+    # [start, end) 구간만 잘라낸 EDParams. ESS SOC / 발전기 직전 출력은 이전 window 에서 이어받음
+    ess = None
+    if params.ess:
+        ess = {e: replace(spec, initial_soc=soc_mwh[e] / spec.capacity_mwh)
+               for e, spec in params.ess.items()}
+
+    return replace(
+        params,
+        time_steps=end - start,
+        demand_profile=_slice(params.demand_profile, start, end),
+        pv_profile=_slice(params.pv_profile, start, end),
+        grid_price_profile=_slice(params.grid_price_profile, start, end),
+        timestamps=_slice(params.timestamps, start, end),
+        ess=ess,
+        initial_gen_output=dict(gen_prev) if gen_prev else None,
+        # 마지막 스텝 목표는 원래 horizon 의 끝을 포함하는 window 에만 적용
+        terminal_soc=params.terminal_soc if end == params.time_steps else None,
+        terminal_gen_output=params.terminal_gen_output if end == params.time_steps else None,
+    )
+
+
+def _committed_cost(params: EDParams, sol: EDSolution, n: int) -> float:
+    # window 목적함수에는 확정되지 않은 뒷부분과 기본요금이 섞여 있으므로
+    # 확정 구간 [0, n) 의 변동비만 다시 계산한다
+    cost = 0.0
+    for g, spec in params.generators.items():
+        if spec.pwl_points:
+            cost += float(evaluate_pwl(spec.pwl_points, sol.schedule[f'P_{g}'][:n]).sum())
+            continue
+        for p in sol.schedule[f'P_{g}'][:n]:
+            if spec.a != 0 or spec.b != 0:
+                cost += spec.a * p**2 + spec.b * p + spec.c
+            elif spec.cost_coeff:
+                cost += p * spec.cost_coeff
+
+    prices = params.grid_price_profile or [DEFAULT_GRID_PRICE] * n
+    for p_grid, price in zip(sol.schedule['P_grid'][:n], prices[:n]):
+        # 수입/역송이 동시에 0 보다 큰 해는 최적이 아니므로 순 P_grid 의 양수부가 수입량
+        cost += max(p_grid, 0.0) * price
+
+    if params.ess:
+        for e, spec in params.ess.items():
+            cost += sum(sol.ess_schedule[e]['discharge'][:n]) * spec.aging_cost
+    return cost
+
+
+def solve_rolling_horizon(params: EDParams, window: int = 96, commit: int = 24,
+                          method: str = "rules", backend: Optional[str] = None,
+                          tee: bool = False) -> EDSolution:
+    """
+    Receding-horizon ED: window 스텝을 풀고 앞의 commit 스텝만 확정한 뒤 commit 만큼 전진.
+    한 번에 메모리에 올라가는 최적화 모델은 window 크기로 제한된다.
+    backend / tee 는 window 마다 solve_dynamic_ed 에 그대로 넘긴다 (기본: 자동 선택, 솔버 로그 없음).
+    """
+    if commit < 1 or commit > window:
+        raise ValueError(f"commit must be in [1, window]: commit={commit}, window={window}")
+
+    T = params.time_steps
+    gen_names = list(params.generators.keys())
+    ess_names = list(params.ess.keys()) if params.ess else []
+
+    soc_mwh = {e: s.initial_soc * s.capacity_mwh for e, s in (params.ess or {}).items()}
+    gen_prev = dict(params.initial_gen_output or {})
+
+    # 확정 구간 배열 조각을 모아 마지막에 한 번에 이어붙인다
+    chunks = {'P_grid': []}
+    chunks.update({f'P_{g}': [] for g in gen_names})
+    ess_chunks = {e: {'charge': [], 'discharge': [], 'soc': []} for e in ess_names}
+    variable_cost = 0.0
+
+    start = 0
+    while start < T:
+        end = min(start + window, T)
+        n = min(commit, end - start)
+        sub = window_params(params, start, end, soc_mwh, gen_prev)
+        print(f">> [Rolling] window {start}~{end - 1} (commit {n})")
+        sol = solve_dynamic_ed(sub, method=method, tee=tee, backend=backend)
+
+        # 앞 n 스텝만 확정
+        for key, values in sol.schedule.items():
+            chunks[key].append(values[:n])
+        for e in ess_names:
+            for key in ('charge', 'discharge', 'soc'):
+                ess_chunks[e][key].append(sol.ess_schedule[e][key][:n])
+        variable_cost += _committed_cost(sub, sol, n)
+
+        # 다음 window 초기조건: 확정 구간 마지막 SOC / 발전기 출력
+        for e in ess_names:
+            soc_mwh[e] = sol.ess_schedule[e]['soc'][n - 1]
+        gen_prev = {g: sol.schedule[f'P_{g}'][n - 1] for g in gen_names}
+        start += n
+
+    result = EDSolution()
+    result.schedule = {key: np.concatenate(parts) for key, parts in chunks.items()}
+    if ess_names:
+        result.ess_schedule = {e: {key: np.concatenate(parts) for key, parts in series.items()}
+                               for e, series in ess_chunks.items()}
+    result.cost = variable_cost + (params.base_rate if hasattr(params, 'base_rate') else 0.0)
+    return result
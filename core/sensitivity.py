@@ -0,0 +1,87 @@
+# core/sensitivity.py
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from state.schemas import EDParams, EDSolution
+from core.dynamic_solver import DEFAULT_GRID_PRICE
+
+
+@dataclass
+class Sensitivity:
+    base_cost: float
+    delta_cost: float
+    steps: List[int]
+
+    @property
+    def cost(self) -> float:
+        return self.base_cost + self.delta_cost
+
+
+def _require_duals(sol: EDSolution):
+    if not sol.marginal_price:
+        raise ValueError("EDSolution has no duals - solve with solve_dynamic_ed(..., duals=True)")
+
+
+def step_hours(params: EDParams) -> np.ndarray:
+    # 스텝별 시각 [h]. timestamps 가 없으면 FormulationAgent 와 같은 09:00 시작 가정
+    T = params.time_steps
+    if params.timestamps:
+        try:
+            hh_mm = [ts.split(" ")[-1].split(":") for ts in params.timestamps[:T]]
+            return np.array([int(h) + int(m) / 60.0 for h, m, *_ in hh_mm], dtype=float)
+        except (ValueError, IndexError):
+            pass
+    return (9.0 + np.arange(T) * params.dt_hours) % 24
+
+
+def steps_at(params: EDParams, start_hour: float, end_hour: Optional[float] = None) -> List[int]:
+    # [start_hour, end_hour) 에 걸친 스텝 (end 생략 시 start_hour 가 포함된 스텝 하나짜리 구간)
+    hours = step_hours(params)
+    end_hour = start_hour + params.dt_hours if end_hour is None else end_hour
+    return np.flatnonzero((hours >= start_hour) & (hours < end_hour)).tolist()
+
+
+def peak_steps(params: EDParams) -> List[int]:
+    # 요금이 가장 비싼 스텝들 (TOU 최대부하 시간대)
+    prices = np.asarray(params.grid_price_profile[:params.time_steps], dtype=float)
+    return np.flatnonzero(np.isclose(prices, prices.max())).tolist()
+
+
+def demand_sensitivity(sol: EDSolution, delta_mw: Union[float, Sequence[float], Dict[int, float]],
+                       steps: Optional[Sequence[int]] = None) -> Sensitivity:
+    """
+    수요 변화 Δd_t 에 대한 비용 변화 추정: Δcost ≈ Σ_t λ_t Δd_t  (λ = Balance 쌍대, O(T))
+    - delta_mw: 스칼라(steps 의 모든 스텝에 같은 값), 길이 T 배열, 또는 {t: Δ}
+    활성 제약이 바뀌지 않는 작은 변화에서만 정확하다 (큰 변화는 재최적화 필요).
+    """
+    _require_duals(sol)
+    lam = np.asarray(sol.marginal_price, dtype=float)
+    delta = np.zeros_like(lam)
+    if isinstance(delta_mw, dict):
+        for t, d in delta_mw.items():
+            delta[t] += d
+    elif np.ndim(delta_mw) == 0:
+        idx = np.arange(len(lam)) if steps is None else np.asarray(steps, dtype=int)
+        delta[idx] = float(delta_mw)
+    else:
+        delta[:] = np.asarray(delta_mw, dtype=float)
+    return Sensitivity(sol.cost, float(lam @ delta), np.flatnonzero(delta).tolist())
+
+
+def price_sensitivity(sol: EDSolution, params: EDParams, pct: float,
+                      steps: Optional[Sequence[int]] = None) -> Sensitivity:
+    """
+    계통 요금을 pct (0.05 = +5%) 만큼 바꿨을 때 비용 변화 추정.
+    envelope 정리: ∂cost/∂price_t = 수입량_t → Δcost ≈ Σ_t import_t · price_t · pct (O(T))
+    """
+    T = params.time_steps
+    prices = np.asarray(params.grid_price_profile[:T], dtype=float) if params.grid_price_profile \
+        else np.full(T, DEFAULT_GRID_PRICE)
+    imports = np.maximum(np.asarray(sol.schedule['P_grid'][:T], dtype=float), 0.0)
+    mask = np.zeros(T, dtype=bool)
+    mask[np.arange(T) if steps is None else np.asarray(steps, dtype=int)] = True
+    delta = float(np.sum(imports[mask] * prices[mask]) * pct)
+    return Sensitivity(sol.cost, delta, np.flatnonzero(mask).tolist())
@@ -0,0 +1,232 @@
+# core/solution_cache.py
+
+import argparse
+import dataclasses
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import ormsgpack
+import xxhash
+import zstandard
+
+from state.schemas import EDParams, EDSolution
+from core.dynamic_solver import solve_dynamic_ed
+
+# 포맷/모델이 바뀌면 올려서 예전 항목이 자동으로 무효가 되게 한다
+CACHE_VERSION = 3
+DEFAULT_CACHE_DIR = os.environ.get("ED_CACHE_DIR", os.path.join(".ed_cache", "solutions"))
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def _canonical(obj: Any) -> Any:
+    # 같은 입력이면 항상 같은 바이트가 나오도록 정규화
+    # - 숫자 목록은 float64 바이트로 (85 와 85.0, list 와 ndarray 가 같은 키)
+    # - dict 키 정렬은 ormsgpack OPT_SORT_KEYS 가 처리
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return {f.name: _canonical(getattr(obj, f.name)) for f in dataclasses.fields(obj)}
+    if isinstance(obj, dict):
+        return {str(k): _canonical(v) for k, v in obj.items()}
+    if isinstance(obj, np.ndarray) and obj.dtype.kind in "iuf":
+        return (obj.astype(np.float64) + 0.0).tobytes()
+    if isinstance(obj, (list, tuple, np.ndarray)):
+        if len(obj) and all(isinstance(v, (int, float, np.number)) and not isinstance(v, bool) for v in obj):
+            return (np.asarray(obj, dtype=np.float64) + 0.0).tobytes()
+        return [_canonical(v) for v in obj]
+    if isinstance(obj, (int, float, np.number)) and not isinstance(obj, bool):
+        return float(obj) + 0.0  # -0.0 → 0.0
+    return obj
+
+
+def params_key(params: EDParams, method: str = "rules", duals: bool = False) -> str:
+    payload = ormsgpack.packb(
+        {"version": CACHE_VERSION, "method": method, "duals": duals, "params": _canonical(params)},
+        option=ormsgpack.OPT_SORT_KEYS,
+    )
+    return xxhash.xxh3_128_hexdigest(payload)
+
+
+def _encode_solution(sol: EDSolution) -> bytes:
+    # 시계열은 float64 원시 바이트로 저장 후 전체를 zstd 압축
+    def series(values) -> bytes:
+        return np.asarray(values, dtype=np.float64).tobytes()
+
+    payload = {
+        "version": CACHE_VERSION,
+        "cost": float(sol.cost),
+        "schedule": {k: series(v) for k, v in sol.schedule.items()},
+        "ess_schedule": {e: {k: series(v) for k, v in s.items()} for e, s in (sol.ess_schedule or {}).items()},
+        "marginal_price": series(sol.marginal_price),
+        "duals": {n: {k: series(v) for k, v in d.items()} for n, d in (sol.duals or {}).items()},
+        "backend": sol.backend, "status": sol.status,
+        "build_time": sol.build_time, "solve_time": sol.solve_time,
+        "trace": sol.trace or {},
+    }
+    return zstandard.ZstdCompressor(level=3).compress(ormsgpack.packb(payload))
+
+
+def _decode_solution(blob: bytes) -> EDSolution:
+    payload = ormsgpack.unpackb(zstandard.ZstdDecompressor().decompress(blob))
+    if payload.get("version") != CACHE_VERSION:
+        raise ValueError(f"cache entry version {payload.get('version')} != {CACHE_VERSION}")
+
+    def series(raw: bytes) -> List[float]:
+        return np.frombuffer(raw, dtype=np.float64).tolist()
+
+    def array(raw: bytes) -> np.ndarray:
+        return np.frombuffer(raw, dtype=np.float64).copy()
+
+    return EDSolution(
+        cost=payload["cost"],
+        schedule={k: array(v) for k, v in payload["schedule"].items()},
+        ess_schedule={e: {k: array(v) for k, v in s.items()} for e, s in payload["ess_schedule"].items()},
+        marginal_price=series(payload["marginal_price"]),
+        duals={n: {k: series(v) for k, v in d.items()} for n, d in payload["duals"].items()},
+        backend=payload["backend"], status=payload["status"],
+        build_time=payload["build_time"], solve_time=payload["solve_time"],
+        trace=payload["trace"],
+    )
+
+
+class SolutionCache:
+    """
+    EDParams 해시(content address) → EDSolution 디스크 캐시.
+    항목 파일의 mtime 을 마지막 사용 시각으로 쓰고, 전체 크기가 max_bytes 를 넘으면 오래된 것부터 지운다 (LRU).
+    """
+
+    SUFFIX = ".edsol"
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + self.SUFFIX)
+
+    def _entries(self) -> List[Tuple[str, int, float]]:
+        # (path, size, mtime)
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        for sub in os.scandir(self.cache_dir):
+            if not sub.is_dir():
+                continue
+            for entry in os.scandir(sub.path):
+                if entry.name.endswith(self.SUFFIX):
+                    try:
+                        st = entry.stat()
+                    except FileNotFoundError:
+                        continue    # scandir 와 stat 사이에 다른 프로세스가 evict 한 항목
+                    entries.append((entry.path, st.st_size, st.st_mtime))
+        return entries
+
+    def get(self, key: str) -> Optional[EDSolution]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                sol = _decode_solution(f.read())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            # 깨진 항목은 지우고 miss 로 처리
+            print(f"   >> [Cache] Dropping unreadable entry {key}: {e}")
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)  # LRU: 사용 시각 갱신
+        except OSError:
+            pass            # 읽은 직후 다른 프로세스가 evict 한 경우 — 해는 이미 읽었으므로 그대로 돌려준다
+        return sol
+
+    def put(self, key: str, sol: EDSolution):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 다른 프로세스가 반쯤 쓴 파일을 읽지 않도록 임시 파일에 쓰고 rename
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(_encode_solution(sol))
+        os.replace(tmp, path)
+        self.evict()
+
+    def evict(self) -> int:
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        if total <= self.max_bytes:
+            return removed
+        for path, size, _ in sorted(entries, key=lambda e: e[2]):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+            removed += 1
+        return removed
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self._entries()
+        mtimes = [m for _, _, m in entries]
+        return {
+            "cache_dir": os.path.abspath(self.cache_dir),
+            "entries": len(entries),
+            "total_bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            "oldest": min(mtimes) if mtimes else None,
+            "newest": max(mtimes) if mtimes else None,
+        }
+
+    def clear(self) -> int:
+        entries = self._entries()
+        for path, _, _ in entries:
+            self._remove(path)
+        return len(entries)
+
+
+def cached_solve_dynamic_ed(params: EDParams, method: str = "rules", tee: bool = True,
+                            backend: Optional[str] = None, duals: bool = False,
+                            cache: Optional[SolutionCache] = None) -> EDSolution:
+    # 같은 EDParams 는 디스크에서 바로 꺼내고, 없을 때만 solve_dynamic_ed
+    cache = cache or SolutionCache()
+    t0 = time.perf_counter()
+    key = params_key(params, method, duals)
+    sol = cache.get(key)
+    if sol is not None:
+        print(f"   >> [Cache] Hit {key[:12]} ({(time.perf_counter() - t0) * 1000:.1f} ms)")
+        return sol
+
+    sol = solve_dynamic_ed(params, method=method, tee=tee, backend=backend, duals=duals)
+    cache.put(key, sol)
+    return sol
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ED solution cache")
+    parser.add_argument("command", choices=["stats", "list", "clear"])
+    parser.add_argument("--dir", default=DEFAULT_CACHE_DIR)
+    args = parser.parse_args(argv)
+
+    cache = SolutionCache(args.dir)
+    if args.command == "stats":
+        s = cache.stats()
+        print(f"Cache dir : {s['cache_dir']}")
+        print(f"Entries   : {s['entries']}")
+        print(f"Size      : {s['total_bytes'] / 1024:,.1f} KiB / {s['max_bytes'] / 1024 / 1024:,.0f} MiB")
+        if s["entries"]:
+            print(f"Oldest use: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(s['oldest']))}")
+            print(f"Newest use: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(s['newest']))}")
+    elif args.command == "list":
+        for path, size, mtime in sorted(cache._entries(), key=lambda e: e[2], reverse=True):
+            key = os.path.basename(path)[:-len(SolutionCache.SUFFIX)]
+            print(f"{key}  {size:>10,} B  {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(mtime))}")
+    else:
+        print(f"Removed {cache.clear()} entries from {os.path.abspath(args.dir)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,315 @@
 # core/solver_interface.py
 
-from pyomo.opt import SolverFactory
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+import numpy as np
+import pyomo.environ as pyo
+from pyomo.contrib.solver.common.results import TerminationCondition
+from pyomo.contrib.solver.common.util import NoFeasibleSolutionError, NoOptimalSolutionError
+
 from state.schemas import EDSolution
+from core.instrumentation import SolveTrace, gurobi_stats, highs_stats, phase
+
+# 빠른 순서. in-memory(persistent) 인터페이스를 먼저, 파일 기반(cbc: LP 파일, ipopt: NL 파일)은 fallback
+BACKENDS = ["gurobi_persistent", "highs", "cbc", "ipopt"]
+# 2차 목적함수(GT 연료비)를 풀 수 있는 backend
+QP_BACKENDS = {"gurobi_persistent", "highs", "ipopt"}
+# DispatchModel 처럼 솔버 모델을 유지하면서 Param 만 갱신하는 용도
+PERSISTENT_BACKENDS = ["gurobi_persistent", "highs"]
+# backend 하나에 주는 최대 시간 [s]. 넘기면 그 backend 는 실패로 보고 다음 것으로 넘어간다
+# (예: size-limited Gurobi 가 실패한 뒤 HiGHS 가 큰 QP 를 끝없이 붙잡고 있는 경우 → ipopt)
+DEFAULT_TIME_LIMIT = 120.0
+
+_LIMIT_CONDITIONS = (TerminationCondition.maxTimeLimit, TerminationCondition.iterationLimit)
+_INFEASIBLE_CONDITIONS = (TerminationCondition.provenInfeasible, TerminationCondition.locallyInfeasible,
+                          TerminationCondition.infeasibleOrUnbounded)
+
+
+R = TypeVar("R")
+
+
+class SolverLimitError(RuntimeError):
+    # 시간/반복 한도에 걸려 최적해를 못 낸 경우. 모델 문제가 아니므로 다음 backend 로 넘어간다
+    pass
+
+
+def _new_solver(name: str):
+    if name == "gurobi_persistent":
+        from pyomo.contrib.solver.solvers.gurobi_persistent import GurobiPersistent
+        return GurobiPersistent()
+    if name == "highs":
+        from pyomo.contrib.solver.solvers.highs import Highs
+        return Highs()
+    if name == "ipopt":
+        from pyomo.contrib.solver.solvers.ipopt import Ipopt
+        return Ipopt()
+    if name == "cbc":
+        return pyo.SolverFactory("cbc")
+    raise ValueError(f"Unknown solver backend: {name}")
+
+
+def _configure(solver, tee: bool, time_limit: Optional[float]):
+    # v2 인터페이스 공통 설정. 해 적재는 run_solver 가 종료 조건을 확인한 뒤 한다
+    # (한도 초과를 '최적 아님' 예외와 구분해서 다음 backend 로 넘기기 위해)
+    solver.config.tee = tee
+    solver.config.time_limit = time_limit
+    solver.config.load_solutions = False
+    solver.config.raise_exception_on_nonoptimal_result = False
+    return solver
+
+
+def make_persistent_solver(name: str, tee: bool = False, warm_start: bool = True,
+                           time_limit: Optional[float] = DEFAULT_TIME_LIMIT):
+    # 솔버 모델을 메모리에 유지하고 변경분만 전달하는 v2 persistent 인터페이스
+    if name not in PERSISTENT_BACKENDS:
+        raise ValueError(f"Unknown persistent solver: {name}")
+    solver = _configure(_new_solver(name), tee, time_limit)
+    if name == "gurobi_persistent" and warm_start:
+        # barrier 는 basis 를 재사용하지 않으므로 dual simplex 로 warm start
+        solver.config.solver_options["Method"] = 1
+
+    # 구조는 고정, 바뀌는 건 Param 값뿐 → 매 solve 마다의 구조 검사 생략
+    updates = solver.config.auto_updates
+    updates.check_for_new_or_removed_constraints = False
+    updates.check_for_new_or_removed_vars = False
+    updates.check_for_new_or_removed_params = False
+    updates.check_for_new_objective = False
+    updates.update_constraints = False
+    updates.update_vars = False
+    updates.update_named_expressions = False
+    updates.update_parameters = True
+    updates.update_objective = False
+    return solver
+
+
+@lru_cache(maxsize=None)
+def is_available(name: str) -> bool:
+    try:
+        solver = _new_solver(name)
+        if name == "cbc":
+            return bool(solver.available(exception_flag=False))
+        return bool(solver.available())
+    except Exception:
+        return False
+
+
+def available_backends() -> List[str]:
+    return [b for b in BACKENDS if is_available(b)]
+
+
+def candidate_backends(quadratic: bool, prefer: Optional[str] = None,
+                       persistent_only: bool = False) -> List[str]:
+    # prefer 가 있으면 맨 앞에, 나머지는 BACKENDS 순서대로 (사용 가능 + 문제 유형에 맞는 것만)
+    order = PERSISTENT_BACKENDS if persistent_only else BACKENDS
+    names = ([prefer] if prefer else []) + [b for b in order if b != prefer]
+    names = [b for b in names if is_available(b) and (not quadratic or b in QP_BACKENDS)]
+    if not names:
+        kind = "QP" if quadratic else "LP"
+        raise RuntimeError(f"No available solver backend for {kind} (tried: {order})")
+    return names
+
+
+def is_quadratic(model) -> bool:
+    obj = next(model.component_data_objects(pyo.Objective, active=True))
+    degree = obj.expr.polynomial_degree()
+    return degree is None or degree > 1
+
+
+def _wants_duals(model) -> bool:
+    dual = model.component("dual")
+    return isinstance(dual, pyo.Suffix) and dual.import_enabled()
+
+
+def run_solver(solver, model, load: bool = True):
+    """
+    v2 인터페이스로 풀고 최적일 때만 해를 모델에 적재한다 (load=False: 적재하지 않고 솔버에 둔다 → primal_values).
+    시간/반복 한도 → SolverLimitError (다음 backend 로), infeasible → NoFeasibleSolutionError,
+    그 밖의 비최적 종료 → NoOptimalSolutionError.
+    """
+    res = solver.solve(model)
+    cond = res.termination_condition
+    if cond in _LIMIT_CONDITIONS:
+        raise SolverLimitError(f"stopped by {cond.name} (time_limit={solver.config.time_limit} s)")
+    if cond != TerminationCondition.convergenceCriteriaSatisfied:
+        raise NoFeasibleSolutionError() if cond in _INFEASIBLE_CONDITIONS else NoOptimalSolutionError()
+    if load:
+        res.solution_loader.load_vars()
+    return res
+
+
+def native_model(solver):
+    # persistent 인터페이스 안의 gurobipy.Model / highspy.Highs (공개 accessor 가 없어 여기서만 꺼낸다)
+    return solver._solver_model
+
+
+def solver_columns(name: str, solver, var_list) -> Optional[Any]:
+    # var_list 의 솔버 쪽 열: Gurobi → gurobipy.Var 목록, HiGHS → 열 번호 배열 (솔버 모델에 없는 변수가 있으면 None)
+    var_map = solver._pyomo_var_to_solver_var_map
+    try:
+        cols = [var_map[id(v)] for v in var_list]
+    except KeyError:
+        return None
+    return cols if name == "gurobi_persistent" else np.asarray(cols, dtype=np.int64)
+
+
+def load_primals(solver, var_list):
+    # load_solutions=False 로 푼 persistent 솔버의 해를 var_list 에만 적재
+    solver._load_vars(var_list)
+
+
+def primal_values(name: str, solver, columns) -> np.ndarray:
+    # 마지막 해의 열 값을 솔버 호출 한 번으로 (Gurobi getAttr("X", vars), HiGHS getSolution().col_value)
+    native = native_model(solver)
+    if name == "gurobi_persistent":
+        return np.asarray(native.getAttr("X", columns), dtype=np.float64)
+    return np.asarray(native.getSolution().col_value, dtype=np.float64)[columns]
+
+
+def backend_stats(name: str, solver) -> Dict[str, Any]:
+    # persistent backend 의 마지막 solve 통계 (core/instrumentation)
+    stats = gurobi_stats if name == "gurobi_persistent" else highs_stats
+    return stats(native_model(solver))
+
+
+def solve_with_fallback(backends: Sequence[str], attempt: Callable[[str], R],
+                        trace: Optional[SolveTrace] = None) -> Tuple[str, R]:
+    """
+    backends 순서대로 attempt(name) 를 시도해 처음 성공한 (name, 결과) 를 돌려준다.
+    라이선스/설치 문제, time_limit 초과 등은 다음 backend 로 넘어가고,
+    infeasible 등 모델 자체 문제는 다른 솔버로 바꿔도 같으므로 그대로 예외를 올린다.
+    trace 가 있으면 실패한 backend 의 phase 는 지우고 solver_stats["failed_backends"] 에 남긴다.
+    """
+    errors = []
+    for name in backends:
+        n_phases = len(trace.phases) if trace is not None else 0
+        try:
+            return name, attempt(name)
+        except (NoOptimalSolutionError, NoFeasibleSolutionError):
+            raise
+        except Exception as e:
+            print(f"   >> [Solver] '{name}' failed ({type(e).__name__}: {e}), trying next backend")
+            errors.append(f"{name}: {e}")
+            if trace is not None:
+                del trace.phases[n_phases:]
+                trace.solver_stats.setdefault("failed_backends", []).append(name)
+    raise RuntimeError("All solver backends failed: " + "; ".join(errors))
+
+
+class PersistentSolver:
+    """
+    persistent backend 하나를 유지하면서 같은 모델을 반복해서 푼다 (DispatchModel, 분해 블록).
+    solve 가 실패(라이선스/설치 문제, time_limit 초과)하면 solve_with_fallback 으로 다음 persistent backend 의
+    솔버 모델을 새로 만들어 다시 푼다.
+    """
+
+    def __init__(self, quadratic: bool, prefer: Optional[str] = None, tee: bool = False,
+                 time_limit: Optional[float] = DEFAULT_TIME_LIMIT):
+        self.backends = candidate_backends(quadratic, prefer=prefer, persistent_only=True)
+        self.tee = tee
+        self.time_limit = time_limit
+        self._use(self.backends[0])
+
+    def _use(self, name: str):
+        self.name = name
+        self.solver = make_persistent_solver(name, self.tee, time_limit=self.time_limit)
+
+    def solve(self, model, load: bool = True):
+        def attempt(name):
+            if name != self.name:
+                self._use(name)
+            return run_solver(self.solver, model, load)
+
+        _, res = solve_with_fallback(self.backends[self.backends.index(self.name):], attempt)
+        return res
+
+    def stats(self) -> Dict[str, Any]:
+        return backend_stats(self.name, self.solver)
+
+
+def _solve_with(name: str, model, tee: bool, trace: Optional[SolveTrace] = None,
+                time_limit: Optional[float] = DEFAULT_TIME_LIMIT, solvers: Optional[Dict[str, Any]] = None,
+                load_solutions: bool = True) -> str:
+    if name == "cbc":
+        # legacy 인터페이스는 model.dual Suffix 가 있으면 알아서 채운다 (LP 파일 쓰기도 solve 에 포함)
+        opt = _new_solver(name)
+        if time_limit is not None:
+            opt.options["sec"] = time_limit
+        with phase(trace, "solve"):
+            res = opt.solve(model, tee=tee)
+        cond = res.solver.termination_condition
+        if cond in (pyo.TerminationCondition.maxTimeLimit, pyo.TerminationCondition.maxIterations):
+            raise SolverLimitError(f"stopped by {cond} (time_limit={time_limit} s)")
+        if cond != pyo.TerminationCondition.optimal:
+            raise NoOptimalSolutionError()
+        if trace is not None:
+            trace.solver_stats.update(status=str(cond))
+        return str(cond)
+
+    if name in PERSISTENT_BACKENDS:
+        # 솔버 모델로 옮기는 단계(transfer)와 실제 최적화(solve)를 나눠서 잰다
+        solver = solvers.get(name) if solvers is not None else None
+        if solver is None:
+            # 다시 쓸 솔버(solvers 보관함)는 basis 를 재사용하도록 warm start 설정
+            solver = make_persistent_solver(name, tee, warm_start=solvers is not None, time_limit=time_limit)
+            # Param 변경분은 아래 transfer 단계에서 직접 넘긴다 (solve 안에서 다시 검사하지 않도록)
+            solver.config.auto_updates.update_parameters = False
+            with phase(trace, "transfer"):
+                solver.set_instance(model)
+            if solvers is not None:
+                solvers[name] = solver
+        else:
+            # 템플릿과 같이 캐시된 솔버: 구조는 그대로이므로 바뀐 Param 값만 넘기고 이전 해에서 다시 푼다
+            solver.config.tee = tee
+            solver.config.time_limit = time_limit
+            with phase(trace, "transfer"):
+                solver.update_parameters()
+        with phase(trace, "solve"):
+            res = run_solver(solver, model, load_solutions or solvers is None)
+        if trace is not None:
+            trace.solver_stats.update(backend_stats(name, solver))
+    else:
+        # ipopt: NL 파일 쓰기가 solve 안에 포함
+        with phase(trace, "solve"):
+            res = run_solver(_configure(_new_solver(name), tee, time_limit), model)
+        if trace is not None:
+            trace.solver_stats.update(status=str(res.termination_condition),
+                                      iterations=res.extra_info.get("iteration_count"))
+    if trace is not None and res.incumbent_objective is not None:
+        # 목적함수 값은 솔버가 보고한 값을 쓴다 (Pyomo 식을 다시 평가하지 않도록)
+        trace.solver_stats["objective"] = float(res.incumbent_objective)
+    if _wants_duals(model):
+        # v2 인터페이스는 Suffix 를 쓰지 않으므로 solution_loader 에서 옮겨 담는다
+        for con, val in res.solution_loader.get_duals().items():
+            model.dual[con] = val
+    return str(res.termination_condition)
+
+
+def solve_model(model, backend: Optional[str] = None, tee: bool = False,
+                trace: Optional[SolveTrace] = None, time_limit: Optional[float] = DEFAULT_TIME_LIMIT,
+                solvers: Optional[Dict[str, Any]] = None, load_solutions: bool = True) -> Tuple[str, str, float]:
+    """
+    가장 빠른 사용 가능 backend 로 Pyomo 모델을 풀고, 실패(라이선스/설치 문제, time_limit 초과 등)하면
+    다음 backend 로 넘어간다.
+    infeasible 등 모델 자체 문제는 다른 솔버로 바꿔도 같으므로 그대로 예외를 올린다.
+    solvers: model 전용 persistent 솔버 보관함 {backend: solver} (core/model_template). 주면 처음 만든 솔버를
+    넣어 두고, 다음 호출부터는 솔버 모델을 다시 만들지 않고 바뀐 Param 만 넘겨 다시 푼다.
+    load_solutions=False: persistent backend 의 해를 Pyomo 변수에 옮기지 않는다 (solvers[backend] 에서
+    primal_values 로 한 번에 꺼낸다). cbc/ipopt 는 항상 적재.
+    Returns: (backend, termination status, solve time [s])
+    """
+    def attempt(name):
+        t0 = time.perf_counter()
+        status = _solve_with(name, model, tee, trace, time_limit, solvers, load_solutions)
+        return status, time.perf_counter() - t0
 
-def solve_with_pyomo(model, use_gurobi=True):
-    solver = SolverFactory("gurobi" if use_gurobi else "cbc")
-    result = solver.solve(model, tee=False)
+    name, (status, solve_time) = solve_with_fallback(candidate_backends(is_quadratic(model), prefer=backend),
+                                                     attempt, trace)
+    return name, status, solve_time
 
-    P1 = float(model.P1.value)
-    P2 = float(model.P2.value)
-    cost = float(model.obj())
 
-    return EDSolution(
-        Pg={"G1": P1, "G2": P2},
-        cost=cost,
-        note=str(result.solver.termination_condition)
-    )
+def solve_with_pyomo(model, backend: Optional[str] = None, tee: bool = False) -> EDSolution:
+    name, status, solve_time = solve_model(model, backend=backend, tee=tee)
+    obj = next(model.component_data_objects(pyo.Objective, active=True))
+    return EDSolution(cost=float(pyo.value(obj)), backend=name, status=status, solve_time=solve_time)
@@ -1,20 +1,35 @@
+import os
+import sys
 import pandas as pd
 import numpy as np
 from pathlib import Path
 
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.load_transform import LoadTransform, SiteSpec, transform_chunks
+from utils.profile_stats import LoadProfileStats
+from utils.supercloud_ingest import BinAggregate
+
 # ================== 설정 ==================
 DATA_DIR = Path(r"D:\data_center_ed_agent\datacenter_load")
-FILE_NAME = "1_day_data_scaled_300MW_PUE1.5.csv"
+FILE_NAME = "1_day_data.csv"   # 원시 1초 GPU 전력 (timestamp, power_draw_W)
+
+# 사이트 규모/PUE: 원시 IT 부하 peak 을 it_peak_mw 로 맞춘 뒤 PUE 적용 (읽으면서 변환, 중간 CSV 없음)
+# 첫 번째 사이트 → ED 입력 dc_profile_15min_ED.csv, 나머지 → dc_profile_15min_<규모>_<PUE>.csv (같은 스캔)
+# 예: SiteSpec(100, pue=[(0.2, 1.6), (1.0, 1.3)])  → 이용률에 따라 PUE 1.6 → 1.3
+SITES = [SiteSpec(it_peak_mw=300, pue=1.5)]
 
 # 전체 부하 컬럼 이름 (1~3단계 결과에서 썼던 이름)
 TOTAL_COL = "power_total_scaled_MW"
 
-# 유닉스 타임스탬프가 들어있는 컬럼 이름 (여기를 실제 컬럼명으로 바꿔줘!)
-UNIX_COL = "timestamp"   # 예: "timestamp" 또는 "time" 등
-
 # ED 타임스텝: 15분
-ED_FREQ = "15T"   # 15-minute
+ED_FREQ = "15min"   # 15-minute
 ED_DT_MIN = 15    # 15 minutes
+
+# 스트리밍 통계
+RAMP_WINDOWS = (1, 60, 900)   # 램프 창 길이 [s]: 1초, 1분, 15분
+CHUNKSIZE = 1_000_000         # CSV 한 번에 읽는 행 수
 # ======================================
 
 
@@ -23,73 +38,71 @@ def main():
     if not csv_path.exists():
         raise FileNotFoundError(f"파일을 찾을 수 없습니다: {csv_path}")
 
-    df = pd.read_csv(csv_path)
-
-    if TOTAL_COL not in df.columns:
-        raise ValueError(f"CSV에 '{TOTAL_COL}' 컬럼이 없습니다. 실제 컬럼명을 확인해 주세요.")
-
-    if UNIX_COL not in df.columns:
-        raise ValueError(f"CSV에 유닉스 타임 컬럼 '{UNIX_COL}' 이 없습니다. 실제 컬럼명을 확인해 주세요.")
-
     # ------------------------------------------------
-    # 1) Unix time(초, UTC 기준)을 KST(datetime)으로 변환
-    #    예: 1617408000 → 2021-04-03 09:00:00 (KST)
+    # 1) 원시 1초 데이터를 chunk 로 한 번만 스캔 (전체를 메모리에 올리지 않음)
+    #    - 사이트별 규모/PUE/단위 변환 (W → MW) 을 chunk 마다 벡터 연산으로
+    #    - 15분 bin 별 합/개수 → ED 프로파일
+    #    - 1초/1분/15분 창 통계 (피크, 부하율, 램프, 분위수 스케치)
     # ------------------------------------------------
-    df["timestamp_kst"] = (
-        pd.to_datetime(df[UNIX_COL], unit="s", utc=True)   # UTC 기준 datetime
-          .dt.tz_convert("Asia/Seoul")                     # KST(UTC+9)로 변환
-          .dt.tz_localize(None)   # ← 이 줄이 tz 정보 제거
-    )
-
-    # 리샘플을 위해 index를 KST timestamp로 설정
-    df = df.set_index("timestamp_kst")
+    dt_seconds = ED_DT_MIN * 60
+    transform = LoadTransform.from_file(str(csv_path), SITES, CHUNKSIZE)
+    stats = {s.label: LoadProfileStats(RAMP_WINDOWS) for s in SITES}
+    bins = {s.label: BinAggregate() for s in SITES}
+    for ts, cols in transform_chunks(str(csv_path), transform, CHUNKSIZE):
+        keys = (ts // dt_seconds).astype(np.int64) * dt_seconds
+        for label, P in cols.items():
+            stats[label].add(ts, P)
+            bins[label] = bins[label].merge(BinAggregate.reduce(keys, P))
 
     # ------------------------------------------------
-    # 2) 15분 평균으로 리샘플링 (ED 타임스텝용 프로파일 생성)
+    # 2) 15분 평균 프로파일 (ED 타임스텝용)
+    #    Unix time(초, UTC 기준)을 KST(datetime)으로 변환
+    #    예: 1617408000 → 2021-04-03 09:00:00 (KST)
     # ------------------------------------------------
-    df_15min = df.resample(ED_FREQ).mean()
-
-    # ED에 쓸 부하 시계열
-    P_15 = df_15min[TOTAL_COL].to_numpy(dtype=float)
-    N_15 = len(P_15)
-
-    # 15분 간격 (초/시간 기준)
+    def profile_15min(b: BinAggregate) -> pd.DataFrame:
+        return pd.DataFrame({
+            "timestamp_kst": (
+                pd.to_datetime(b.keys, unit="s", utc=True)   # UTC 기준 datetime
+                  .tz_convert("Asia/Seoul")                  # KST(UTC+9)로 변환
+                  .tz_localize(None)   # ← 이 줄이 tz 정보 제거
+            ),
+            TOTAL_COL: b.sums / b.counts,
+        }).set_index("timestamp_kst").resample(ED_FREQ).mean()   # 빈 bin 은 기존처럼 NaN 행
+
+    site = SITES[0]
+    summary = stats[site.label].summary()
+    df_15min = profile_15min(bins[site.label])
+    N_15 = len(df_15min)
+
+    # 15분 간격 (시간 기준)
     dt_min = ED_DT_MIN
     dt_hours = dt_min / 60.0
-    dt_seconds = dt_min * 60.0
 
     # ------------------------------------------------
     # 3) 15분 기준 부하율 (Load factor)
     # ------------------------------------------------
-    P_peak_15 = P_15.max()
-    P_avg_15 = P_15.mean()
-    load_factor_15 = P_avg_15 / P_peak_15 if P_peak_15 > 0 else np.nan
+    s15 = summary[float(dt_seconds)]
+    P_peak_15 = s15["peak"]
+    P_avg_15 = s15["mean"]
+    load_factor_15 = s15["load_factor"]
 
     # ------------------------------------------------
-    # 4) 15분 램프 특성 (ΔP/Δt)
+    # 4) 램프 특성 (ΔP/Δt): 1초 / 1분 / 15분 창 (p95 는 상대 오차 1% 스케치)
     # ------------------------------------------------
-    dP_15 = np.diff(P_15)  # MW 단위 차이 (15분 간격)
-
-    # MW per 15min (그냥 dP 자체)
-    ramp_MW_per_15min = dP_15
-
-    # MW per min
-    ramp_MW_per_min = dP_15 / dt_min
-
     ramp_stats_15 = {
-        "max_up_MW_per_15min": np.max(ramp_MW_per_15min),
-        "max_down_MW_per_15min": np.min(ramp_MW_per_15min),
-        "p95_abs_MW_per_15min": np.percentile(np.abs(ramp_MW_per_15min), 95),
+        "max_up_MW_per_15min": s15["ramp_max_up"],
+        "max_down_MW_per_15min": s15["ramp_max_down"],
+        "p95_abs_MW_per_15min": s15["ramp_p95_abs"],
 
-        "max_up_MW_per_min": np.max(ramp_MW_per_min),
-        "max_down_MW_per_min": np.min(ramp_MW_per_min),
-        "p95_abs_MW_per_min": np.percentile(np.abs(ramp_MW_per_min), 95),
+        "max_up_MW_per_min": s15["ramp_max_up_per_min"],
+        "max_down_MW_per_min": s15["ramp_max_down_per_min"],
+        "p95_abs_MW_per_min": s15["ramp_p95_abs_per_min"],
     }
 
     # ------------------------------------------------
     # 5) 15분 기준 에너지 (하루/연간)
     # ------------------------------------------------
-    E_day_MWh_15 = P_15.sum() * dt_hours
+    E_day_MWh_15 = s15["mean"] * s15["blocks"] * dt_hours
     E_year_GWh_15 = E_day_MWh_15 * 365.0 / 1000.0
 
     # ------------------------------------------------
@@ -97,12 +110,18 @@ def main():
     # ------------------------------------------------
     out_profile_path = DATA_DIR / "dc_profile_15min_ED.csv"
     df_15min.reset_index()[["timestamp_kst", TOTAL_COL]].to_csv(out_profile_path, index=False)
+    extra_paths = {}
+    for other in SITES[1:]:
+        extra_paths[other.label] = DATA_DIR / f"dc_profile_15min_{other.label}.csv"
+        profile_15min(bins[other.label]).reset_index()[["timestamp_kst", TOTAL_COL]].to_csv(
+            extra_paths[other.label], index=False)
 
     # ------------------------------------------------
     # 7) 결과 출력
     # ------------------------------------------------
     print("===== 15분 ED 프로파일 & 램프 보완 결과 =====")
-    print(f"입력 파일(1초): {csv_path}")
+    print(f"입력 파일(1초): {csv_path} (원시 peak {transform.reference_w / 1e3:.1f} kW)")
+    print(f"사이트: IT peak {site.it_peak_mw:g} MW, PUE {site.pue if np.isscalar(site.pue) else 'curve'}")
     print(f"출력 파일(15분 ED 프로파일): {out_profile_path}")
     print()
     print(f"1초 → 15분 리샘플링 후 스텝 수: {N_15} 개 (하루 96개 예상)")
@@ -120,9 +139,23 @@ def main():
     print(f"95% 절대값: {ramp_stats_15['p95_abs_MW_per_15min']:.3f} MW/15min "
           f"({ramp_stats_15['p95_abs_MW_per_min']:.3f} MW/min)")
     print()
+    print("---- 창 길이별 램프 (MW/min) ----")
+    for w in RAMP_WINDOWS:
+        r = summary[float(w)]
+        print(f"{w:>5d} s: 상승 {r['ramp_max_up_per_min']:.3f}, 하락 {r['ramp_max_down_per_min']:.3f}, "
+              f"p95 |ΔP| {r['ramp_p95_abs_per_min']:.3f}, p99 |ΔP| {r['ramp_p99_abs_per_min']:.3f}")
+    print()
     print("---- 15분 기준 에너지 ----")
     print(f"하루 에너지: {E_day_MWh_15:.2f} MWh")
     print(f"연간 에너지(365일 가정): {E_year_GWh_15:.2f} GWh")
+    if extra_paths:
+        print()
+        print("---- 다른 사이트 규모 (같은 스캔) ----")
+        for other in SITES[1:]:
+            o15 = stats[other.label].summary()[float(dt_seconds)]
+            print(f"{other.label}: 피크 {o15['peak']:.3f} MW, 평균 {o15['mean']:.3f} MW, "
+                  f"부하율 {o15['load_factor']:.4f}, 하루 {o15['mean'] * o15['blocks'] * dt_hours:.2f} MWh "
+                  f"→ {extra_paths[other.label]}")
     print("=============================================")
 
 
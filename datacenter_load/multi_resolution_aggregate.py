@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+# MIT Supercloud GPU trace → 여러 해상도 부하 프로파일을 한 번의 스캔으로 생성
+# (10_sec_data.csv, 1_min_data.csv, 15_min_data.csv, 1_hour_data.csv … 를 따로 만들던 것을 대체)
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.supercloud_ingest import aggregate_supercloud_multi_resolution, utc_ts
+
+# ================== 설정 ==================
+BASE_DIR = r"D:\MIT Supercloud Dataset\202201\gpu"     # 0001~0099 폴더를 포함하는 상위 디렉토리
+SAVE_DIR = r"C:\Users\Myungsuk\Desktop\새 폴더"
+
+# 분석 기간 (UTC)
+START_TS = utc_ts(2021, 4, 1, 0, 0, 0)
+END_TS = utc_ts(2021, 4, 30, 23, 59, 59)
+
+FOLDERS = [f"{i:04d}" for i in range(1, 100)]
+RESOLUTIONS = [0.1, 1, 10, 60, 900, 3600]   # [s], 모두 가장 고운 해상도의 배수이고 가장 거친 해상도의 약수
+WORKERS = None                              # None: CPU 수
+MEMMAP_DIR = os.path.join(SAVE_DIR, "_agg_memmap")   # 큰 base 배열은 디스크 memmap (None: 메모리)
+CHUNKSIZE = 1_000_000
+# ======================================
+
+
+def main():
+    if not os.path.isdir(BASE_DIR):
+        print("ERROR: BASE_DIR 경로가 없습니다:", BASE_DIR)
+        sys.exit(1)
+    os.makedirs(SAVE_DIR, exist_ok=True)
+
+    agg, stats = aggregate_supercloud_multi_resolution(
+        BASE_DIR, FOLDERS, START_TS, END_TS, resolutions=RESOLUTIONS,
+        workers=WORKERS, memmap_dir=MEMMAP_DIR, chunksize=CHUNKSIZE,
+    )
+    for label, df in agg.frames().items():
+        out_path = os.path.join(SAVE_DIR, f"load_{label}.csv")
+        df.to_csv(out_path, index=False)
+        print(f"[{label}] {len(df):,} bins → {out_path}")
+    agg.close(remove=True)
+    print(f"처리량: {stats.rows_per_s:,.0f} rows/s, {stats.mb_per_s:,.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,96 +1,80 @@
+import os
+import sys
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.profile_store import load_profile
+from utils.pv_profile import read_pv_year_profile
+
 # ================== 설정 ==================
-DATA_DIR = Path(r"D:\data_center_ed_agent\datacenter_load")
+DATA_DIR = Path(__file__).resolve().parent    # 엑셀이 이 스크립트 옆에 있음 (ParsingAgent 와 같은 캐시 항목)
 
-PV_EXCEL_FILE = "한국남부_남제주소내태양광_2020.xlsx"  # 원본 PV p.u. 데이터
+PV_EXCEL_FILE = "한국남부_남제주소내태양광_2020.xlsx"  # 원본 PV p.u. 데이터 (365일 × 24시간)
 P_RATED_MW = 100.0                                   # PV 설비 용량 [MW]
 
-# 사용할 날짜 (0-based index)
-# 0 → 엑셀에서 실제 1일차(2020-01-01)
-TARGET_DAY_INDEX = 0
+# 엑셀 1일차를 놓을 날짜 (엑셀에 날짜가 없음)
+# DC 부하와 같은 해로 두면 2021-04-03 ED 는 엑셀의 4월 3일 PV 를 쓴다
+PROFILE_START = "2021-01-01"
 
-# ED 기준 시작 시간 (DC 부하 기준 시간축과 맞추고 싶으면 여기 조정)
-ED_START_KST = pd.Timestamp("2021-04-03 09:00:00", tz="Asia/Seoul")
+# 출력 해상도 [분] → 1년 365 × 96 = 35,040 step
+ED_STEP_MIN = 15
 
-# 출력 해상도
-ED_FREQ = "15min"
+# 1시간 → 15분 보간
+# "ffill": 계단 (기존 방식), "linear": 선형, "energy": 선형 모양 + 시간별 에너지 보존
+INTERPOLATION = "ffill"
 
-# 시간 시프트 (예: -9 → 전체 타임스탬프를 9시간 앞으로 당김)
-TIME_SHIFT_HOURS = -9
+# 시간 시프트 (엑셀 시각이 KST 가 아닐 때만, 예: UTC 표 → +9)
+TIME_SHIFT_HOURS = 0
 
-# 출력 파일 이름
-OUT_FILE = "pv_profile_15min_ED_final.csv"
+# 출력 파일 이름 (None 이면 CSV 생략, ED 쪽은 profile store 캐시를 바로 읽는다)
+OUT_FILE = "pv_profile_15min_year.csv"
 # ======================================
 
 
 def main():
-    # 1) 엑셀 읽기 (header 없음)
+    # 1) 엑셀 전체 (365 × 24 p.u.) → 15분 연간 시계열 [MW] 을 한 번에 생성
+    #    결과는 profile store(.npy)에 캐시 → 엑셀이나 위 설정이 바뀔 때만 다시 만든다
     excel_path = DATA_DIR / PV_EXCEL_FILE
-    pv_raw = pd.read_excel(excel_path, header=None)
-
-    # 2) 헤더/인덱스 제거 후 순수 p.u. 데이터만 추출
-    #    row 0: 시간 헤더 (0~23), col 0: 날짜 인덱스 → 둘 다 제거
-    pv_pu_table = pv_raw.iloc[1:, 1:25].reset_index(drop=True)  # shape ~ (365, 24)
-
-    # 3) 특정 날짜(TARGET_DAY_INDEX)의 24시간 p.u. 값 선택
-    pv_pu_1h = pv_pu_table.iloc[TARGET_DAY_INDEX].to_numpy(dtype=float)
-
-    # 4) p.u. → MW 변환
-    pv_MW_1h = pv_pu_1h * P_RATED_MW
-
-    # 5) 1시간 단위 타임스탬프 생성 (KST)
-    t_index_1h = pd.date_range(
-        start=ED_START_KST,  # 예: 2021-04-03 09:00 ~ 24시간
-        periods=24,
-        freq="1H",
-    )
-
-    df_1h = (
-        pd.DataFrame({"timestamp_kst": t_index_1h, "pv_power_MW": pv_MW_1h})
-        .set_index("timestamp_kst")
+    profile = load_profile(
+        str(excel_path), read_pv_year_profile,
+        start=PROFILE_START, p_rated_mw=P_RATED_MW, step_min=ED_STEP_MIN,
+        method=INTERPOLATION, shift_hours=TIME_SHIFT_HOURS,
     )
-
-    # 6) 15분 해상도로 리샘플링 (에너지 보존 위해 ffill)
-    df_15min = df_1h.resample(ED_FREQ).ffill()
-
-    # 7) 시간 시프트 적용 (전체 타임스탬프를 TIME_SHIFT_HOURS 만큼 이동)
-    if TIME_SHIFT_HOURS != 0:
-        df_15min.index = df_15min.index + pd.Timedelta(hours=TIME_SHIFT_HOURS)
-
-    # 8) 타임존 꼬리표(+09:00) 제거 → naive datetime으로 변환
-    if df_15min.index.tz is not None:
-        df_15min.index = df_15min.index.tz_localize(None)
-
-    # 9) 간단 검증 출력
-    dt_hours = 15.0 / 60.0
-    P_max = df_15min["pv_power_MW"].max()
-    P_avg = df_15min["pv_power_MW"].mean()
-    E_day = (df_15min["pv_power_MW"] * dt_hours).sum()
-    CF_day = E_day / (P_RATED_MW * 24.0) if P_RATED_MW > 0 else float("nan")
-
-    print("===== PV 15분 ED 프로파일 생성 결과 =====")
+    pv_MW = np.asarray(profile["pv_power_MW"])
+    times = profile.timestamps()
+
+    # 2) 간단 검증 출력
+    dt_hours = ED_STEP_MIN / 60.0
+    steps_per_day = 24 * 60 // ED_STEP_MIN
+    n_days = len(pv_MW) // steps_per_day
+    E_daily = pv_MW[:n_days * steps_per_day].reshape(n_days, steps_per_day).sum(axis=1) * dt_hours
+    E_year = pv_MW.sum() * dt_hours
+    CF_year = E_year / (P_RATED_MW * len(pv_MW) * dt_hours) if P_RATED_MW > 0 else float("nan")
+
+    print(f"===== PV {ED_STEP_MIN}분 ED 프로파일 생성 결과 (연간) =====")
     print(f"원본 엑셀: {excel_path}")
-    print(f"선택 day index: {TARGET_DAY_INDEX}")
-    print(f"시작 시각 (원래 기준): {ED_START_KST}")
+    print(f"보간 방식: {INTERPOLATION}")
     print(f"시간 시프트: {TIME_SHIFT_HOURS} 시간")
-    print(f"최종 시작 시각: {df_15min.index[0]}")
-    print(f"타임스텝 수: {len(df_15min)} (15분 기준 96 expected)")
+    print(f"기간: {times[0]} ~ {times[-1]}")
+    print(f"타임스텝 수: {len(pv_MW):,} ({n_days}일 × {steps_per_day})")
     print("---- 출력 특성 ----")
-    print(f"피크 출력:  {P_max:.3f} MW")
-    print(f"평균 출력:  {P_avg:.3f} MW")
-    print(f"하루 에너지: {E_day:.2f} MWh")
-    print(f"하루 CF: {CF_day:.4f}")
+    print(f"피크 출력:  {pv_MW.max():.3f} MW")
+    print(f"평균 출력:  {pv_MW.mean():.3f} MW")
+    print(f"연간 에너지: {E_year / 1000:.2f} GWh")
+    print(f"연간 CF: {CF_year:.4f}")
+    print(f"일 에너지 최소/평균/최대: {E_daily.min():.2f} / {E_daily.mean():.2f} / {E_daily.max():.2f} MWh")
     print("=======================================")
 
-    # 10) CSV 저장
-    out_path = DATA_DIR / OUT_FILE
-    df_15min.reset_index(names=["timestamp_kst"])[
-        ["timestamp_kst", "pv_power_MW"]
-    ].to_csv(out_path, index=False, encoding="utf-8-sig")
-
-    print(f"저장 완료: {out_path}")
+    # 3) CSV 저장
+    if OUT_FILE:
+        out_path = DATA_DIR / OUT_FILE
+        pd.DataFrame({"timestamp_kst": times, "pv_power_MW": pv_MW}).to_csv(
+            out_path, index=False, encoding="utf-8-sig")
+        print(f"저장 완료: {out_path}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+# MIT Supercloud GPU trace 병렬 집계
+# 2025종설1조_plot.py (폴더별 merged_XXXX_power_energy.csv) 와
+# 2025종설1조_한달plot.py (1_month_15min.csv) 를 한 번의 읽기로 같이 만든다.
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.ingest_manifest import aggregate_supercloud_incremental
+from utils.supercloud_ingest import aggregate_supercloud, bins_to_frame, utc_ts
+
+# ================== 설정 ==================
+BASE_DIR = r"D:\MIT Supercloud Dataset\202201\gpu"     # 0001~0099 폴더를 포함하는 상위 디렉토리
+SAVE_DIR = r"C:\Users\Myungsuk\Desktop\새 폴더"
+
+# 분석 기간 (UTC)
+START_TS = utc_ts(2021, 4, 1, 0, 0, 0)
+END_TS = utc_ts(2021, 4, 30, 23, 59, 59)
+
+FOLDERS = [f"{i:04d}" for i in range(1, 100)]
+BIN_SIZE = 15 * 60          # 15분 평균
+DT = 0.1                    # 샘플링 주기 (초) → energy_Wh
+WRITE_MERGED = True         # 폴더별 merged_XXXX_power_energy.csv 저장
+WORKERS = None              # None: CPU 수
+CHUNKSIZE = 1_000_000       # CSV 한 번에 읽는 행 수
+
+# 증분 모드: 처리한 파일 manifest 와 파일별 부분 집계를 STATE_DIR 에 두고 새/바뀐 파일만 읽는다
+# (월 단위 갱신은 END_TS 만 늘리면 됨, END_TS = None 이면 들어온 데이터 전부). merged CSV 는 전체 모드에서만 저장
+INCREMENTAL = False
+STATE_DIR = os.path.join(SAVE_DIR, "_ingest_state")
+# ======================================
+
+
+def main():
+    if not os.path.isdir(BASE_DIR):
+        print("ERROR: BASE_DIR 경로가 없습니다:", BASE_DIR)
+        sys.exit(1)
+    os.makedirs(SAVE_DIR, exist_ok=True)
+
+    if INCREMENTAL:
+        bins, stats = aggregate_supercloud_incremental(
+            BASE_DIR, FOLDERS, START_TS, END_TS, STATE_DIR, bin_size=BIN_SIZE,
+            workers=WORKERS, chunksize=CHUNKSIZE,
+        )
+    else:
+        bins, stats = aggregate_supercloud(
+            BASE_DIR, FOLDERS, START_TS, END_TS, bin_size=BIN_SIZE, dt=DT,
+            save_dir=SAVE_DIR if WRITE_MERGED else None, workers=WORKERS, chunksize=CHUNKSIZE,
+        )
+
+    out_path = os.path.join(SAVE_DIR, "1_month_15min.csv")
+    bins_to_frame(bins).to_csv(out_path, index=False)
+    print(f"15분 단위 평균 전력 데이터 저장 완료 → {out_path}")
+    print(f"처리량: {stats.rows_per_s:,.0f} rows/s, {stats.mb_per_s:,.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.dynamic_solver import solve_dynamic_ed
+from core.decomposition import solve_decomposed
+from benchmark_model_build import make_params
+
+# ================== 설정 ==================
+HORIZON = 672      # 1주 (15분 x 96 x 7)
+BLOCK_LEN = 96     # 하루 단위 블록
+WORKERS = 7
+SOLVER = None  # None: 사용 가능한 가장 빠른 persistent backend
+# ======================================
+
+
+def run_benchmark():
+    params = make_params(HORIZON)
+    print(f">>> Week-long ED: monolithic vs {HORIZON // BLOCK_LEN}-block ADMM decomposition")
+
+    t0 = time.perf_counter()
+    mono = solve_dynamic_ed(params, tee=False)
+    t_mono = time.perf_counter() - t0
+
+    sol, report = solve_decomposed(params, block_len=BLOCK_LEN, workers=WORKERS, solver=SOLVER)
+
+    print("\n---- Convergence ----")
+    print(f"{'iter':>5} {'primal':>12} {'dual':>12} {'rho':>10} {'cost':>18}")
+    for h in report.history:
+        print(f"{h['iter']:>5} {h['primal']:>12.5f} {h['dual']:>12.5f} {h['rho']:>10.1f} {h['cost']:>18,.0f}")
+
+    # 블록 경계에서의 ramp / SOC 연속성 점검 (이어붙인 스케줄 기준)
+    edges = np.arange(BLOCK_LEN, HORIZON, BLOCK_LEN)
+    ramp_excess = 0.0
+    for g, spec in params.generators.items():
+        p = np.asarray(sol.schedule[f'P_{g}'])
+        ramp_excess = max(ramp_excess, float(np.max(np.abs(p[edges] - p[edges - 1]) - spec.ramp_rate, initial=0.0)))
+
+    print("\n---- Monolithic vs Decomposed ----")
+    print(f"Monolithic cost: {mono.cost:,.0f} KRW ({t_mono:.2f} s)")
+    print(f"Decomposed cost: {sol.cost:,.0f} KRW ({report.elapsed:.2f} s, {report.iterations} iters, "
+          f"converged={report.converged})")
+    print(f"Cost gap: {(sol.cost - mono.cost) / mono.cost * 100:.4f} %")
+    print(f"Max boundary mismatch: {report.max_boundary_mismatch:.4f} (MW / MWh)")
+    print(f"Max ramp excess at block edges: {ramp_excess:.4f} MW")
+
+
+if __name__ == "__main__":
+    run_benchmark()
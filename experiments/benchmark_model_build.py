@@ -0,0 +1,74 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from state.schemas import EDParams, GeneratorSpec, StorageSpec
+from core.dynamic_solver import build_dynamic_ed_model
+from core.matrix_model import build_dispatch_matrix
+
+# ================== 설정 ==================
+# 15분 해상도 기준: 1일, 1주, 1달, 3달, 1년
+HORIZONS = [96, 672, 2976, 8736, 35040]
+# rule 기반 빌드는 느리므로 이 길이까지만 측정
+MAX_RULE_STEPS = 8736
+# ======================================
+
+
+def make_params(T: int) -> EDParams:
+    # FormulationAgent 기본 설비 구성 (GT 2대 + SMR 1대 + ESS 1대)
+    load_path = "datacenter_load/dc_profile_15min_ED.csv"
+    df_load = pd.read_csv(load_path)
+    demand = np.resize(df_load["power_total_scaled_MW"].to_numpy(dtype=float), T)
+
+    hours = (9 + np.arange(T) // 4) % 24
+    price = np.where((hours >= 23) | (hours < 9), 30000.0,
+                     np.where((hours >= 10) & (hours < 17), 70000.0, 35000.0))
+
+    generators = {
+        "GT1": GeneratorSpec(name="GT1", a=11.86, b=211000.0, c=600000.0, p_min=85, p_max=170, ramp_rate=50.0),
+        "GT2": GeneratorSpec(name="GT2", a=11.86, b=211010.0, c=600000.0, p_min=85, p_max=170, ramp_rate=50.0),
+        "SMR1": GeneratorSpec(name="SMR1", a=0.0, b=2500.0, c=0.0, p_min=91, p_max=121, ramp_rate=0.75),
+    }
+    ess = {
+        "ESS1": StorageSpec(name="ESS1", capacity_mwh=160.0, max_power_mw=40.0, efficiency=0.95,
+                            initial_soc=0.5, min_soc=0.1, max_soc=0.9, aging_cost=5000.0)
+    }
+    return EDParams(
+        is_time_series=True, time_steps=T, demand_profile=demand.tolist(),
+        generators=generators, ess=ess, grid_price_profile=price.tolist(),
+        base_rate=107866666.0,
+    )
+
+
+def run_benchmark():
+    print(">>> Model build benchmark: rule callbacks vs NumPy matrix")
+    print(f"{'T':>7} {'T*(G+E)':>9} {'rules [s]':>10} {'matrix [s]':>11} {'matrix us/unit':>15} {'nnz':>10}")
+
+    for T in HORIZONS:
+        params = make_params(T)
+        units = T * (len(params.generators) + len(params.ess))
+
+        t_rules = float("nan")
+        if T <= MAX_RULE_STEPS:
+            t0 = time.perf_counter()
+            build_dynamic_ed_model(params)
+            t_rules = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        mat = build_dispatch_matrix(params)
+        t_matrix = time.perf_counter() - t0
+
+        print(f"{T:>7} {units:>9} {t_rules:>10.3f} {t_matrix:>11.4f} "
+              f"{t_matrix / units * 1e6:>15.3f} {mat.num_nonzeros:>10}")
+
+    print("(us/unit 가 T 에 대해 거의 일정하면 빌드 시간이 T*(G+E) 에 선형)")
+
+
+if __name__ == "__main__":
+    run_benchmark()
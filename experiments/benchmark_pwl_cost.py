@@ -0,0 +1,72 @@
+import os
+import sys
+from dataclasses import replace
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.dynamic_solver import solve_dynamic_ed
+from core.pwl_cost import convex_hull_points, read_fuel_curve
+from benchmark_model_build import make_params
+
+# ================== 설정 ==================
+# 15분 해상도 기준: 1일, 1주, 1달
+HORIZONS = [96, 672, 2976]
+METHOD = "matrix"
+BACKEND = None  # None: 사용 가능한 가장 빠른 backend
+GT_NAMES = ["GT1", "GT2"]
+# ======================================
+
+
+def gt_params(T: int, mode: str, points, coeffs):
+    # FormulationAgent 와 같은 GT 비용 (gtfuel.csv → 2차 fit 또는 볼록 PWL), GT2 는 +10 KRW/MW 우선순위 penalty
+    params = make_params(T)
+    gens = dict(params.generators)
+    for i, g in enumerate(GT_NAMES):
+        penalty = i * 10.0
+        a, b, c = coeffs
+        pwl = [(p, cost + penalty * p) for p, cost in convex_hull_points(points)] if mode == "pwl" else None
+        gens[g] = replace(gens[g], a=a, b=b + penalty, c=c, pwl_points=pwl)
+    return replace(params, generators=gens)
+
+
+def measured_cost(points, schedule) -> float:
+    # 실제 측정 곡선(선형 보간) 기준 GT 연료비 합 → 두 모델 모두 같은 잣대로 비교
+    x = np.array([p for p, _ in points])
+    y = np.array([c for _, c in points])
+    total = 0.0
+    for i, g in enumerate(GT_NAMES):
+        p = np.asarray(schedule[f'P_{g}'])
+        total += float(np.sum(np.interp(p, x, y) + i * 10.0 * p))
+    return total
+
+
+def run_benchmark():
+    points = read_fuel_curve("gtfuel.csv")
+    x = np.array([p for p, _ in points])
+    y = np.array([c for _, c in points])
+    coeffs = tuple(float(v) for v in np.polyfit(x, y, 2))
+
+    print(">>> GT fuel cost: quadratic fit (QP) vs convex PWL from gtfuel.csv (LP)")
+    print(f"{'T':>6} {'QP backend':>18} {'QP [s]':>8} {'LP backend':>18} {'LP [s]':>8} {'speedup':>8} "
+          f"{'obj gap %':>10} {'GT cost QP':>16} {'GT cost LP':>16} {'GT gap %':>9}")
+
+    # 솔버 라이브러리/라이선스 초기화 시간이 첫 측정에 섞이지 않도록 warm-up
+    solve_dynamic_ed(gt_params(HORIZONS[0], "pwl", points, coeffs), method=METHOD, tee=False, backend=BACKEND)
+
+    for T in HORIZONS:
+        qp = solve_dynamic_ed(gt_params(T, "quadratic", points, coeffs), method=METHOD, tee=False, backend=BACKEND)
+        lp = solve_dynamic_ed(gt_params(T, "pwl", points, coeffs), method=METHOD, tee=False, backend=BACKEND)
+
+        gt_qp = measured_cost(points, qp.schedule)
+        gt_lp = measured_cost(points, lp.schedule)
+        print(f"{T:>6} {qp.backend:>18} {qp.solve_time:>8.3f} {lp.backend:>18} {lp.solve_time:>8.3f} "
+              f"{qp.solve_time / max(lp.solve_time, 1e-9):>8.1f} "
+              f"{(lp.cost - qp.cost) / qp.cost * 100:>10.4f} "
+              f"{gt_qp:>16,.0f} {gt_lp:>16,.0f} {(gt_lp - gt_qp) / gt_qp * 100:>9.4f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -1,4 +1,3 @@
-import pandas as pd
 import os
 import sys
 
@@ -7,44 +6,42 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from state.schemas import EDParams, GeneratorSpec, StorageSpec, RenewableSpec
 from core.dynamic_solver import solve_dynamic_ed
+from utils.profile_reader import ProfileReader
 # from agents.explanation_agent import explain_solution
 
+# ===== 설정 =====
+WINDOW_START = "2021-04-03 00:00"   # 급전 시작 시각 (None: 데이터 공통 시작)
+HORIZON_HOURS = 24                  # 급전 구간 길이 [h]
+
 def run_custom_scenario():
     print(">>> Running Custom Scenario (NO PV CURTAILMENT): 400MW Load + PV must-take + 40MW/160MWh ESS")
     
     # -----------------------------
     # 1. Load Data
     # -----------------------------
-    # (1) Load Profile (데이터센터 부하)
+    # (1) Load Profile (데이터센터 부하, 15분 [MW]) / (2) PV Profile (15분 PV 출력 [MW])
     load_path = "datacenter_load/dc_profile_15min_ED.csv"
     if not os.path.exists(load_path):
         load_path = "d:/data_center_ed_agent/datacenter_load/dc_profile_15min_ED.csv"
-    
-    df_load = pd.read_csv(load_path)
-    # power_total_scaled_MW : 15분 단위 데이터센터 부하 [MW]
-    demand_profile = df_load["power_total_scaled_MW"].astype(float).tolist()[:96]
-
-    # (2) PV Profile (15분 단위 PV 출력 [MW])
     pv_path = "datacenter_load/pv_profile_15min_ED.csv"
     if not os.path.exists(pv_path):
         pv_path = "d:/data_center_ed_agent/datacenter_load/pv_profile_15min_ED.csv"
-    
-    df_pv = pd.read_csv(pv_path)
-    pv_profile = df_pv["pv_power_MW"].astype(float).tolist()
 
-    # 길이 보정 (하루 96 step)
-    if len(pv_profile) < 96:
-        pv_profile += [0.0] * (96 - len(pv_profile))
-    pv_profile = pv_profile[:96]
+    # 급전 구간 [WINDOW_START, WINDOW_START + HORIZON_HOURS) 만 이진 탐색으로 읽고 15분 격자에 맞춘다
+    reader = ProfileReader(load_path, pv_path, load_col="power_total_scaled_MW", pv_col="pv_power_MW")
+    window = reader.read_window(WINDOW_START, hours=HORIZON_HOURS)
+    if window.missing:
+        window.report()   # 빈 구간은 보고하고 앞뒤만 잘라냄 (중간 빈 구간은 ValueError)
+        window = window.trim()
+    demand_profile = window.load.tolist()
+    pv_profile = window.pv.tolist()
+    print(f"Window: {window.labels()[0]} ~ {window.labels()[-1]} ({len(window)} steps)")
 
     # -----------------------------
     # 2. PV must-take 가정 → 순부하(Net load) 생성
+    #    PV가 load보다 큰 순간이 있어도, ED가 보는 건 "최소 0"의 순부하로 제한
     # -----------------------------
-    net_demand_profile = []
-    for d, p in zip(demand_profile, pv_profile):
-        net = d - p
-        # 만약 PV가 load보다 큰 순간이 있어도, ED가 보는 건 "최소 0"의 순부하로 제한
-        net_demand_profile.append(max(net, 0.0))
+    net_demand_profile = window.net_demand.tolist()
 
     # 간단한 통계 출력 (검증용)
     total_load_energy = sum(demand_profile) * 0.25   # 15분 → 0.25h
@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.ess_sizing import sweep_ess_sizing
+from benchmark_model_build import make_params
+
+# ================== 설정 ==================
+HORIZON = 672                      # 1주
+CAPACITIES = [0, 40, 80, 160, 240, 300, 400]   # MWh
+POWERS = [10, 20, 40, 60, 80, 100]             # MW
+EFFICIENCIES = [0.90, 0.95]
+WORKERS = None                     # None: CPU 수
+OUTPUT_FILE = "ess_sizing_result.csv"
+# ======================================
+
+
+def run_sizing():
+    params = make_params(HORIZON)
+    result = sweep_ess_sizing(params, CAPACITIES, POWERS, EFFICIENCIES, workers=WORKERS)
+
+    df = pd.DataFrame([{
+        "capacity_mwh": p.capacity_mwh, "max_power_mw": p.max_power_mw, "efficiency": p.efficiency,
+        "cost": p.cost, "savings": p.savings, "solve_time": p.solve_time, "error": p.error,
+    } for p in result.points])
+    df.to_csv(OUTPUT_FILE, index=False)
+    print(f"Saved cost surface to {OUTPUT_FILE}")
+
+    for eff, frontier in result.pareto.items():
+        print(f"\n---- Pareto frontier (efficiency {eff:.2f}) ----")
+        print(f"{'MWh':>6} {'MW':>6} {'savings [KRW]':>16}")
+        for p in frontier:
+            print(f"{p.capacity_mwh:>6.0f} {p.max_power_mw:>6.0f} {p.savings:>16,.0f}")
+
+
+if __name__ == "__main__":
+    run_sizing()
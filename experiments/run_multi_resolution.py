@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.dynamic_solver import solve_dynamic_ed
+from core.multi_resolution import solve_coarse_to_fine
+from benchmark_model_build import make_params
+
+# ================== 설정 ==================
+RAW_FILE = "datacenter_load/1_day_data.csv"      # 1초 해상도 (W)
+ED_PROFILE = "datacenter_load/dc_profile_15min_ED.csv"
+FACTOR = 15          # 15분 coarse → 1분 fine
+WORKERS = None       # None: CPU 수
+RUN_MONOLITHIC = True
+# ======================================
+
+
+def load_minute_demand() -> np.ndarray:
+    # 1초 → 1분 평균, ED 15분 프로파일과 평균이 같아지도록 MW 로 스케일
+    raw = pd.read_csv(RAW_FILE)
+    watts = raw["power_draw_W"].to_numpy(dtype=float)
+    minutes = watts[: len(watts) // 60 * 60].reshape(-1, 60).mean(axis=1)
+    target = pd.read_csv(ED_PROFILE)["power_total_scaled_MW"].to_numpy(dtype=float).mean()
+    return minutes * (target / minutes.mean())
+
+
+def minute_params(demand: np.ndarray):
+    # 15분 기준 설비/요금(스텝당 비용)을 1분 스텝으로 환산
+    T = len(demand) // FACTOR * FACTOR
+    base = make_params(T // FACTOR)
+    gens = {g: replace(s, a=s.a / FACTOR, b=s.b / FACTOR, c=s.c / FACTOR,
+                       cost_coeff=s.cost_coeff / FACTOR, ramp_rate=s.ramp_rate / FACTOR)
+            for g, s in base.generators.items()}
+    ess = {e: replace(s, aging_cost=s.aging_cost / FACTOR) for e, s in base.ess.items()}
+    price = np.repeat(np.asarray(base.grid_price_profile), FACTOR) / FACTOR
+    return replace(base, time_steps=T, demand_profile=demand[:T].tolist(), grid_price_profile=price.tolist(),
+                   dt_hours=base.dt_hours / FACTOR, generators=gens, ess=ess)
+
+
+def run():
+    params = minute_params(load_minute_demand())
+    print(f">>> Coarse-to-fine dispatch: {params.time_steps} x 1 min ({params.time_steps // FACTOR} x 15 min)")
+
+    sol, report = solve_coarse_to_fine(params, factor=FACTOR, workers=WORKERS)
+
+    print("\n---- Intra-interval ramp (MW per 1 min) ----")
+    print(f"{'gen':>6} {'limit':>8} {'held 15-min plan':>17} {'violations':>11} {'refined':>9}")
+    for g, spec in params.generators.items():
+        print(f"{g:>6} {spec.ramp_rate:>8.3f} {report.coarse_max_step_ramp[g]:>17.3f} "
+              f"{report.coarse_ramp_violations[g]:>11d} {report.fine_max_step_ramp[g]:>9.3f}")
+
+    print("\n---- Cost / time ----")
+    print(f"Coarse (15 min): {report.coarse_cost:,.0f} KRW ({report.coarse_time:.2f} s)")
+    print(f"Coarse-to-fine : {report.fine_cost:,.0f} KRW ({report.elapsed:.2f} s)")
+    if RUN_MONOLITHIC:
+        t0 = time.perf_counter()
+        mono = solve_dynamic_ed(params, method="matrix", tee=False)
+        t_mono = time.perf_counter() - t0
+        print(f"Monolithic 1 min: {mono.cost:,.0f} KRW ({t_mono:.2f} s)")
+        print(f"Gap: {(report.fine_cost - mono.cost) / mono.cost * 100:.4f} %")
+
+
+if __name__ == "__main__":
+    run()
@@ -1,6 +1,7 @@
 # main.py
 
 import os
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from fpdf import FPDF, XPos, YPos
@@ -9,36 +10,23 @@ from workflow.graph import build_graph
 # =========================================================
 # 1. 결과 시각화 함수
 # =========================================================
-def plot_results(solution_data, params):
-    if not solution_data: return
+def plot_results(frame, params):
+    if frame is None: return
 
-    T = params.time_steps
-    times = range(T)
-    
-    if params.timestamps and len(params.timestamps) == T:
-        time_labels = [t.split(" ")[-1] for t in params.timestamps]
-    else:
-        time_labels = [f"{int(t/4):02d}:{int(t%4)*15:02d}" for t in times]
-
-    p_grid, p_pv = [], []
-    gen_names = list(params.generators.keys())
-    ess_names = list(params.ess.keys()) if params.ess else []
+    T = len(frame)
+    times = np.arange(T)
+    time_labels = [t.split(" ")[-1] for t in frame.index]
+
+    p_grid, p_pv = frame['P_grid'], frame['P_PV']
+    gen_names = frame.gen_names
+    ess_names = frame.ess_names
     
-    gen_data = {g: [] for g in gen_names}
-    ess_data = {e: [] for e in ess_names}
-
-    for t in times:
-        val = solution_data.get(t, {})
-        p_grid.append(val.get('P_grid', 0))
-        p_pv.append(val.get('P_PV', 0))
-        for g in gen_names:
-            gen_data[g].append(val.get(f'P_{g}', val.get(g, 0)))
-        for e in ess_names:
-            ess_data[e].append(val.get(f'P_dis_{e}', 0))
+    gen_data = {g: frame[f'P_{g}'] for g in gen_names}
+    ess_data = {e: frame[f'P_dis_{e}'] for e in ess_names}
 
     # Merit Order: PV(0) -> SMR(1) -> GT(2) -> ESS(3) -> Grid(4)
     sources = []
-    sources.append({"label": "PV", "data": p_pv, "total": sum(p_pv), "priority": 0, "color": "#2ca02c"})
+    sources.append({"label": "PV", "data": p_pv, "total": p_pv.sum(), "priority": 0, "color": "#2ca02c"})
 
     reds = ["#d62728", "#ff7f0e", "#e377c2", "#bcbd22", "#8c564b"]
     for i, g in enumerate(gen_names):
@@ -47,13 +35,13 @@ def plot_results(solution_data, params):
             priority, color = 1, "#9467bd"
         else:
             priority, color = 2, reds[i % len(reds)]
-        sources.append({"label": g, "data": gen_data[g], "total": sum(gen_data[g]), "priority": priority, "color": color})
+        sources.append({"label": g, "data": gen_data[g], "total": gen_data[g].sum(), "priority": priority, "color": color})
 
     browns = ["#8B4513", "#A0522D", "#CD853F"]
     for i, e in enumerate(ess_names):
-        sources.append({"label": f"{e} Dis", "data": ess_data[e], "total": sum(ess_data[e]), "priority": 3, "color": browns[i % len(browns)]})
+        sources.append({"label": f"{e} Dis", "data": ess_data[e], "total": ess_data[e].sum(), "priority": 3, "color": browns[i % len(browns)]})
 
-    sources.append({"label": "Grid", "data": p_grid, "total": sum(p_grid), "priority": 4, "color": "#1f77b4"})
+    sources.append({"label": "Grid", "data": p_grid, "total": p_grid.sum(), "priority": 4, "color": "#1f77b4"})
     sources.sort(key=lambda x: (x['priority'], -x['total']))
 
     y_arrays = [s['data'] for s in sources if s['total'] > 0.1]
@@ -80,7 +68,7 @@ def plot_results(solution_data, params):
 # =========================================================
 # 2. PDF 리포트 생성 (2단 레이아웃 + 소수점 포함)
 # =========================================================
-def create_pdf_report(explanation_text, solution_data=None, params=None, image_path="optimization_result.png", filename="Final_Report.pdf"):
+def create_pdf_report(explanation_text, frame=None, params=None, image_path="optimization_result.png", filename="Final_Report.pdf"):
     pdf = FPDF()
     
     font_path = r'C:\Windows\Fonts\malgun.ttf'
@@ -109,14 +97,14 @@ def create_pdf_report(explanation_text, solution_data=None, params=None, image_p
         pass
 
     # Page 2 (Table)
-    if solution_data and params:
+    if frame is not None and params:
         pdf.add_page()
         pdf.set_font(font_name, '', 12)
         pdf.cell(0, 10, "Detailed Simulation Data (24h)", new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='L')
         pdf.ln(2)
         
-        gen_names = list(params.generators.keys())
-        ess_names = list(params.ess.keys()) if params.ess else []
+        gen_names = frame.gen_names
+        ess_names = frame.ess_names
         headers = ["Time", "Grid", "PV"] + gen_names + [f"{e}" for e in ess_names] + ["Tot", "Dif"]
         
         page_width = 190
@@ -126,8 +114,15 @@ def create_pdf_report(explanation_text, solution_data=None, params=None, image_p
         col_width = block_width / num_cols
         row_height = 4 
         
-        total_steps = params.time_steps
+        total_steps = len(frame)
         mid_point = (total_steps + 1) // 2
+
+        # 표 전체 값을 열 단위로 한 번에 만들고, 행 루프에서는 셀만 그린다
+        time_col = [t.split(" ")[-1][:5] for t in frame.index] if params.timestamps \
+            else [str(t) for t in range(total_steps)]
+        managed = frame.managed_supply()
+        table = np.vstack([frame['P_grid'], frame['P_PV'], frame.gen_matrix(), frame.ess_discharge_matrix(),
+                           managed, managed - frame['demand']]).T
         
         def draw_table_block(start_idx, end_idx, x_start, y_start):
             # Header
@@ -141,34 +136,9 @@ def create_pdf_report(explanation_text, solution_data=None, params=None, image_p
             pdf.set_font(font_name, '', 4.5) 
             
             # Rows
-            for t in range(start_idx, end_idx):
-                if t >= total_steps: break
+            for t in range(start_idx, min(end_idx, total_steps)):
                 pdf.set_xy(x_start, current_y)
-                row = solution_data[t]
-                
-                vals = []
-                t_label = params.timestamps[t].split(" ")[-1][:5] if params.timestamps else f"{t}"
-                vals.append(t_label)
-                vals.append(f"{row.get('P_grid',0):.1f}")
-                vals.append(f"{row.get('P_PV',0):.1f}")
-                
-                p_gen_sum = 0
-                for g in gen_names:
-                    val = row.get(f'P_{g}', row.get(g, 0))
-                    vals.append(f"{val:.1f}")
-                    p_gen_sum += val
-                
-                p_ess_sum = 0
-                for e in ess_names:
-                    val = row.get(f'P_dis_{e}', 0)
-                    vals.append(f"{val:.1f}")
-                    p_ess_sum += val
-                
-                managed = row.get('P_grid',0) + p_gen_sum + p_ess_sum
-                target = params.demand_profile[t]
-                vals.append(f"{managed:.1f}")
-                vals.append(f"{(managed-target):.1f}")
-                
+                vals = [time_col[t]] + [f"{v:.1f}" for v in table[t]]
                 for v in vals:
                     pdf.cell(col_width, row_height, v, border=1, align='C')
                 current_y += row_height
@@ -206,18 +176,18 @@ if __name__ == "__main__":
     ESS 1대: 300MWh, 80MW.
     """
     
-    initial_state = {"problem_text": user_request, "solution_output": None, "explanation": None}
+    initial_state = {"problem_text": user_request, "solution_frame": None, "explanation": None}
     
     print(">> Running Workflow...")
     try:
         result = graph.invoke(initial_state)
-        sol = result.get("solution_output")
+        frame = result.get("solution_frame")
         final_params = result.get("params") 
         
-        if sol and final_params:
-            plot_results(sol, final_params)
-            create_pdf_report(result.get("explanation"), solution_data=sol, params=final_params)
-            print(f">> Success! Total Cost: {sol.get('Total_Cost', 0):,.0f} KRW")
+        if frame is not None and final_params:
+            plot_results(frame, final_params)
+            create_pdf_report(result.get("explanation"), frame=frame, params=final_params)
+            print(f">> Success! Total Cost: {frame.total_cost:,.0f} KRW")
         else:
             print(">> No solution.")
             
@@ -7,6 +7,11 @@ class AgentState(TypedDict, total=False):
     # 사용자 입력
     problem_text: str
 
+    # 급전 구간 [window_start, window_end) (예: "2021-04-05 00:00"), end 가 없으면 start + horizon_hours
+    window_start: Optional[str]
+    window_end: Optional[str]
+    horizon_hours: Optional[float]
+
     # Parsing 결과
     parsed_data: Optional[dict]
 
@@ -16,8 +21,8 @@ class AgentState(TypedDict, total=False):
     # Solver 결과 (원본 객체)
     solution: Optional[Any]
 
-    # [핵심] Solver 결과 (Dict 변환본) - ★이 줄이 반드시 있어야 합니다!★
-    solution_output: Optional[dict]
+    # Solver 결과 (열 단위 SolutionFrame, 시계열은 solution 의 배열을 그대로 참조)
+    solution_frame: Optional[Any]
 
     # Explanation Agent 결과
     explanation: Optional[str]
\ No newline at end of file
@@ -1,7 +1,9 @@
 # state/schemas.py
 
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
+
+import numpy as np
 
 @dataclass
 class GeneratorSpec:
@@ -13,6 +15,8 @@ class GeneratorSpec:
     p_max: float
     ramp_rate: float
     cost_coeff: float = 0.0  # Optional linear cost if a,b,c are 0
+    # (출력 [MW], 비용 [KRW/스텝]) breakpoint. 있으면 a,b,c 대신 볼록 PWL 비용(LP)으로 모델링
+    pwl_points: Optional[List[Tuple[float, float]]] = None
 
 @dataclass
 class StorageSpec:
@@ -42,6 +46,14 @@ class EDParams:
     ess: Optional[Dict[str, StorageSpec]] = None
     grid_price_profile: Optional[List[float]] = None
     timestamps: Optional[List[str]] = None
+
+    # 시간 간격 [h] (15분 = 0.25)
+    dt_hours: float = 0.25
+    # 직전 구간 마지막 발전기 출력 [MW] → t=0 ramp 제약에 사용 (rolling horizon)
+    initial_gen_output: Optional[Dict[str, float]] = None
+    # 마지막 스텝 목표값 (coarse-to-fine 세분화에서 coarse 해를 경계 조건으로 사용)
+    terminal_soc: Optional[Dict[str, float]] = None          # ESS 마지막 SOC [MWh]
+    terminal_gen_output: Optional[Dict[str, float]] = None   # 발전기 마지막 출력 [MW]
     
     # [핵심 수정] 여기에 base_rate를 추가해야 에러가 안 납니다!
     base_rate: float = 0.0 
@@ -49,5 +61,20 @@ class EDParams:
 @dataclass
 class EDSolution:
     cost: float = 0.0
-    schedule: Dict[str, List[float]] = field(default_factory=dict)
-    ess_schedule: Dict[str, Dict[str, List[float]]] = field(default_factory=dict)
\ No newline at end of file
+    # 시계열은 float64 NumPy 배열 (길이 T). 같은 자산군은 하나의 연속 배열을 나눠 쓰는 view
+    schedule: Dict[str, np.ndarray] = field(default_factory=dict)
+    ess_schedule: Dict[str, Dict[str, np.ndarray]] = field(default_factory=dict)
+
+    # 쌍대 변수 (solve_dynamic_ed(duals=True) 일 때만 채움)
+    # marginal_price[t]: Balance 쌍대 = 수요 1 MW 증가 시 비용 증가 [KRW/MW per 스텝, grid_price_profile 과 같은 단위]
+    marginal_price: List[float] = field(default_factory=list)
+    # {"Ramp": {gen: [T]}, "SOC_Dyn": {ess: [T]}}
+    duals: Dict[str, Dict[str, List[float]]] = field(default_factory=dict)
+
+    # 실행 정보: 사용한 솔버 backend, 종료 상태, 모델 빌드/solve 시간 [s]
+    backend: str = ""
+    status: str = ""
+    build_time: float = 0.0
+    solve_time: float = 0.0
+    # phase 별 시간/메모리, 모델 크기, 솔버 통계 (core/instrumentation.SolveTrace.to_dict())
+    trace: Dict[str, Any] = field(default_factory=dict)
\ No newline at end of file
@@ -0,0 +1,118 @@
+# state/solution_frame.py
+
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import numpy as np
+
+from state.schemas import EDParams, EDSolution
+from core.dynamic_solver import DEFAULT_GRID_PRICE
+
+
+def _clock_labels(n: int, dt_hours: float) -> List[str]:
+    # 0 시부터 dt_hours 간격의 시각 라벨 (24 시간마다 다시 00:00). 1 분 미만 간격이면 초까지 표시
+    secs = np.rint(np.arange(n) * dt_hours * 3600.0).astype(np.int64) % 86400
+    if np.all(secs % 60 == 0):
+        return [f"{s // 3600:02d}:{s // 60 % 60:02d}" for s in secs]
+    return [f"{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}" for s in secs]
+
+
+@dataclass
+class SolutionFrame:
+    """
+    급전 결과를 열(column) 단위로 담는 객체. AgentState["solution_frame"] 으로 에이전트 사이를 흐른다.
+    - 시계열마다 길이 T 의 float64 배열 하나, 모든 열이 같은 시간축(index)을 공유
+    - 열 이름: P_grid, P_PV, demand, grid_price, P_{gen}, P_dis_{ess}, P_chg_{ess}, SOC_{ess}
+    - 발전기/ESS 열은 EDSolution.schedule / ess_schedule 배열을 복사 없이 그대로 참조
+    """
+    index: List[str]
+    columns: Dict[str, np.ndarray] = field(default_factory=dict)
+    total_cost: float = 0.0
+    base_rate: float = 0.0
+    gen_names: List[str] = field(default_factory=list)
+    ess_names: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_solution(cls, sol: EDSolution, params: EDParams) -> "SolutionFrame":
+        T = params.time_steps
+
+        def series(values, default: float = 0.0) -> np.ndarray:
+            if values is None:
+                return np.full(T, default)
+            return np.asarray(values, dtype=np.float64)[:T]
+
+        gen_names = list(params.generators.keys())
+        ess_names = list(params.ess.keys()) if params.ess else []
+        if params.timestamps and len(params.timestamps) >= T:
+            index = list(params.timestamps[:T])
+        else:
+            index = _clock_labels(T, params.dt_hours)
+
+        columns = {
+            'P_grid': series(sol.schedule.get('P_grid')),
+            'P_PV': series(params.pv_profile),
+            'demand': series(params.demand_profile),
+            # 요금 프로파일이 없으면 모델이 쓴 기본 요금 (0 이 아니라)
+            'grid_price': series(params.grid_price_profile, DEFAULT_GRID_PRICE),
+        }
+        for g in gen_names:
+            columns[f'P_{g}'] = series(sol.schedule.get(f'P_{g}'))
+        for e in ess_names:
+            ess = (sol.ess_schedule or {}).get(e, {})
+            columns[f'P_dis_{e}'] = series(ess.get('discharge'))
+            columns[f'P_chg_{e}'] = series(ess.get('charge'))
+            columns[f'SOC_{e}'] = series(ess.get('soc'))
+
+        return cls(index=index, columns=columns, total_cost=float(sol.cost),
+                   base_rate=float(params.base_rate or 0.0), gen_names=gen_names, ess_names=ess_names)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def get(self, name: str, default: float = 0.0) -> np.ndarray:
+        col = self.columns.get(name)
+        return col if col is not None else np.full(len(self), default)
+
+    @property
+    def variable_cost(self) -> float:
+        return self.total_cost - self.base_rate
+
+    def gen_matrix(self) -> np.ndarray:
+        # (G, T) 발전기 출력
+        return np.vstack([self.columns[f'P_{g}'] for g in self.gen_names]) if self.gen_names \
+            else np.zeros((0, len(self)))
+
+    def ess_discharge_matrix(self) -> np.ndarray:
+        # (E, T) ESS 방전
+        return np.vstack([self.columns[f'P_dis_{e}'] for e in self.ess_names]) if self.ess_names \
+            else np.zeros((0, len(self)))
+
+    def managed_supply(self) -> np.ndarray:
+        # Grid + 발전기 + ESS 방전 (demand_profile 은 PV 를 뺀 순부하이므로 PV 는 넣지 않는다)
+        return self['P_grid'] + self.gen_matrix().sum(axis=0) + self.ess_discharge_matrix().sum(axis=0)
+
+    def to_pandas(self):
+        import pandas as pd
+        return pd.DataFrame(self.columns, index=pd.Index(self.index, name="time"), copy=False)
+
+    def to_arrow(self):
+        # pyarrow 는 선택 의존성 (Arrow/Parquet 내보내기에만 필요)
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ImportError("pyarrow is required for Arrow/Parquet export (pip install pyarrow)") from e
+        table = pa.table({"time": pa.array(self.index, type=pa.string()),
+                          **{k: pa.array(v) for k, v in self.columns.items()}})
+        return table.replace_schema_metadata({
+            "total_cost": str(self.total_cost), "base_rate": str(self.base_rate),
+            "gen_names": ",".join(self.gen_names), "ess_names": ",".join(self.ess_names),
+        })
+
+    def to_parquet(self, path: str):
+        table = self.to_arrow()
+        import pyarrow.parquet as pq
+        pq.write_table(table, path)
+        print(f"[Solution] Saved to {path}")
@@ -0,0 +1,22 @@
+# tests/fleets.py
+# 테스트 공용 fleet
+
+from state.schemas import EDParams, GeneratorSpec, StorageSpec
+
+T = 8
+
+
+def small_params(grid_price_profile=None, pv_profile=None) -> EDParams:
+    # 라이선스 크기 제한에 걸리지 않는 작은 LP fleet (선형 발전기 2대 + ESS 1대)
+    generators = {
+        "G1": GeneratorSpec(name="G1", a=0.0, b=90000.0, c=0.0, p_min=20, p_max=120, ramp_rate=40.0),
+        "G2": GeneratorSpec(name="G2", a=0.0, b=150000.0, c=0.0, p_min=0, p_max=100, ramp_rate=60.0),
+    }
+    ess = {
+        "ESS1": StorageSpec(name="ESS1", capacity_mwh=80.0, max_power_mw=20.0, efficiency=0.95,
+                            initial_soc=0.5, min_soc=0.1, max_soc=0.9, aging_cost=1000.0)
+    }
+    return EDParams(
+        is_time_series=True, time_steps=T, demand_profile=[100.0 + 10 * (t % 4) for t in range(T)],
+        generators=generators, ess=ess, pv_profile=pv_profile, grid_price_profile=grid_price_profile,
+    )
@@ -0,0 +1,75 @@
+# tests/test_batch_solver.py
+
+import os
+import time
+
+import pytest
+
+from state.schemas import EDParams, GeneratorSpec
+from core import batch_solver
+from core.batch_solver import solve_many
+from core.dynamic_solver import solve_dynamic_ed
+from fleets import T, small_params
+
+
+def test_none_profiles_do_not_reuse_previous_scenario():
+    # 같은 fleet 을 한 worker 에서 재사용할 때 None 프로파일이 이전 시나리오 값을 물려받으면 안 된다
+    with_profiles = small_params(grid_price_profile=[50000.0] * T, pv_profile=[10.0] * T)
+    defaults = small_params()
+    scenarios = [with_profiles, defaults, with_profiles, defaults]
+
+    results = sorted(solve_many(scenarios, workers=1), key=lambda r: r.index)
+    assert all(r.ok for r in results), [r.error for r in results]
+
+    expected = [solve_dynamic_ed(p, tee=False).cost for p in scenarios]
+    assert [r.solution.cost for r in results] == pytest.approx(expected, rel=1e-6)
+    assert len({r.worker_pid for r in results}) == 1
+
+
+def test_boundary_values_reuse_the_worker_model():
+    # 초기 출력 / 마지막 SOC 같은 경계 값만 다른 구간은 모델 하나를 재사용하고, 값은 시나리오마다 다시 바인딩한다
+    scenarios = []
+    for g1, soc in [(40.0, 30.0), (100.0, 60.0), (60.0, 40.0)]:
+        p = small_params()
+        p.initial_gen_output = {"G1": g1, "G2": 0.0}
+        p.terminal_soc = {"ESS1": soc}
+        scenarios.append(p)
+
+    batch_solver._MODELS.clear()
+    try:
+        results = [batch_solver._solve_one(i, p) for i, p in enumerate(scenarios)]
+        assert len(batch_solver._MODELS) == 1
+    finally:
+        batch_solver._MODELS.clear()
+    assert all(r.ok for r in results), [r.error for r in results]
+
+    expected = [solve_dynamic_ed(p, tee=False).cost for p in scenarios]
+    assert [r.solution.cost for r in results] == pytest.approx(expected, rel=1e-6)
+
+
+class _CrashingGenerator(GeneratorSpec):
+    # worker 가 시나리오를 받아 unpickle 할 때 프로세스를 죽인다 (BrokenProcessPool 재현용)
+    def __setstate__(self, state):
+        os._exit(1)
+
+
+class _SlowGenerator(GeneratorSpec):
+    # unpickle 할 때 잠깐 멈춰서, 다른 worker 가 죽는 순간에도 이 시나리오가 돌고 있게 한다
+    def __setstate__(self, state):
+        time.sleep(1.0)
+        self.__dict__.update(state)
+
+
+def _with_g1(params: EDParams, cls) -> EDParams:
+    params.generators = {**params.generators, "G1": cls(**vars(params.generators["G1"]))}
+    return params
+
+
+def test_worker_crash_fails_only_the_crashing_scenario():
+    scenarios = [_with_g1(small_params(), _CrashingGenerator)] + \
+                [_with_g1(small_params(), _SlowGenerator) for _ in range(3)]
+
+    results = {r.index: r for r in solve_many(scenarios, workers=2)}
+    assert sorted(results) == list(range(len(scenarios)))
+    assert not results[0].ok and "BrokenProcessPool" in results[0].error
+    assert all(results[i].ok for i in range(1, len(scenarios))), {i: r.error for i, r in results.items()}
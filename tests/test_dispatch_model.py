@@ -0,0 +1,20 @@
+# tests/test_dispatch_model.py
+
+import copy
+
+from core.dispatch_model import DispatchModel
+from fleets import T, small_params
+
+
+def test_solve_and_set_ess_do_not_touch_callers_params():
+    params = small_params(grid_price_profile=[50000.0] * T)
+    before = copy.deepcopy(params)
+
+    model = DispatchModel(params, tee=False)
+    model.solve(demand_profile=[90.0] * T, pv_profile=[5.0] * T, grid_price_profile=[80000.0] * T)
+    model.set_ess("ESS1", capacity_mwh=40.0, max_power_mw=10.0)
+    model.solve()
+
+    assert params == before
+    assert model.params.demand_profile == [90.0] * T
+    assert model.params.ess["ESS1"].capacity_mwh == 40.0
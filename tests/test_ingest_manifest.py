@@ -0,0 +1,99 @@
+# tests/test_ingest_manifest.py
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.ingest_manifest import IngestManifest, aggregate_supercloud_incremental
+
+BIN = 60
+START = 1_600_000_000.0
+
+
+def _write(base, rel, t0, n, seed):
+    rng = np.random.default_rng(seed)
+    path = os.path.join(base, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pd.DataFrame({"timestamp": t0 + np.arange(n) * 0.5,
+                  "power_draw_W": rng.uniform(50.0, 300.0, n).round(2)}).to_csv(path, index=False)
+    return path
+
+
+def _expected(base, folders, start, end):
+    # 지금 디스크에 있는 파일 전체를 pandas 로 다시 집계
+    frames = [pd.read_csv(os.path.join(base, f, name)) for f in folders
+              for name in sorted(os.listdir(os.path.join(base, f)))]
+    df = pd.concat(frames)
+    df = df[(df.timestamp >= start) & (df.timestamp <= (np.inf if end is None else end))]
+    g = df.groupby((df.timestamp // BIN).astype(np.int64) * BIN).power_draw_W
+    return g.sum(), g.count()
+
+
+def _run(base, state, folders, start=START, end=None):
+    bins, stats = aggregate_supercloud_incremental(base, folders, start, end, state, bin_size=BIN, workers=1)
+    sums, counts = _expected(base, folders, start, end)
+    assert bins.keys.tolist() == sums.index.tolist()
+    assert bins.sums == pytest.approx(sums.to_numpy())
+    assert bins.counts.tolist() == counts.tolist()
+    return stats
+
+
+@pytest.fixture
+def tree(tmp_path):
+    base, state = str(tmp_path / "gpu"), str(tmp_path / "state")
+    _write(base, "0001/a.csv", START, 600, seed=1)
+    _write(base, "0001/b.csv", START + 400, 600, seed=2)
+    _write(base, "0002/c.csv", START + 200, 600, seed=3)
+    return base, state
+
+
+def test_only_new_and_changed_files_are_read(tree):
+    base, state = tree
+    folders = ["0001", "0002"]
+    assert _run(base, state, folders).files == 3
+
+    stats = _run(base, state, folders)
+    assert (stats.files, stats.unchanged_files) == (0, 3)
+
+    # 새 파일
+    _write(base, "0002/d.csv", START + 900, 300, seed=4)
+    stats = _run(base, state, folders)
+    assert (stats.files, stats.unchanged_files) == (1, 3)
+
+    # 내용이 바뀐 파일 (mtime 도 바뀜) → 다시 읽음, mtime 만 바뀐 파일 → 해시가 같아 읽지 않음
+    _write(base, "0001/a.csv", START, 600, seed=5)
+    os.utime(os.path.join(base, "0001/b.csv"))
+    stats = _run(base, state, folders)
+    assert (stats.files, stats.unchanged_files) == (1, 3)
+
+
+def test_moved_boundary_rereads_only_files_across_it(tree):
+    base, state = tree
+    folders = ["0001", "0002"]
+    _run(base, state, folders, end=START + 250)
+
+    # 끝 경계 START+250 → START+350: a(0~300 s), c(200~500 s) 에 걸림, b(400~700 s) 는 밖
+    stats = _run(base, state, folders, end=START + 350)
+    assert (stats.files, stats.unchanged_files) == (2, 1)
+
+    # 시작 경계 START → START+100: 그 사이에 데이터가 있는 a 만
+    stats = _run(base, state, folders, start=START + 100, end=START + 350)
+    assert (stats.files, stats.unchanged_files) == (1, 2)
+
+
+def test_removed_file_is_dropped_from_the_total(tree):
+    base, state = tree
+    folders = ["0001", "0002"]
+    _run(base, state, folders)
+
+    os.remove(os.path.join(base, "0001/b.csv"))
+    stats = _run(base, state, folders)
+    assert (stats.files, stats.unchanged_files) == (0, 2)
+    assert sorted(IngestManifest.open(state, BIN).records) == ["0001/a.csv", "0002/c.csv"]
+
+    # 이번에 훑지 않은 폴더의 기록은 그대로
+    os.remove(os.path.join(base, "0002/c.csv"))
+    _run(base, state, ["0001"])
+    assert sorted(IngestManifest.open(state, BIN).records) == ["0001/a.csv", "0002/c.csv"]
@@ -0,0 +1,38 @@
+# tests/test_model_template.py
+
+from dataclasses import replace
+
+import pytest
+
+from core import model_template
+from core.dynamic_solver import solve_dynamic_ed
+from fleets import T, small_params
+
+
+def _scenarios():
+    # 같은 구조에서 프로파일, 요금, 발전기/ESS 계수가 바뀌는 시나리오
+    base = small_params()
+    cheap = small_params(grid_price_profile=[50000.0] * T, pv_profile=[10.0] * T)
+    tight = small_params(grid_price_profile=[250000.0] * T)
+    tight.generators = {**tight.generators, "G1": replace(tight.generators["G1"], p_max=90.0, b=120000.0)}
+    tight.ess = {"ESS1": replace(tight.ess["ESS1"], capacity_mwh=40.0, max_power_mw=10.0)}
+    return [base, cheap, tight, base]
+
+
+def test_template_resolves_reuse_the_persistent_solver():
+    model_template.clear_templates()
+    try:
+        reused, solvers = [], []
+        for p in _scenarios():
+            sol = solve_dynamic_ed(p, tee=False)
+            reused.append(sol.cost)
+            _, cached = model_template.get_template_entry(p)
+            solvers.append(dict(cached))
+        assert len(model_template._TEMPLATES) == 1
+    finally:
+        model_template.clear_templates()
+
+    fresh = [solve_dynamic_ed(p, tee=False, reuse_model=False).cost for p in _scenarios()]
+    assert reused == pytest.approx(fresh, rel=1e-6)
+    # 첫 dispatch 에서 만든 솔버를 이후 dispatch 가 그대로 쓴다
+    assert solvers[0] and all(s == solvers[0] for s in solvers)
@@ -0,0 +1,69 @@
+# tests/test_profile_reader.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.profile_reader import ProfileReader, ProfileSource, ProfileWindow
+from utils.profile_store import ProfileStore, read_timeseries_csv
+
+
+def read_pu_as_mw(path, p_rated_mw=1.0):
+    # 연간 PV reader 처럼 p.u. 열을 MW 열 "pv_power_MW" 로 바꾸는 reader
+    index, cols = read_timeseries_csv(path)
+    return index, {"pv_power_MW": cols["pu"] * p_rated_mw}
+
+
+def _write(path, start, periods, freq, **cols):
+    times = pd.date_range(start, periods=periods, freq=freq)
+    pd.DataFrame({"timestamp_kst": times.strftime("%Y-%m-%d %H:%M"), **cols}).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def sources(tmp_path):
+    load = _write(tmp_path / "load.csv", "2021-04-03", 96 * 3, "15min", power_MW=np.arange(96 * 3, dtype=float))
+    pu = np.tile(np.linspace(0.0, 1.0, 24), 3)
+    pv = _write(tmp_path / "pv_pu.csv", "2021-04-03", 24 * 3, "1h", pu=pu)
+    return load, pv, pu, ProfileStore(str(tmp_path / "store"))
+
+
+def test_pv_source_with_reader_and_kwargs(sources):
+    # PV 만 별도 reader + kwargs 로 열고, 요청한 날만 잘라 MW 로 받는다
+    load, pv, pu, store = sources
+    reader = ProfileReader(load, ProfileSource(pv, read_pu_as_mw, {"p_rated_mw": 100.0}), store=store)
+    assert reader.pv_col == "pv_power_MW"
+
+    window = reader.read_window("2021-04-04", "2021-04-05")
+    assert len(window) == 96 and not window.missing
+    assert window.pv == pytest.approx(np.repeat(pu[24:48], 4) * 100.0)
+    assert window.load == pytest.approx(np.arange(96, 192, dtype=float))
+
+    # kwargs 가 다르면 다른 캐시 항목
+    other = ProfileReader(load, ProfileSource(pv, read_pu_as_mw, {"p_rated_mw": 50.0}), store=store)
+    assert other.read_window("2021-04-04", "2021-04-05").pv == pytest.approx(window.pv / 2)
+    assert store.stats()["entries"] == 3
+
+
+def test_opened_profile_is_used_as_is(sources):
+    load, pv, pu, store = sources
+    profile = store.load(pv, read_pu_as_mw, p_rated_mw=100.0)
+    reader = ProfileReader(store.load(load), profile, store=store)
+    assert reader._pv is profile
+    assert reader.read_window("2021-04-03", hours=24).pv == pytest.approx(np.repeat(pu[:24], 4) * 100.0)
+
+
+def _window(pv):
+    index = pd.date_range("2021-04-03", periods=len(pv), freq="15min").asi8
+    return ProfileWindow(index, np.full(len(pv), 300.0), np.asarray(pv, dtype=float))
+
+
+def test_trim_drops_only_edge_gaps():
+    nan = np.nan
+    window = _window([nan, nan, 1.0, 2.0, 3.0, nan])
+    trimmed = window.trim()
+    assert trimmed.pv.tolist() == [1.0, 2.0, 3.0]
+    assert trimmed.index.tolist() == window.index[2:5].tolist()
+
+    with pytest.raises(ValueError, match="1 steps missing inside"):
+        _window([nan, 1.0, nan, 3.0, nan]).trim()
@@ -0,0 +1,76 @@
+# tests/test_profile_stats.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.profile_stats import LoadProfileStats
+
+WINDOWS = (1, 10, 60)
+ACCURACY = 0.01
+
+
+def _series(rng, n=20_000):
+    # 0.25 초 간격 + 가끔 빈 구간(램프가 끊기는 곳), 값은 양수
+    dt = np.where(rng.random(n) < 0.002, rng.uniform(5, 200, n), 0.25)
+    ts = 1.6e9 + np.cumsum(dt)
+    values = 300.0 + 50.0 * np.sin(ts / 40.0) + rng.normal(0.0, 5.0, n)
+    return ts, values
+
+
+def _expected(ts, values, w):
+    # pandas 로 직접: 블록 평균 → 피크/평균/최소, 연속 블록(key 차이 1) 사이 램프
+    means = pd.Series(values).groupby(np.floor(ts / w).astype(np.int64)).mean()
+    keys = means.index.to_numpy()
+    dp = np.diff(means.to_numpy())[np.diff(keys) == 1]
+    return means.to_numpy(), dp
+
+
+def _random_tree_merge(rng, parts):
+    # 시간순은 지키고 이웃끼리 무작위 순서로 합친다 (worker 결과를 트리로 합치는 경우)
+    parts = list(parts)
+    while len(parts) > 1:
+        i = int(rng.integers(len(parts) - 1))
+        parts[i:i + 2] = [parts[i].merge(parts[i + 1])]
+    return parts[0]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_chunk_splits_and_tree_merge_match_pandas(seed):
+    rng = np.random.default_rng(seed)
+    ts, values = _series(rng)
+    cuts = np.sort(rng.choice(np.arange(1, len(ts)), size=int(rng.integers(5, 60)), replace=False))
+
+    parts = []
+    for chunk in np.split(np.arange(len(ts)), cuts):
+        # partial 하나가 chunk 를 다시 여러 번 add 하기도 한다
+        stats = LoadProfileStats(WINDOWS, ACCURACY)
+        for sub in np.array_split(chunk, int(rng.integers(1, 4))):
+            stats.add(ts[sub], values[sub])
+        parts.append(stats)
+    summary = _random_tree_merge(rng, parts).summary(quantiles=(0.5, 0.95))
+
+    assert summary["samples"]["count"] == len(ts)
+    assert summary["samples"]["sum"] == pytest.approx(values.sum())
+    for w in WINDOWS:
+        means, dp = _expected(ts, values, w)
+        row = summary[w]
+        assert row["blocks"] == len(means)
+        assert row["peak"] == pytest.approx(means.max())
+        assert row["min"] == pytest.approx(means.min())
+        assert row["mean"] == pytest.approx(means.mean())
+        assert row["ramps"] == len(dp)
+        assert row["ramp_max_up"] == pytest.approx(dp.max())
+        assert row["ramp_max_down"] == pytest.approx(dp.min())
+        for q in (0.5, 0.95):
+            assert row[f"p{q * 100:g}"] == pytest.approx(np.quantile(means, q), rel=2 * ACCURACY)
+
+
+def test_merge_requires_time_order():
+    rng = np.random.default_rng(0)
+    ts, values = _series(rng, 2_000)
+    early, late = LoadProfileStats(WINDOWS), LoadProfileStats(WINDOWS)
+    early.add(ts[:1000], values[:1000])
+    late.add(ts[1000:], values[1000:])
+    with pytest.raises(ValueError, match="time order"):
+        late.merge(early)
@@ -0,0 +1,245 @@
+# utils/alignment.py
+"""
+여러 해상도 시계열(1초 부하, 1시간 PV, 요금표 …)을 하나의 목표 격자(TimeGrid)에 맞추는 정렬 단계.
+- 모든 시각은 int64 epoch ns. 시리즈마다 한 번의 벡터 연산으로 격자 값을 만든다
+  · mean        : [g, g + step) 구간 샘플 평균 (다운샘플, 블록 단위 bincount 라 1년치 1초 memmap 도 메모리 일정)
+  · ffill       : g 이전(포함) 마지막 샘플을 유지 (tolerance 를 주면 샘플 값은 [t, t + tolerance) 동안만 유효)
+  · interpolate : g 양옆 샘플 선형 보간 (두 샘플 간격이 tolerance 를 넘으면 비움)
+  · asof        : as-of join. direction = backward / forward / nearest, tolerance 기본 = 격자 간격
+- 값을 못 만든 격자점은 NaN 으로 두고 시리즈별 GapReport (빈 구간 목록) 로 알려 준다
+  → exact-match inner merge 처럼 안 맞는 행을 조용히 버리지 않는다
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from utils.profile_store import as_epoch_ns
+
+ALIGN_METHODS = ("mean", "ffill", "interpolate", "asof")
+ASOF_DIRECTIONS = ("backward", "forward", "nearest")
+_SEC_NS = 10**9
+_BLOCK = 1 << 22        # mean / 정렬 검사 블록 크기 (샘플 수)
+
+
+@dataclass
+class TimeGrid:
+    """start 부터 step 간격 n 개의 격자점 (epoch ns). 격자점 g 는 [g, g + step) 구간을 대표한다."""
+    start: int
+    step: int
+    n: int
+
+    @classmethod
+    def from_range(cls, start, end, step_s: float) -> "TimeGrid":
+        # [start, end) 를 step_s 초 간격으로 덮는 격자
+        lo, hi = as_epoch_ns(start), as_epoch_ns(end)
+        step = int(round(step_s * _SEC_NS))
+        if step <= 0:
+            raise ValueError(f"grid step must be positive (got {step_s} s)")
+        return cls(lo, step, max(0, math.ceil((hi - lo) / step)))
+
+    @property
+    def end(self) -> int:
+        return self.start + self.n * self.step
+
+    @property
+    def index(self) -> np.ndarray:
+        return self.start + np.arange(self.n, dtype=np.int64) * self.step
+
+    def __len__(self) -> int:
+        return self.n
+
+
+@dataclass
+class SeriesSpec:
+    """정렬할 시리즈 하나. index 는 int64 epoch ns (memmap 그대로 줘도 된다), tolerance 는 초."""
+    name: str
+    index: np.ndarray
+    values: np.ndarray
+    method: str = "mean"
+    tolerance: Optional[float] = None
+    direction: str = "backward"
+
+
+@dataclass
+class GapReport:
+    name: str
+    method: str
+    missing: int
+    total: int
+    runs: np.ndarray = field(default_factory=lambda: np.empty((0, 2), dtype=np.int64))   # (k, 2) [start, end) ns
+
+    @property
+    def coverage(self) -> float:
+        return 1.0 - self.missing / self.total if self.total else 0.0
+
+    def describe(self, max_runs: int = 3, fmt: str = "%Y-%m-%d %H:%M") -> str:
+        if not self.missing:
+            return f"{self.name} ({self.method}): complete"
+        shown = [f"{pd.Timestamp(int(s)).strftime(fmt)} ~ {pd.Timestamp(int(e)).strftime(fmt)}"
+                 for s, e in self.runs[:max_runs]]
+        more = f" … +{len(self.runs) - max_runs}" if len(self.runs) > max_runs else ""
+        return (f"{self.name} ({self.method}): {self.missing:,}/{self.total:,} steps missing "
+                f"in {len(self.runs)} gap(s) [{', '.join(shown)}{more}]")
+
+
+@dataclass
+class AlignedFrame:
+    """격자 하나에 맞춘 시리즈 묶음. 빈 격자점은 NaN, gaps 에 시리즈별 빈 구간."""
+    grid: TimeGrid
+    columns: Dict[str, np.ndarray]
+    gaps: Dict[str, GapReport]
+
+    def __len__(self) -> int:
+        return self.grid.n
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    @property
+    def index(self) -> np.ndarray:
+        return self.grid.index
+
+    def complete(self) -> np.ndarray:
+        # 모든 시리즈에 값이 있는 격자점
+        mask = np.ones(self.grid.n, dtype=bool)
+        for v in self.columns.values():
+            mask &= ~np.isnan(v)
+        return mask
+
+    @property
+    def has_gaps(self) -> bool:
+        return any(g.missing for g in self.gaps.values())
+
+    def report(self):
+        for g in self.gaps.values():
+            print(f"   >> [Align] {g.describe()}")
+
+    def to_pandas(self) -> pd.DataFrame:
+        return pd.DataFrame(self.columns, index=pd.DatetimeIndex(self.index.view("datetime64[ns]"), name="timestamp"))
+
+
+def _sorted_series(index: np.ndarray, values: np.ndarray):
+    # lookup 계열은 시각 정렬이 필요하다. 이미 정렬돼 있으면(profile store 등) 복사 없이 그대로 쓴다
+    for lo in range(0, len(index), _BLOCK):
+        blk = np.asarray(index[lo:lo + _BLOCK + 1])
+        if np.any(blk[1:] < blk[:-1]):
+            order = np.argsort(index, kind="stable")
+            return np.asarray(index)[order], np.asarray(values)[order]
+    return index, values
+
+
+def _mean(index: np.ndarray, values: np.ndarray, grid: TimeGrid) -> np.ndarray:
+    sums = np.zeros(grid.n)
+    counts = np.zeros(grid.n, dtype=np.int64)
+    for lo in range(0, len(index), _BLOCK):
+        t = np.asarray(index[lo:lo + _BLOCK])
+        v = np.asarray(values[lo:lo + _BLOCK], dtype=np.float64)
+        ok = (t >= grid.start) & (t < grid.end) & ~np.isnan(v)
+        b = (t[ok] - grid.start) // grid.step
+        sums += np.bincount(b, weights=v[ok], minlength=grid.n)
+        counts += np.bincount(b, minlength=grid.n)
+    out = np.full(grid.n, np.nan)
+    np.divide(sums, counts, out=out, where=counts > 0)
+    return out
+
+
+def _asof(index: np.ndarray, values: np.ndarray, g: np.ndarray, direction: str,
+          tol: Optional[int], strict: bool = False) -> np.ndarray:
+    m = len(index)
+    out = np.full(len(g), np.nan)
+    if m == 0:
+        return out
+    back = np.searchsorted(index, g, side="right") - 1         # g 이전(포함) 마지막 샘플
+    fwd = np.searchsorted(index, g, side="left")                # g 이후(포함) 첫 샘플
+    d_back = np.where(back >= 0, g - np.asarray(index[np.clip(back, 0, m - 1)]), np.iinfo(np.int64).max)
+    d_fwd = np.where(fwd < m, np.asarray(index[np.clip(fwd, 0, m - 1)]) - g, np.iinfo(np.int64).max)
+    if direction == "backward":
+        pos, dist = back, d_back
+    elif direction == "forward":
+        pos, dist = fwd, d_fwd
+    else:
+        use_fwd = d_fwd < d_back
+        pos, dist = np.where(use_fwd, fwd, back), np.where(use_fwd, d_fwd, d_back)
+    ok = dist != np.iinfo(np.int64).max
+    if tol is not None:
+        ok &= (dist < tol) if strict else (dist <= tol)
+    out[ok] = np.asarray(values[pos[ok]], dtype=np.float64)
+    return out
+
+
+def _interpolate(index: np.ndarray, values: np.ndarray, g: np.ndarray, tol: Optional[int]) -> np.ndarray:
+    m = len(index)
+    out = np.full(len(g), np.nan)
+    if m == 0:
+        return out
+    left = np.searchsorted(index, g, side="right") - 1
+    valid = left >= 0
+    li = np.clip(left, 0, m - 1)
+    ri = np.clip(left + 1, 0, m - 1)
+    tl, tr = np.asarray(index[li]), np.asarray(index[ri])
+    vl, vr = np.asarray(values[li], dtype=np.float64), np.asarray(values[ri], dtype=np.float64)
+    exact = valid & (tl == g)
+    between = valid & ~exact & (left + 1 < m)
+    if tol is not None:
+        between &= (tr - tl) <= tol
+    out[exact] = vl[exact]
+    w = (g[between] - tl[between]) / (tr[between] - tl[between])
+    out[between] = vl[between] + (vr[between] - vl[between]) * w
+    return out
+
+
+def gap_runs(missing: np.ndarray, grid: TimeGrid) -> np.ndarray:
+    # 연속된 빈 격자점 → (k, 2) [start, end) epoch ns
+    edges = np.diff(np.concatenate(([0], missing.astype(np.int8), [0])))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    return np.stack([grid.start + starts * grid.step, grid.start + ends * grid.step], axis=1).astype(np.int64)
+
+
+def align_series(index: np.ndarray, values: np.ndarray, grid: TimeGrid, method: str = "mean",
+                 tolerance: Optional[float] = None, direction: str = "backward") -> np.ndarray:
+    """시리즈 하나 → 격자 값 (grid.n,). 값을 못 만든 점은 NaN (원본 NaN 샘플도 빈 값으로 전파)."""
+    if method not in ALIGN_METHODS:
+        raise ValueError(f"unknown align method '{method}' (expected one of {ALIGN_METHODS})")
+    if direction not in ASOF_DIRECTIONS:
+        raise ValueError(f"unknown as-of direction '{direction}' (expected one of {ASOF_DIRECTIONS})")
+    if len(index) != len(values):
+        raise ValueError(f"index/values length mismatch ({len(index)} vs {len(values)})")
+    if method == "mean":
+        return _mean(index, values, grid)
+
+    index, values = _sorted_series(index, values)
+    tol = None if tolerance is None else int(round(tolerance * _SEC_NS))
+    if method == "asof" and tol is None:
+        tol = grid.step
+    if method == "interpolate":
+        return _interpolate(index, values, grid.index, tol)
+    if method == "ffill":
+        return _asof(index, values, grid.index, "backward", tol, strict=True)
+    return _asof(index, values, grid.index, direction, tol)
+
+
+def align(series: Sequence[SeriesSpec], grid: TimeGrid) -> AlignedFrame:
+    """시리즈들을 같은 격자에 맞추고 시리즈별 빈 구간을 모은다."""
+    columns: Dict[str, np.ndarray] = {}
+    gaps: Dict[str, GapReport] = {}
+    for s in series:
+        col = align_series(s.index, s.values, grid, s.method, s.tolerance, s.direction)
+        missing = np.isnan(col)
+        columns[s.name] = col
+        gaps[s.name] = GapReport(s.name, s.method, int(missing.sum()), grid.n, gap_runs(missing, grid))
+    return AlignedFrame(grid, columns, gaps)
+
+
+def infer_step(index: np.ndarray, sample: int = 1024) -> float:
+    # 앞부분 샘플 간격의 중앙값 [s] (격자 간격을 따로 주지 않았을 때)
+    head = np.asarray(index[:sample])
+    diffs = np.diff(head)
+    diffs = diffs[diffs > 0]
+    if not len(diffs):
+        raise ValueError("cannot infer step from fewer than two distinct timestamps")
+    return float(np.median(diffs)) / _SEC_NS
+
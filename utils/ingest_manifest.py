@@ -0,0 +1,255 @@
+# utils/ingest_manifest.py
+"""
+Supercloud GPU trace 증분 집계.
+- 처리한 파일마다 (size, mtime, 내용 해시, timestamp 범위, 행 수) 를 manifest 에 남기고
+  파일별 bin 부분 집계(BinAggregate)를 state_dir 에 같이 저장
+- 다음 실행에서는 새 파일 / 내용이 바뀐 파일 / 집계 기간(watermark) 변경에 걸리는 파일만 다시 읽고,
+  없어진 파일은 부분 집계를 뺀다 → 월 단위 갱신 비용이 새 데이터 양에 비례
+"""
+
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.profile_store import file_hash
+from utils.supercloud_ingest import (BinAggregate, IngestStats, _folder_paths, _map_folders, list_gpu_csvs,
+                                     read_file_bins)
+
+# manifest / 부분 집계 포맷이 바뀌면 올려서 예전 state 를 버리게 한다
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class FileRecord:
+    size: int
+    mtime_ns: int
+    hash: str
+    t_min: Optional[float] = None    # 파일 전체 timestamp 범위 (기간 필터 전)
+    t_max: Optional[float] = None
+    rows: int = 0
+    kept: int = 0
+    skipped: bool = False            # 읽기 실패 (파일이 바뀌기 전까지 다시 시도하지 않음)
+    range_start: Optional[float] = None   # 부분 집계를 만들 때 쓴 기간 (None = 열린 경계)
+    range_end: Optional[float] = None
+
+
+def _rel(path: str, base_dir: str) -> str:
+    return os.path.relpath(path, base_dir).replace(os.sep, "/")
+
+
+def _boundary_hit(rec: FileRecord, old: Optional[float], new: Optional[float], upper: bool) -> bool:
+    # 기간 경계가 old → new 로 움직였을 때 그 사이에 이 파일의 데이터가 있는지 (None = 열린 경계)
+    if old == new or rec.t_min is None:
+        return False
+    inf = np.inf if upper else -np.inf
+    lo, hi = sorted((inf if old is None else old, inf if new is None else new))
+    if upper:
+        return rec.t_max > lo and rec.t_min <= hi
+    return rec.t_min < hi and rec.t_max >= lo
+
+
+class IngestManifest:
+    """
+    state_dir/manifest.json (파일 기록 + 집계 기간) 과 state_dir/bins_<gen>.npz (파일별 부분 집계).
+    npz 를 먼저 새 세대 이름으로 쓰고 manifest 를 마지막에 바꿔서, 중간에 죽어도 이전 state 가 그대로 남는다.
+    """
+
+    MANIFEST = "manifest.json"
+
+    def __init__(self, state_dir: str, bin_size: int):
+        self.state_dir = state_dir
+        self.bin_size = bin_size
+        self.start_ts: Optional[float] = None
+        self.end_ts: Optional[float] = None
+        self.generation = 0
+        self.records: Dict[str, FileRecord] = {}
+        self.partials: Dict[str, BinAggregate] = {}
+
+    @classmethod
+    def open(cls, state_dir: str, bin_size: int) -> "IngestManifest":
+        man = cls(state_dir, bin_size)
+        try:
+            with open(os.path.join(state_dir, cls.MANIFEST), encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return man
+        if data.get("version") != MANIFEST_VERSION or data.get("bin_size") != bin_size:
+            print(f">> [Ingest] Manifest in {state_dir} is for a different format/bin size, starting over")
+            return man
+        man.start_ts, man.end_ts = data["start_ts"], data["end_ts"]
+        man.generation = data["generation"]
+        man.records = {rel: FileRecord(**rec) for rel, rec in data["files"].items()}
+        with np.load(os.path.join(state_dir, data["bins_file"])) as z:
+            names, offsets = z["names"], z["offsets"]
+            keys, sums, counts = z["keys"], z["sums"], z["counts"]
+        for i, rel in enumerate(names.tolist()):
+            lo, hi = offsets[i], offsets[i + 1]
+            man.partials[rel] = BinAggregate(keys[lo:hi], sums[lo:hi], counts[lo:hi])
+        return man
+
+    def save(self):
+        os.makedirs(self.state_dir, exist_ok=True)
+        self.generation += 1
+        bins_file = f"bins_{self.generation}.npz"
+        names = list(self.partials)
+        parts = [self.partials[n] for n in names]
+        offsets = np.zeros(len(parts) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(p) for p in parts])
+        with open(os.path.join(self.state_dir, bins_file), "wb") as f:
+            np.savez(f, names=np.array(names, dtype=str), offsets=offsets,
+                     keys=np.concatenate([p.keys for p in parts]) if parts else np.empty(0, dtype=np.int64),
+                     sums=np.concatenate([p.sums for p in parts]) if parts else np.empty(0),
+                     counts=np.concatenate([p.counts for p in parts]) if parts else np.empty(0, dtype=np.int64))
+
+        path = os.path.join(self.state_dir, self.MANIFEST)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": MANIFEST_VERSION, "bin_size": self.bin_size,
+                "start_ts": self.start_ts, "end_ts": self.end_ts,
+                "generation": self.generation, "bins_file": bins_file,
+                "files": {rel: asdict(rec) for rel, rec in self.records.items()},
+            }, f)
+        os.replace(tmp, path)
+
+        for fname in os.listdir(self.state_dir):
+            if fname.startswith("bins_") and fname.endswith(".npz") and fname != bins_file:
+                try:
+                    os.remove(os.path.join(self.state_dir, fname))
+                except OSError:
+                    pass
+
+    def needs_read(self, rel: str, st: os.stat_result, start_ts: float,
+                   end_ts: Optional[float]) -> Tuple[bool, bool]:
+        """
+        (다시 볼지, 해시가 같아도 다시 읽어야 하는지).
+        - 새 파일, (size, mtime) 이 바뀐 파일 → 해시를 보고 바뀌었으면 읽는다
+        - 이 파일을 집계한 기간의 경계가 움직였고 그 사이에 데이터가 있는 파일 → 무조건 다시 읽는다
+        """
+        rec = self.records.get(rel)
+        if rec is None:
+            return True, False
+        if _boundary_hit(rec, rec.range_start, start_ts, upper=False) \
+                or _boundary_hit(rec, rec.range_end, end_ts, upper=True):
+            return True, True
+        return (st.st_size, st.st_mtime_ns) != (rec.size, rec.mtime_ns), False
+
+    def update(self, rel: str, rec: FileRecord, part: Optional[BinAggregate]):
+        # part 가 None 이면 내용이 그대로라 기록(mtime)만 갱신
+        self.records[rel] = rec
+        if part is not None:
+            self.partials[rel] = part
+
+    def drop(self, rel: str):
+        self.records.pop(rel, None)
+        self.partials.pop(rel, None)
+
+    def total(self, folders: Optional[Sequence[str]] = None) -> BinAggregate:
+        # folders 를 주면 그 폴더(base_dir 기준 첫 경로)의 파일만 합친다
+        parts = [p for rel, p in self.partials.items() if folders is None or rel.split("/")[0] in folders]
+        return BinAggregate().merge(*parts) if parts else BinAggregate()
+
+    @property
+    def watermark(self) -> Optional[float]:
+        # 집계에 반영된 마지막 시각: 마지막 실행의 기간 끝 (열려 있으면 읽은 데이터의 최대 timestamp)
+        t_max = [rec.t_max for rec in self.records.values() if rec.t_max is not None]
+        if not t_max:
+            return None
+        return max(t_max) if self.end_ts is None else min(self.end_ts, max(t_max))
+
+
+def _ingest_files(item: Tuple[str, List[tuple]], start_ts: float, end_ts: Optional[float], bin_size: int,
+                  chunksize: int) -> Tuple[str, List[Tuple[str, FileRecord, Optional[BinAggregate]]], IngestStats]:
+    # worker: 폴더 하나에서 다시 봐야 하는 파일들만 해시 확인 후 집계
+    folder_path, tasks = item
+    folder = os.path.basename(os.path.normpath(folder_path))
+    stats = IngestStats()
+    t0 = time.perf_counter()
+    hi = np.inf if end_ts is None else end_ts
+    results = []
+    for rel, fp, size, mtime_ns, old, force in tasks:
+        try:
+            digest = file_hash(fp)
+        except OSError:
+            stats.skipped_files += 1
+            continue
+        if old is not None and not force and digest == old.hash:
+            # touch/복사로 mtime 만 바뀜
+            results.append((rel, FileRecord(**{**asdict(old), "size": size, "mtime_ns": mtime_ns}), None))
+            stats.unchanged_files += 1
+            continue
+        try:
+            res = read_file_bins(fp, start_ts, hi, bin_size, chunksize)
+        except (ValueError, pd.errors.ParserError, UnicodeDecodeError, OSError):
+            results.append((rel, FileRecord(size, mtime_ns, digest, skipped=True, range_start=start_ts,
+                                            range_end=end_ts), BinAggregate()))
+            stats.skipped_files += 1
+            continue
+        results.append((rel, FileRecord(size, mtime_ns, digest, res.t_min, res.t_max, res.rows, res.kept,
+                                        range_start=start_ts, range_end=end_ts), res.bins))
+        stats.files += 1
+        stats.rows += res.rows
+        stats.kept_rows += res.kept
+        stats.bytes += size
+    stats.elapsed = time.perf_counter() - t0
+    return folder, results, stats
+
+
+def aggregate_supercloud_incremental(base_dir: str, folders: Sequence[str], start_ts: float,
+                                     end_ts: Optional[float], state_dir: str, bin_size: int = 900,
+                                     workers: Optional[int] = None,
+                                     chunksize: int = 1_000_000) -> Tuple[BinAggregate, IngestStats]:
+    """
+    aggregate_supercloud 의 증분 버전 (bin 집계만, 폴더별 merged CSV 는 쓰지 않는다).
+    state_dir 의 manifest 와 비교해 새/바뀐 파일만 프로세스 풀에서 읽어 기존 부분 집계에 반영한다.
+    end_ts=None 이면 기간 끝을 열어 두고 들어온 데이터를 모두 반영한다 (watermark = 최대 timestamp).
+    """
+    t_start = time.perf_counter()
+    manifest = IngestManifest.open(state_dir, bin_size)
+    paths = _folder_paths(base_dir, folders)
+
+    total = IngestStats()
+    items, seen = [], set()
+    for folder_path in paths:
+        tasks = []
+        for fp in list_gpu_csvs(folder_path):
+            rel = _rel(fp, base_dir)
+            seen.add(rel)
+            st = os.stat(fp)
+            check, force = manifest.needs_read(rel, st, start_ts, end_ts)
+            if not check:
+                total.unchanged_files += 1
+                continue
+            tasks.append((rel, fp, st.st_size, st.st_mtime_ns, manifest.records.get(rel), force))
+        if tasks:
+            items.append((folder_path, tasks))
+
+    # 이번에 훑은 폴더에서 사라진 파일은 집계에서 뺀다 (다른 폴더 기록은 그대로)
+    scanned = {_rel(p, base_dir) for p in paths}
+    removed = [rel for rel in manifest.records if rel.split("/")[0] in scanned and rel not in seen]
+    for rel in removed:
+        manifest.drop(rel)
+    n_tasks = sum(len(t) for _, t in items)
+    print(f">> [Ingest] Incremental: {n_tasks} new/changed files, {total.unchanged_files} unchanged, "
+          f"{len(removed)} removed")
+
+    for folder, results, stats in _map_folders(_ingest_files, items, workers, start_ts, end_ts, bin_size,
+                                               chunksize):
+        for rel, rec, part in results:
+            manifest.update(rel, rec, part)
+        total.add(stats)
+        print(f"   [{folder}] {stats.summary()}")
+
+    manifest.start_ts, manifest.end_ts = start_ts, end_ts
+    manifest.save()
+    bins = manifest.total(scanned)
+    total.elapsed = time.perf_counter() - t_start
+    wm = manifest.watermark
+    wm_str = pd.to_datetime(wm, unit="s", utc=True).strftime("%Y-%m-%d %H:%M:%S") if wm is not None else "-"
+    print(f">> [Ingest] done: {total.summary()}, watermark {wm_str} UTC")
+    return bins, total
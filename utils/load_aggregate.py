@@ -0,0 +1,178 @@
+# utils/load_aggregate.py
+"""
+부하 시계열 다중 해상도 집계 (한 번의 스캔).
+- 가장 고운 해상도(base, 예: 0.1 초)에서만 원시 샘플을 누적: step 별 전력 합(= 그 순간 전체 부하)과 샘플 수
+- 더 거친 해상도(1 s, 10 s, 1 min, 15 min, 1 h …)는 base 배열을 reshape 해서 말아 올린다(roll-up)
+  → 해상도를 추가해도 원시 데이터를 다시 읽지 않는다
+- base 배열이 크면(한 달 × 0.1 s ≈ 2,600만 step) np.memmap 으로 디스크에 두고 블록 단위로 처리
+"""
+
+import os
+import shutil
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# 해상도 [s] → 출력 라벨
+DEFAULT_RESOLUTIONS = (0.1, 1, 10, 60, 900, 3600)
+_TICK = 100            # 내부 시간 단위: 0.01 초 (원시 timestamp 를 소수 둘째 자리로 반올림하던 기존 방식과 같음)
+_MEMMAP_BYTES = 256 * 1024 * 1024   # base 배열이 이보다 크면 memmap_dir 에 둔다
+_BLOCK_STEPS = 1 << 22              # roll-up / merge 블록 크기 (base step 수, 최대 해상도 배수로 맞춤)
+
+
+def resolution_label(seconds: float) -> str:
+    if seconds < 1:
+        return f"{int(round(seconds * 1000))}ms"
+    if seconds < 60:
+        return f"{int(seconds)}s"
+    if seconds < 3600:
+        return f"{int(seconds // 60)}min"
+    return f"{int(seconds // 3600)}h"
+
+
+@dataclass
+class ResolutionSpec:
+    seconds: float
+    ticks: int      # 0.01 초 단위
+    factor: int     # base step 몇 개가 한 bin 인지
+
+
+class MultiResolutionAggregate:
+    """
+    [start_ts, end_ts] 구간을 base 해상도 dense 배열(sum, samples)로 누적하는 부분 집계.
+    worker 마다 하나씩 만들어 add 로 채우고 merge 로 합친 뒤 frames() 로 모든 해상도를 꺼낸다.
+    """
+
+    def __init__(self, start_ts: float, end_ts: float, resolutions: Sequence[float] = DEFAULT_RESOLUTIONS,
+                 memmap_dir: Optional[str] = None):
+        res = sorted(float(r) for r in resolutions)
+        base_ticks = int(round(res[0] * _TICK))
+        if base_ticks <= 0:
+            raise ValueError(f"finest resolution {res[0]} s is below 0.01 s")
+        self.specs = []
+        for r in res:
+            ticks = int(round(r * _TICK))
+            if ticks % base_ticks:
+                raise ValueError(f"resolution {r} s is not a multiple of base resolution {res[0]} s")
+            self.specs.append(ResolutionSpec(r, ticks, ticks // base_ticks))
+        self.base_ticks = base_ticks
+        coarse = self.specs[-1].ticks
+        if any(coarse % spec.ticks for spec in self.specs):
+            # 모든 bin 이 가장 거친 bin 안에 딱 맞게 들어가야 블록 단위 roll-up 이 가능
+            raise ValueError(f"every resolution must divide the coarsest one ({res[-1]} s)")
+
+        # 시작을 가장 거친 해상도 경계(epoch 기준)에 맞춰 모든 bin 이 정각에 시작하도록
+        self.start_tick = int(np.floor(start_ts * _TICK / coarse)) * coarse
+        self.start_ts = float(start_ts)
+        self.end_ts = float(end_ts)
+        n = int(np.ceil((end_ts * _TICK - self.start_tick + 1) / coarse)) * self.specs[-1].factor
+        self.n_steps = max(n, self.specs[-1].factor)
+
+        self.memmap_dir = None
+        if memmap_dir and self.n_steps * 16 > _MEMMAP_BYTES:
+            os.makedirs(memmap_dir, exist_ok=True)
+            self.memmap_dir = memmap_dir
+            self._open_memmap("w+")
+        else:
+            self.sums = np.zeros(self.n_steps)
+            self.samples = np.zeros(self.n_steps, dtype=np.int64)
+        self.rows = 0
+
+    def _open_memmap(self, mode: str):
+        self.sums = np.memmap(os.path.join(self.memmap_dir, "sums.f8"), dtype=np.float64, mode=mode,
+                              shape=(self.n_steps,))
+        self.samples = np.memmap(os.path.join(self.memmap_dir, "samples.i8"), dtype=np.int64, mode=mode,
+                                 shape=(self.n_steps,))
+
+    def __getstate__(self):
+        # memmap 이면 배열 대신 파일 경로만 넘긴다 (worker → 부모 프로세스)
+        state = self.__dict__.copy()
+        if self.memmap_dir is not None:
+            self.sums.flush()
+            self.samples.flush()
+            del state["sums"], state["samples"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.memmap_dir is not None:
+            self._open_memmap("r+")
+
+    @property
+    def base_seconds(self) -> float:
+        return self.specs[0].seconds
+
+    def add(self, ts: np.ndarray, power: np.ndarray) -> int:
+        # 원시 샘플 누적. [start_ts, end_ts] 밖/NaN 은 버리고 들어간 행 수를 돌려준다
+        # (start_tick 은 경계에 맞춰 내림한 값이라 start_ts 앞 샘플도 bin 안에 들어올 수 있으므로 따로 거른다)
+        ok = np.isfinite(ts) & np.isfinite(power) & (ts >= self.start_ts) & (ts <= self.end_ts)
+        idx = (np.rint(ts[ok] * _TICK).astype(np.int64) - self.start_tick) // self.base_ticks
+        pw = power[ok]
+        inside = (idx >= 0) & (idx < self.n_steps)
+        idx, pw = idx[inside], pw[inside]
+        if len(idx) == 0:
+            return 0
+        # GPU 별 파일은 시간순이라 chunk 하나의 step 범위가 좁다 → 그 범위만 bincount
+        lo, hi = int(idx.min()), int(idx.max()) + 1
+        self.sums[lo:hi] += np.bincount(idx - lo, weights=pw, minlength=hi - lo)
+        self.samples[lo:hi] += np.bincount(idx - lo, minlength=hi - lo)
+        self.rows += len(idx)
+        return len(idx)
+
+    def merge(self, other: "MultiResolutionAggregate") -> "MultiResolutionAggregate":
+        if (other.start_tick, other.base_ticks, other.n_steps) != (self.start_tick, self.base_ticks, self.n_steps):
+            raise ValueError("cannot merge aggregates with different time grids")
+        for lo in range(0, self.n_steps, _BLOCK_STEPS):
+            hi = min(lo + _BLOCK_STEPS, self.n_steps)
+            self.sums[lo:hi] += other.sums[lo:hi]
+            self.samples[lo:hi] += other.samples[lo:hi]
+        self.rows += other.rows
+        return self
+
+    def _rollup(self, spec: ResolutionSpec) -> pd.DataFrame:
+        # base step 합(순간 전체 부하)을 factor 개씩 묶어 sum/mean/min/max/count. 데이터 없는 step 은 제외
+        block = max(_BLOCK_STEPS // self.specs[-1].factor, 1) * self.specs[-1].factor
+        parts = []
+        for lo in range(0, self.n_steps, block):
+            hi = min(lo + block, self.n_steps)
+            tot = np.asarray(self.sums[lo:hi]).reshape(-1, spec.factor)
+            smp = np.asarray(self.samples[lo:hi]).reshape(-1, spec.factor)
+            present = smp > 0
+            count = present.sum(axis=1)
+            keep = count > 0
+            if not keep.any():
+                continue
+            tot, present, count = tot[keep], present[keep], count[keep]
+            s = tot.sum(axis=1)
+            parts.append(pd.DataFrame({
+                "timestamp": (self.start_tick + (lo // spec.factor + np.flatnonzero(keep)) * spec.ticks) / _TICK,
+                "sum_W": s,
+                "mean_W": s / count,
+                "min_W": np.where(present, tot, np.inf).min(axis=1),
+                "max_W": np.where(present, tot, -np.inf).max(axis=1),
+                "count": count,
+                "samples": smp[keep].sum(axis=1),
+            }))
+        if not parts:
+            return pd.DataFrame(columns=["timestamp", "sum_W", "mean_W", "min_W", "max_W", "count", "samples"])
+        return pd.concat(parts, ignore_index=True)
+
+    def frames(self) -> Dict[str, pd.DataFrame]:
+        """
+        해상도 라벨 → DataFrame(timestamp[bin 시작, UTC epoch s], sum_W, mean_W, min_W, max_W, count, samples).
+        sum/mean/min/max 는 base step 별 전체 부하(모든 GPU 합)에 대한 통계, count 는 데이터가 있는 base step 수,
+        samples 는 원시 샘플 수. 에너지 [Wh] = sum_W × base 해상도 / 3600.
+        """
+        return {resolution_label(spec.seconds): self._rollup(spec) for spec in self.specs}
+
+    def close(self, remove: bool = False):
+        # memmap 정리 (remove=True 면 파일도 삭제)
+        if self.memmap_dir is None:
+            return
+        self.sums.flush()
+        self.samples.flush()
+        del self.sums, self.samples
+        if remove:
+            shutil.rmtree(self.memmap_dir, ignore_errors=True)
@@ -0,0 +1,177 @@
+# utils/load_transform.py
+"""
+원시 GPU 전력 trace (timestamp, power_draw_W) → 데이터센터 시설 부하 변환 단계.
+- 사이트 규모: 원시 IT 부하의 peak 을 it_peak_mw 로 맞추는 배율 (예: 1_day_data.csv peak 249 kW → 300 MW)
+- PUE: 상수, 또는 IT 이용률에 따라 달라지는 (이용률, PUE) 곡선 (저부하일수록 냉각/UPS 고정 손실 비중이 커짐)
+- 단위 변환: 입력 W → 출력 MW (kW/GW 도 가능)
+- chunk 단위로 스트리밍하며 벡터 연산만 쓰고, 여러 사이트 규모를 한 번의 스캔으로 같이 만든다
+  → 예전에 오프라인으로 만들던 1_day_data_scaled_300MW_PUE1.5.csv 를 write_scaled_csvs 로 재현
+"""
+
+import argparse
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from utils.supercloud_ingest import TS_COL, read_power_chunks
+
+_UNITS = {"W": 1.0, "kW": 1e3, "MW": 1e6, "GW": 1e9}
+
+# 상수 PUE 또는 (IT 이용률 0~1, PUE) 점 목록
+PUE = Union[float, Sequence[Tuple[float, float]]]
+
+
+@dataclass
+class SiteSpec:
+    """
+    사이트 하나. 원시 IT 부하 peak 을 it_peak_mw 로 맞춘 뒤(None 이면 원래 크기) PUE 를 곱해 시설 부하로 바꾼다.
+    pue 가 곡선이면 이용률 = IT 부하 / it_peak_mw 에서 선형 보간 (범위 밖은 양 끝 값).
+    """
+    it_peak_mw: Optional[float] = 300.0
+    pue: PUE = 1.5
+    unit: str = "MW"
+    column: Optional[str] = None     # 출력 열 이름 (기본 power_total_scaled_<unit>)
+
+    def __post_init__(self):
+        if self.unit not in _UNITS:
+            raise ValueError(f"unknown unit '{self.unit}' (expected one of {tuple(_UNITS)})")
+        if self.it_peak_mw is not None and self.it_peak_mw <= 0:
+            raise ValueError(f"it_peak_mw must be positive (got {self.it_peak_mw})")
+        if np.isscalar(self.pue):
+            if self.pue < 1.0:
+                raise ValueError(f"PUE must be >= 1 (got {self.pue})")
+            return
+        if self.it_peak_mw is None:
+            raise ValueError("a load-dependent PUE curve needs it_peak_mw to define utilization")
+        pts = np.asarray(self.pue, dtype=np.float64)
+        if pts.ndim != 2 or pts.shape[1] != 2 or len(pts) < 2:
+            raise ValueError("PUE curve must be a list of at least two (utilization, PUE) points")
+        if np.any(np.diff(pts[:, 0]) <= 0) or np.any(pts[:, 1] < 1.0):
+            raise ValueError("PUE curve needs increasing utilization and PUE >= 1")
+
+    @property
+    def label(self) -> str:
+        # 파일 이름용: 300MW_PUE1.5 / 100MW_PUEcurve / raw_PUE1.5
+        size = f"{self.it_peak_mw:g}MW" if self.it_peak_mw is not None else "raw"
+        pue = f"PUE{self.pue:g}" if np.isscalar(self.pue) else "PUEcurve"
+        return f"{size}_{pue}"
+
+    @property
+    def out_column(self) -> str:
+        return self.column or f"power_total_scaled_{self.unit}"
+
+    def facility_mw(self, it_mw: np.ndarray) -> np.ndarray:
+        # IT 부하 [MW] → 시설 전체 부하 [MW]
+        if np.isscalar(self.pue):
+            return it_mw * self.pue
+        pts = np.asarray(self.pue, dtype=np.float64)
+        return it_mw * np.interp(it_mw / self.it_peak_mw, pts[:, 0], pts[:, 1])
+
+
+class LoadTransform:
+    """
+    여러 SiteSpec 을 한 번에 적용. reference_w 는 원시 IT 부하 peak (it_peak_mw 에 맞출 기준, 입력 단위).
+    apply(power) → {site.label: 시설 부하 (site.unit)}.
+    """
+
+    def __init__(self, sites: Sequence[SiteSpec], reference_w: Optional[float] = None, input_unit: str = "W"):
+        if not sites:
+            raise ValueError("at least one site is required")
+        labels = [s.label for s in sites]
+        if len(set(labels)) != len(labels):
+            raise ValueError(f"duplicate sites: {labels}")
+        if input_unit not in _UNITS:
+            raise ValueError(f"unknown input unit '{input_unit}' (expected one of {tuple(_UNITS)})")
+        if any(s.it_peak_mw is not None for s in sites) and not reference_w:
+            raise ValueError("reference_w (raw peak) is required to scale sites to it_peak_mw")
+        self.sites = list(sites)
+        self.reference_w = reference_w
+        self.input_unit = input_unit
+        to_mw = _UNITS[input_unit] / _UNITS["MW"]
+        # 원시 값 → IT 부하 [MW] 배율 (사이트별)
+        self._it_scale = [s.it_peak_mw / reference_w if s.it_peak_mw is not None else to_mw for s in self.sites]
+
+    @classmethod
+    def from_file(cls, path: str, sites: Sequence[SiteSpec], chunksize: int = 1_000_000) -> "LoadTransform":
+        # reference 가 필요하면 전력 열만 한 번 훑어서 peak 을 구한다
+        ref = peak_power(path, chunksize) if any(s.it_peak_mw is not None for s in sites) else None
+        return cls(sites, ref)
+
+    def apply(self, power: np.ndarray) -> Dict[str, np.ndarray]:
+        out = {}
+        for site, k in zip(self.sites, self._it_scale):
+            out[site.label] = site.facility_mw(power * k) * (_UNITS["MW"] / _UNITS[site.unit])
+        return out
+
+
+def peak_power(path: str, chunksize: int = 1_000_000) -> float:
+    peak = -np.inf
+    for _, pw in read_power_chunks(path, chunksize):
+        pw = pw[np.isfinite(pw)]
+        if len(pw):
+            peak = max(peak, float(pw.max()))
+    if not np.isfinite(peak) or peak <= 0:
+        raise ValueError(f"{path}: no positive power samples to scale from")
+    return peak
+
+
+def transform_chunks(path: str, transform: LoadTransform,
+                     chunksize: int = 1_000_000) -> Iterator[Tuple[np.ndarray, Dict[str, np.ndarray]]]:
+    """(timestamp, {site.label: 시설 부하}) chunk. timestamp/전력이 숫자가 아닌 행은 뺀다."""
+    for ts, pw in read_power_chunks(path, chunksize):
+        ok = np.isfinite(ts) & np.isfinite(pw)
+        yield ts[ok], transform.apply(pw[ok])
+
+
+def write_scaled_csvs(path: str, sites: Sequence[SiteSpec], out_dir: Optional[str] = None,
+                      chunksize: int = 1_000_000, transform: Optional[LoadTransform] = None) -> Dict[str, str]:
+    """
+    원시 trace 를 한 번 스트리밍해서 사이트마다 <stem>_scaled_<label>.csv (timestamp, out_column) 를 쓴다.
+    반환: {site.label: 출력 경로}
+    """
+    transform = transform or LoadTransform.from_file(path, sites, chunksize)
+    out_dir = out_dir or os.path.dirname(os.path.abspath(path))
+    os.makedirs(out_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    paths = {s.label: os.path.join(out_dir, f"{stem}_scaled_{s.label}.csv") for s in transform.sites}
+
+    t0 = time.perf_counter()
+    rows = 0
+    for i, (ts, cols) in enumerate(transform_chunks(path, transform, chunksize)):
+        # timestamp 가 정수 초면 정수로 (원본 CSV 형식 유지)
+        t_out = ts.astype(np.int64) if np.all(ts == np.floor(ts)) else ts
+        for s in transform.sites:
+            pd.DataFrame({TS_COL: t_out, s.out_column: cols[s.label]}).to_csv(
+                paths[s.label], mode="w" if i == 0 else "a", header=i == 0, index=False)
+        rows += len(ts)
+    print(f">> [Transform] {os.path.basename(path)} → {len(paths)} site(s), {rows:,} rows "
+          f"({time.perf_counter() - t0:.2f} s)")
+    return paths
+
+
+def _parse_site(text: str) -> SiteSpec:
+    # "300:1.5" → 300 MW, PUE 1.5 / "raw:1.2" → 크기 그대로
+    size, _, pue = text.partition(":")
+    return SiteSpec(None if size == "raw" else float(size), float(pue) if pue else 1.5)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Scale raw GPU power traces to data-center facility load")
+    parser.add_argument("path", help="raw trace CSV (timestamp, power_draw_W)")
+    parser.add_argument("--site", action="append", default=None,
+                        help="IT_PEAK_MW:PUE (repeatable), e.g. --site 300:1.5 --site 100:1.3")
+    parser.add_argument("--out-dir", default=None)
+    parser.add_argument("--chunksize", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    sites = [_parse_site(s) for s in (args.site or ["300:1.5"])]
+    for label, p in write_scaled_csvs(args.path, sites, args.out_dir, args.chunksize).items():
+        print(f"   {label}: {p}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+# utils/profile_reader.py
+"""
+급전 구간(window) 단위 프로파일 읽기.
+- 부하/PV(/요금) 프로파일을 profile store 에서 memmap 으로 열고 (소스마다 reader/kwargs 지정 가능,
+  예: PV 엑셀 → utils/pv_profile.read_pv_year_profile 의 연간 MW 캐시)
+- [start, end) 를 정렬된 epoch 인덱스에서 이진 탐색해 그 구간 행만 꺼낸다
+  → 1년 파일에서 "2021-04-05 주간" 을 급전해도 그 주 바이트만 읽힌다
+- 꺼낸 구간은 utils/alignment 로 부하 해상도 격자에 맞춘다 (해상도가 달라도 되고, 빈 구간은 gaps 로 보고)
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from utils.alignment import AlignedFrame, GapReport, SeriesSpec, TimeGrid, align, infer_step
+from utils.profile_store import Profile, ProfileStore, Reader, as_epoch_ns, load_profile, window_slice
+
+DEFAULT_LOAD_PATH = os.path.join("datacenter_load", "dc_profile_15min_ED.csv")
+DEFAULT_PV_PATH = os.path.join("datacenter_load", "pv_profile_15min_ED.csv")
+DEFAULT_HORIZON_HOURS = 24.0
+_HOUR_NS = 3600 * 10**9
+
+
+@dataclass
+class ProfileSource:
+    """
+    profile store 로 열 파일 하나. reader 가 없으면 확장자로 고르고 (.csv / .xlsx p.u. 표),
+    kwargs 는 reader 로 넘어가며 캐시 키에도 들어간다 (같은 파일·같은 kwargs 면 같은 캐시 항목).
+    """
+    path: str
+    reader: Optional[Reader] = None
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+    def open(self, store: Optional[ProfileStore] = None) -> Profile:
+        if store is None:
+            return load_profile(self.path, self.reader, **self.kwargs)
+        return store.load(self.path, self.reader, **self.kwargs)
+
+
+# 경로 / reader 를 지정한 소스 / 이미 연 Profile
+Source = Union[str, ProfileSource, Profile]
+
+
+@dataclass
+class ProfileWindow:
+    """
+    [start, end) 구간을 한 격자에 맞춘 프로파일. 모든 배열은 길이가 같고 index(int64 epoch ns) 를 공유한다.
+    값이 없는 격자점은 NaN 이고 gaps 에 시리즈별 빈 구간이 있다.
+    ED 에 넘길 때는 trim() 으로 앞뒤 빈 점만 잘라낸다 (중간 빈 점은 시간 간격이 끊기므로 거부).
+    """
+    index: np.ndarray
+    load: np.ndarray
+    pv: np.ndarray
+    price: Optional[np.ndarray] = None
+    gaps: Dict[str, GapReport] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def _columns(self) -> List[np.ndarray]:
+        return [c for c in (self.load, self.pv, self.price) if c is not None]
+
+    @property
+    def missing(self) -> int:
+        # 어느 한 시리즈라도 비어 있는 격자점 수
+        return len(self) - int(self._mask().sum())
+
+    def _mask(self) -> np.ndarray:
+        mask = np.ones(len(self), dtype=bool)
+        for c in self._columns():
+            mask &= ~np.isnan(c)
+        return mask
+
+    def _take(self, sl) -> "ProfileWindow":
+        return ProfileWindow(self.index[sl], self.load[sl], self.pv[sl],
+                             self.price[sl] if self.price is not None else None, self.gaps)
+
+    def complete(self) -> "ProfileWindow":
+        # 모든 시리즈에 값이 있는 격자점만 (빈 구간 보고는 그대로 유지)
+        # 중간 빈 점을 빼면 남은 점이 이어 붙으므로 연속 시간 step 으로 쓰면 안 된다 → 급전에는 trim()
+        if not self.missing:
+            return self
+        return self._take(self._mask())
+
+    def trim(self) -> "ProfileWindow":
+        """
+        구간 앞뒤의 빈 격자점만 잘라낸다. 남은 구간 중간에 빈 점이 있으면 ValueError
+        (빼고 이어 붙이면 ED 의 ramp/SOC 제약이 빈 구간을 건너 이어진다).
+        """
+        if not self.missing:
+            return self
+        valid = np.flatnonzero(self._mask())
+        if len(valid) == 0:
+            return self._take(slice(0, 0))
+        lo, hi = int(valid[0]), int(valid[-1]) + 1
+        if hi - lo != len(valid):
+            interior = (hi - lo) - len(valid)
+            raise ValueError(f"{interior} steps missing inside the window "
+                             f"({self.labels()[lo]} ~ {self.labels()[hi - 1]}); fill the source or move the window")
+        return self._take(slice(lo, hi))
+
+    def report(self):
+        for g in self.gaps.values():
+            if g.missing:
+                print(f"   >> [Align] {g.describe()}")
+
+    @property
+    def net_demand(self) -> np.ndarray:
+        # PV must-take → ED 가 보는 순부하 (최소 0)
+        return np.maximum(self.load - self.pv, 0.0)
+
+    def timestamps(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(self.index.view("datetime64[ns]"))
+
+    def labels(self, fmt: str = "%Y-%m-%d %H:%M") -> List[str]:
+        return self.timestamps().strftime(fmt).tolist()
+
+
+class ProfileReader:
+    """
+    부하/PV(/요금) 소스를 묶어 read_window 로 구간을 읽는다.
+    소스는 파일 경로, reader/kwargs 를 지정한 ProfileSource, 이미 연 Profile 중 하나.
+    value 열 이름을 주지 않으면 부하 'power'/'load', PV 'pv', 요금 'price'/'tariff' 가 들어간 첫 열.
+    격자 간격 step_s 를 주지 않으면 부하 소스의 샘플 간격. 정렬 방식 (utils/alignment.ALIGN_METHODS):
+    - 부하 mean   : 1초 원시 부하도 격자 구간 평균으로 다운샘플
+    - PV   ffill  : 1시간 PV 도 한 시간 동안 유지 (pv_tolerance_s 기본 = PV 샘플 간격, 그보다 오래되면 빈 값)
+    - 요금 ffill  : 요금이 바뀌는 시각에만 행이 있어도 다음 변경까지 유지
+    """
+
+    def __init__(self, load_path: Source = DEFAULT_LOAD_PATH, pv_path: Source = DEFAULT_PV_PATH,
+                 price_path: Optional[Source] = None, load_col: Optional[str] = None, pv_col: Optional[str] = None,
+                 price_col: Optional[str] = None, store: Optional[ProfileStore] = None,
+                 step_s: Optional[float] = None, load_method: str = "mean", pv_method: str = "ffill",
+                 pv_tolerance_s: Optional[float] = None, price_method: str = "ffill"):
+        self._load = self._open(store, load_path)
+        self._pv = self._open(store, pv_path)
+        self._price = self._open(store, price_path) if price_path is not None else None
+        self.load_col = load_col or self._load.find_column('power', 'load')
+        self.pv_col = pv_col or self._pv.find_column('pv')
+        self.price_col = (price_col or self._price.find_column('price', 'tariff')) if self._price else None
+        self.step_s = step_s or infer_step(self._load.index)
+        self.load_method, self.pv_method, self.price_method = load_method, pv_method, price_method
+        self.pv_tolerance_s = pv_tolerance_s if pv_tolerance_s is not None else infer_step(self._pv.index)
+
+    @staticmethod
+    def _open(store: Optional[ProfileStore], source: Source) -> Profile:
+        if isinstance(source, Profile):
+            return source
+        if not isinstance(source, ProfileSource):
+            source = ProfileSource(source)
+        return source.open(store)
+
+    def _sources(self) -> List[Profile]:
+        return [p for p in (self._load, self._pv, self._price) if p is not None]
+
+    def span(self):
+        # 모든 소스에 데이터가 있는 범위 [첫 공통 시작, 마지막 공통 끝] (epoch ns)
+        return (max(int(p.index[0]) for p in self._sources()),
+                min(int(p.index[-1]) for p in self._sources()))
+
+    @staticmethod
+    def _spec(name: str, profile: Profile, col: str, lo: int, hi: int, method: str,
+              tolerance: Optional[float] = None) -> SeriesSpec:
+        # 구간 [lo, hi) 행만 memmap 에서 자른다. ffill/asof/interpolate 는 구간 밖 이웃 샘플이 하나씩 더 필요
+        sl = window_slice(profile.index, lo, hi)
+        pad = 0 if method == "mean" else 1
+        sl = slice(max(sl.start - pad, 0), min(sl.stop + pad, len(profile)))
+        return SeriesSpec(name, profile.index[sl], profile[col][sl], method, tolerance)
+
+    def align_window(self, lo: int, hi: int) -> AlignedFrame:
+        grid = TimeGrid.from_range(lo, hi, self.step_s)
+        series = [self._spec("load", self._load, self.load_col, lo, hi, self.load_method),
+                  self._spec("pv", self._pv, self.pv_col, lo, hi, self.pv_method, self.pv_tolerance_s)]
+        if self._price is not None:
+            series.append(self._spec("price", self._price, self.price_col, lo, hi, self.price_method))
+        return align(series, grid)
+
+    def read_window(self, start=None, end=None, hours: Optional[float] = None) -> ProfileWindow:
+        """
+        [start, end) 구간. start 가 없으면 공통 범위의 시작, end 가 없으면 start + hours (기본 24시간).
+        소스마다 이진 탐색으로 구간만 자른 뒤 step_s 격자에 맞춘다. 값을 못 만든 격자점은 NaN 으로 남기고
+        gaps 에 보고한다 (버리지 않음).
+        """
+        lo = as_epoch_ns(start) if start is not None else self.span()[0]
+        hi = as_epoch_ns(end) if end is not None else lo + int((hours or DEFAULT_HORIZON_HOURS) * _HOUR_NS)
+        if hi <= lo:
+            raise ValueError(f"empty window: end {end} is not after start {start}")
+
+        frame = self.align_window(lo, hi)
+        return ProfileWindow(frame.index, frame["load"], frame["pv"],
+                             frame["price"] if self._price is not None else None, frame.gaps)
@@ -0,0 +1,358 @@
+# utils/profile_stats.py
+"""
+부하 프로파일 KPI 스트리밍 통계 (메모리 고정, 한 번의 스캔).
+- chunk 단위로 (timestamp, 값) 을 넣으면 창(window) 길이별로 블록 평균을 만들고
+  블록 평균의 피크/평균/부하율과 연속 블록 사이 램프(ΔP)의 최대 상승/하락을 누적
+- 분위수(p95 등)는 DDSketch 식 로그 bucket 스케치 (상대 오차 relative_accuracy, 병합 가능)
+- 부분 통계는 시간 순서대로 merge 할 수 있어서, 기간을 나눠 병렬로 계산한 뒤 합쳐도 결과가 같다
+  (경계에 걸친 블록은 merge 때 합쳐지고, 그 블록이 낀 램프는 merge/summary 때 계산)
+"""
+
+import copy
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_WINDOWS = (1, 60, 900)          # [s] 1 초, 1 분, 15 분
+DEFAULT_QUANTILES = (0.5, 0.95, 0.99)
+
+
+class QuantileSketch:
+    """
+    로그 bucket 분위수 스케치. 값 x(>0) 는 bucket k = ceil(log_γ x), γ = (1+α)/(1-α) 에 들어가고
+    분위수는 bucket 대표값 2γ^k/(γ+1) 로 돌려준다 → 상대 오차 α 이내. 음수는 |x| 로 따로, 0 근처는 zero bucket.
+    """
+
+    _MIN_VALUE = 1e-9
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = np.log(self.gamma)
+        self.pos_keys = np.empty(0, dtype=np.int64)
+        self.pos_counts = np.empty(0, dtype=np.int64)
+        self.neg_keys = np.empty(0, dtype=np.int64)
+        self.neg_counts = np.empty(0, dtype=np.int64)
+        self.zero_count = 0
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+
+    @staticmethod
+    def _reduce(keys: np.ndarray, counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        uniq, inv = np.unique(keys, return_inverse=True)
+        return uniq, np.bincount(inv, weights=counts, minlength=len(uniq)).astype(np.int64)
+
+    def _bucket_counts(self, mags: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # bucket 범위가 좁으므로(수백~수천 개) 정렬 대신 bincount
+        k = np.ceil(np.log(mags) / self._log_gamma).astype(np.int64)
+        k0 = int(k.min())
+        counts = np.bincount(k - k0)
+        nz = np.flatnonzero(counts)
+        return nz + k0, counts[nz]
+
+    def add(self, values: np.ndarray):
+        x = np.asarray(values, dtype=np.float64)
+        x = x[np.isfinite(x)]
+        if len(x) == 0:
+            return
+        self.count += len(x)
+        self.min = min(self.min, float(x.min()))
+        self.max = max(self.max, float(x.max()))
+        pos = x[x > self._MIN_VALUE]
+        neg = -x[x < -self._MIN_VALUE]
+        self.zero_count += len(x) - len(pos) - len(neg)
+        if len(pos):
+            k, c = self._bucket_counts(pos)
+            self.pos_keys, self.pos_counts = self._reduce(np.concatenate([self.pos_keys, k]),
+                                                          np.concatenate([self.pos_counts, c]))
+        if len(neg):
+            k, c = self._bucket_counts(neg)
+            self.neg_keys, self.neg_counts = self._reduce(np.concatenate([self.neg_keys, k]),
+                                                          np.concatenate([self.neg_counts, c]))
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if other.gamma != self.gamma:
+            raise ValueError("cannot merge sketches with different relative accuracy")
+        self.pos_keys, self.pos_counts = self._reduce(np.concatenate([self.pos_keys, other.pos_keys]),
+                                                      np.concatenate([self.pos_counts, other.pos_counts]))
+        self.neg_keys, self.neg_counts = self._reduce(np.concatenate([self.neg_keys, other.neg_keys]),
+                                                      np.concatenate([self.neg_counts, other.neg_counts]))
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return float("nan")
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        # 값 오름차순: 음수(큰 |x| 부터) → 0 → 양수
+        rank = q * (self.count - 1)
+        values = np.concatenate([
+            -2 * self.gamma ** self.neg_keys[::-1] / (self.gamma + 1),
+            [0.0],
+            2 * self.gamma ** self.pos_keys / (self.gamma + 1),
+        ])
+        counts = np.concatenate([self.neg_counts[::-1], [self.zero_count], self.pos_counts])
+        # np.percentile(linear) 처럼 앞뒤 순위 값 사이를 보간
+        lo, frac = int(np.floor(rank)), rank - np.floor(rank)
+        i = np.searchsorted(np.cumsum(counts), [lo, min(lo + 1, self.count - 1)], side="right")
+        v = np.clip(values[np.minimum(i, len(values) - 1)], self.min, self.max)
+        return float(v[0] + (v[1] - v[0]) * frac)
+
+    def __len__(self) -> int:
+        return self.count
+
+
+@dataclass
+class WindowStats:
+    """
+    창 길이 window 초의 블록(epoch 기준 floor(ts / window)) 통계 부분 집계.
+    블록 n 개 중 양 끝 2 개씩은 아직 열려 있을 수 있어(다음 chunk/worker 와 이어짐) edges 에 원시 (key, 합, 개수) 로 두고,
+    안쪽 블록의 평균과 안쪽 블록끼리의 램프만 바로 누적한다.
+    """
+    window: float
+    relative_accuracy: float = 0.01
+    n: int = 0                                                  # 블록 수
+    edges: Dict[int, Tuple[int, float, int]] = field(default_factory=dict)   # 위치 → (key, 합, 샘플 수)
+    level_sum: float = 0.0
+    level_max: float = -np.inf
+    level_min: float = np.inf
+    level_count: int = 0
+    ramp_count: int = 0
+    ramp_max_up: float = -np.inf
+    ramp_max_down: float = np.inf
+    level_sketch: Optional[QuantileSketch] = None
+    ramp_sketch: Optional[QuantileSketch] = None     # |ΔP|
+
+    def __post_init__(self):
+        if self.level_sketch is None:
+            self.level_sketch = QuantileSketch(self.relative_accuracy)
+        if self.ramp_sketch is None:
+            self.ramp_sketch = QuantileSketch(self.relative_accuracy)
+
+    def _add_levels(self, means: np.ndarray):
+        if len(means) == 0:
+            return
+        self.level_sum += float(means.sum())
+        self.level_max = max(self.level_max, float(means.max()))
+        self.level_min = min(self.level_min, float(means.min()))
+        self.level_count += len(means)
+        self.level_sketch.add(means)
+
+    def _add_ramps(self, keys: np.ndarray, means: np.ndarray):
+        # 연속 블록(key 차이 1) 사이만 램프로 센다 (데이터가 빈 구간은 건너뜀)
+        if len(keys) < 2:
+            return
+        ok = np.diff(keys) == 1
+        if not ok.any():
+            return
+        dp = np.diff(means)[ok]
+        self.ramp_count += len(dp)
+        self.ramp_max_up = max(self.ramp_max_up, float(dp.max()))
+        self.ramp_max_down = min(self.ramp_max_down, float(dp.min()))
+        self.ramp_sketch.add(np.abs(dp))
+
+    def _interior(self, p: int, n: int) -> bool:
+        return 1 <= p <= n - 2
+
+    def add_blocks(self, keys: np.ndarray, sums: np.ndarray, counts: np.ndarray):
+        # 이 partial 뒤에 이어지는 (정렬된, key 가 겹치지 않는) 블록들을 붙인다
+        if len(keys) == 0:
+            return
+        other = WindowStats(self.window, self.relative_accuracy)
+        n = len(keys)
+        other.n = n
+        means = sums / counts
+        # 안쪽 블록(1 ~ n-2)과 그 사이 램프는 바로 누적, 양 끝 2 개씩은 edges 로
+        other._add_levels(means[1:n - 1])
+        if n > 3:
+            other._add_ramps(keys[1:n - 1], means[1:n - 1])
+        for p in {0, 1, n - 2, n - 1}:
+            if 0 <= p < n:
+                other.edges[p] = (int(keys[p]), float(sums[p]), int(counts[p]))
+        self.merge(other)
+
+    def merge(self, other: "WindowStats") -> "WindowStats":
+        """other 는 self 보다 뒤 시간 구간의 partial. 이어지는 블록(같은 key)은 합친다."""
+        if other.window != self.window:
+            raise ValueError("cannot merge window stats with different window lengths")
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.__dict__.update(copy.deepcopy(other.__dict__))
+            return self
+        last, first = self.edges[self.n - 1], other.edges[0]
+        if first[0] < last[0]:
+            raise ValueError(f"window {self.window} s: partials must be merged in time order")
+        joined = first[0] == last[0]
+        offset = self.n - 1 if joined else self.n
+        n = self.n + other.n - int(joined)
+
+        # 병합 후 위치 → (key, 합, 개수, 예전 partial 에서 이미 안쪽이었는지)
+        blocks = {p: (*b, self._interior(p, self.n)) for p, b in self.edges.items()}
+        for p, b in other.edges.items():
+            q = p + offset
+            if joined and p == 0:
+                k, s, c = blocks[q][:3]
+                blocks[q] = (k, s + b[1], c + b[2], False)
+            else:
+                blocks[q] = (*b, other._interior(p, other.n))
+
+        # 새로 안쪽이 된 블록의 평균과, 새로 안쪽 블록끼리 이어진 램프를 누적
+        new_levels, ramp_keys, ramp_means = [], [], []
+        for p in sorted(blocks):
+            k, s, c, was_inside = blocks[p]
+            if self._interior(p, n) and not was_inside:
+                new_levels.append(s / c)
+            nxt = blocks.get(p + 1)
+            if nxt is None or not (self._interior(p, n) and self._interior(p + 1, n)):
+                continue
+            # 예전 partial 안에서 이미 센 램프인지: 두 블록이 같은 쪽에서 왔고 둘 다 안쪽이었으면 셌다
+            counted = was_inside and nxt[3] and ((p < offset) == (p + 1 < offset))
+            if not counted:
+                ramp_keys.append((k, nxt[0]))
+                ramp_means.append((s / c, nxt[1] / nxt[2]))
+
+        self.level_sum += other.level_sum
+        self.level_max = max(self.level_max, other.level_max)
+        self.level_min = min(self.level_min, other.level_min)
+        self.level_count += other.level_count
+        self.level_sketch.merge(other.level_sketch)
+        self.ramp_count += other.ramp_count
+        self.ramp_max_up = max(self.ramp_max_up, other.ramp_max_up)
+        self.ramp_max_down = min(self.ramp_max_down, other.ramp_max_down)
+        self.ramp_sketch.merge(other.ramp_sketch)
+
+        self._add_levels(np.array(new_levels))
+        for (k0, k1), (m0, m1) in zip(ramp_keys, ramp_means):
+            self._add_ramps(np.array([k0, k1]), np.array([m0, m1]))
+        self.n = n
+        self.edges = {p: blocks[p][:3] for p in {0, 1, n - 2, n - 1} if p in blocks and 0 <= p < n}
+        return self
+
+    def finalized(self) -> "WindowStats":
+        # 더 이어질 데이터가 없다고 보고 양 끝 블록과 그 램프까지 넣은 사본
+        out = WindowStats(self.window, self.relative_accuracy)
+        out.merge(self)
+        blocks = sorted(out.edges.items())
+        levels = [s / c for p, (k, s, c) in blocks if not self._interior(p, self.n)]
+        out._add_levels(np.array(levels))
+        for (p, (k, s, c)), (p1, (k1, s1, c1)) in zip(blocks, blocks[1:]):
+            if p1 == p + 1 and not (self._interior(p, self.n) and self._interior(p1, self.n)):
+                out._add_ramps(np.array([k, k1]), np.array([s / c, s1 / c1]))
+        out.edges = {}
+        return out
+
+
+class LoadProfileStats:
+    """
+    부하 시계열 KPI 스트리밍 집계.
+    - add(ts, values): 시간순 chunk (ts: epoch 초). 파일 하나를 chunk 로 읽으면서 계속 넣는다
+    - merge(other): other 는 self 뒤 시간 구간 partial (병렬 worker 결과를 시간순으로 합칠 때)
+    - summary(): 창 길이별 피크/평균/부하율/분위수, 램프 최대 상승·하락/|ΔP| 분위수, 샘플 통계와 에너지
+    """
+
+    def __init__(self, windows: Sequence[float] = DEFAULT_WINDOWS, relative_accuracy: float = 0.01):
+        self.windows = tuple(sorted(float(w) for w in windows))
+        self.relative_accuracy = relative_accuracy
+        self.window_stats = {w: WindowStats(w, relative_accuracy) for w in self.windows}
+        self.samples = 0
+        self.sample_sum = 0.0
+        self.sample_max = -np.inf
+        self.sample_min = np.inf
+        self.t_first: Optional[float] = None
+        self.t_last: Optional[float] = None
+
+    def add(self, ts: np.ndarray, values: np.ndarray):
+        ts = np.asarray(ts, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        ok = np.isfinite(ts) & np.isfinite(values)
+        ts, values = ts[ok], values[ok]
+        if len(ts) == 0:
+            return
+        if np.any(np.diff(ts) < 0):
+            order = np.argsort(ts, kind="stable")
+            ts, values = ts[order], values[order]
+        self.samples += len(values)
+        self.sample_sum += float(values.sum())
+        self.sample_max = max(self.sample_max, float(values.max()))
+        self.sample_min = min(self.sample_min, float(values.min()))
+        self.t_first = float(ts[0]) if self.t_first is None else self.t_first
+        self.t_last = float(ts[-1])
+        for w, ws in self.window_stats.items():
+            # ts 가 정렬돼 있으므로 블록 경계 = key 가 바뀌는 위치 (np.add.reduceat)
+            keys = np.floor(ts / w).astype(np.int64)
+            starts = np.concatenate([[0], np.flatnonzero(np.diff(keys)) + 1])
+            ws.add_blocks(keys[starts], np.add.reduceat(values, starts), np.diff(np.append(starts, len(keys))))
+
+    def merge(self, other: "LoadProfileStats") -> "LoadProfileStats":
+        if other.windows != self.windows:
+            raise ValueError("cannot merge stats with different windows")
+        for w in self.windows:
+            self.window_stats[w].merge(other.window_stats[w])
+        self.samples += other.samples
+        self.sample_sum += other.sample_sum
+        self.sample_max = max(self.sample_max, other.sample_max)
+        self.sample_min = min(self.sample_min, other.sample_min)
+        if self.t_first is None:
+            self.t_first = other.t_first
+        if other.t_last is not None:
+            self.t_last = other.t_last
+        return self
+
+    def summary(self, quantiles: Iterable[float] = DEFAULT_QUANTILES, sample_dt: Optional[float] = None) -> Dict:
+        """
+        window 초 → {blocks, peak, min, mean, load_factor, p50.., ramps, ramp_max_up, ramp_max_down,
+                     ramp_p95_abs.., ramp_*_per_min}. 값 단위는 입력 단위 (MW 면 MW, 램프는 MW/window).
+        "samples" 에는 원시 샘플 수/합/최대/최소/평균과 energy (sample_dt 초 간격 가정, 단위 × h).
+        """
+        quantiles = tuple(quantiles)
+        out: Dict = {}
+        for w, ws in self.window_stats.items():
+            f = ws.finalized()
+            mean = f.level_sum / f.level_count if f.level_count else float("nan")
+            peak = f.level_max if f.level_count else float("nan")
+            per_min = 60.0 / w
+            row = {
+                "blocks": f.level_count,
+                "peak": peak,
+                "min": f.level_min if f.level_count else float("nan"),
+                "mean": mean,
+                "load_factor": mean / peak if f.level_count and peak > 0 else float("nan"),
+                "ramps": f.ramp_count,
+                "ramp_max_up": f.ramp_max_up if f.ramp_count else float("nan"),
+                "ramp_max_down": f.ramp_max_down if f.ramp_count else float("nan"),
+            }
+            row["ramp_max_up_per_min"] = row["ramp_max_up"] * per_min
+            row["ramp_max_down_per_min"] = row["ramp_max_down"] * per_min
+            for q in quantiles:
+                tag = f"p{q * 100:g}"
+                row[tag] = f.level_sketch.quantile(q)
+                row[f"ramp_{tag}_abs"] = f.ramp_sketch.quantile(q)
+                row[f"ramp_{tag}_abs_per_min"] = row[f"ramp_{tag}_abs"] * per_min
+            out[w] = row
+
+        if sample_dt is None:
+            # 샘플 간격을 모르면 (마지막 - 처음) / (샘플 수 - 1)
+            sample_dt = (self.t_last - self.t_first) / (self.samples - 1) if self.samples > 1 else 0.0
+        out["samples"] = {
+            "count": self.samples,
+            "sum": self.sample_sum,
+            "max": self.sample_max if self.samples else float("nan"),
+            "min": self.sample_min if self.samples else float("nan"),
+            "mean": self.sample_sum / self.samples if self.samples else float("nan"),
+            "dt": sample_dt,
+            "energy_h": self.sample_sum * sample_dt / 3600.0,
+            "t_first": self.t_first,
+            "t_last": self.t_last,
+        }
+        return out
@@ -0,0 +1,329 @@
+# utils/profile_store.py
+"""
+부하/PV 프로파일 바이너리 캐시.
+- CSV/Excel 원본을 한 번만 파싱해서 int64 epoch 인덱스(ns, naive 현지 시각) + float64 열을 .npy 로 저장
+- 다음부터는 np.load(mmap_mode="r") 로 바로 memory-map (파싱/to_datetime 없음)
+- 원본의 (mtime, size) 가 바뀌면 내용 해시(xxh3)를 다시 계산해서, 내용이 달라졌을 때만 다시 변환
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import xxhash
+
+# 저장 포맷이 바뀌면 올려서 예전 항목이 자동으로 무효가 되게 한다
+PROFILE_STORE_VERSION = 2
+DEFAULT_STORE_DIR = os.environ.get("ED_PROFILE_DIR", os.path.join(".ed_cache", "profiles"))
+_HASH_CHUNK = 8 * 1024 * 1024
+
+# reader(path, **kwargs) → (index[int64 epoch ns], {열 이름: float64 배열})
+Reader = Callable[..., Tuple[np.ndarray, Dict[str, np.ndarray]]]
+
+
+def file_hash(path: str) -> str:
+    h = xxhash.xxh3_128()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def to_epoch_ns(values) -> np.ndarray:
+    # 문자열/datetime → int64 epoch ns. tz-aware 면 현지 시각 그대로 tz 만 뗀다 (기존 CSV 는 모두 naive KST)
+    ts = pd.to_datetime(pd.Series(values))
+    if ts.dt.tz is not None:
+        ts = ts.dt.tz_localize(None)
+    return ts.to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+def as_epoch_ns(t) -> int:
+    # 시각 하나 (문자열/datetime/Timestamp/int ns) → int64 epoch ns (naive 현지 시각 기준)
+    if isinstance(t, (int, np.integer)):
+        return int(t)
+    ts = pd.Timestamp(t)
+    if ts.tz is not None:
+        ts = ts.tz_localize(None)
+    return int(ts.value)
+
+
+def window_slice(index: np.ndarray, start, end) -> slice:
+    # 정렬된 epoch 인덱스에서 [start, end) 구간 행 범위 (이진 탐색, 인덱스 전체를 읽지 않는다)
+    lo = int(np.searchsorted(index, as_epoch_ns(start), side="left"))
+    hi = int(np.searchsorted(index, as_epoch_ns(end), side="left"))
+    return slice(lo, max(lo, hi))
+
+
+def read_timeseries_csv(path: str, time_col: Optional[str] = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    # 시간 열('time'/'kst' 포함) 하나 + 나머지 숫자 열. BOM(utf-8-sig) 도 처리
+    df = pd.read_csv(path, encoding="utf-8-sig")
+    if time_col is None:
+        cands = [c for c in df.columns if 'time' in c.lower() or 'kst' in c.lower()]
+        if not cands:
+            raise ValueError(f"{path}: no time column (expected 'time' or 'kst' in the header)")
+        time_col = cands[0]
+    index = to_epoch_ns(df[time_col])
+    # 시간이 비어 있는 행(NaT, 파일 끝 빈 줄 등)은 버린다
+    valid = index != np.iinfo(np.int64).min
+    if not valid.all():
+        df, index = df[valid], index[valid]
+    columns = {}
+    for c in df.columns:
+        if c == time_col:
+            continue
+        col = pd.to_numeric(df[c], errors="coerce")
+        if col.notna().any():
+            columns[str(c)] = col.to_numpy(dtype=np.float64)
+    return index, columns
+
+
+def read_hourly_pu_table(path: str, start: str = "2020-01-01", sheet: Any = 0) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    PV 엑셀 (row 0: 시간 헤더 0~23, col 0: 일 인덱스, 나머지: 일 × 24h p.u.) → 1시간 간격 1열 시계열 "pu".
+    엑셀에 날짜가 없으므로 첫날(start) 기준으로 인덱스를 만든다: day d, hour h → start + d일 + h시간.
+    """
+    raw = pd.read_excel(path, header=None, sheet_name=sheet)
+    table = raw.iloc[1:, 1:25].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)  # (일, 24)
+    t0 = pd.Timestamp(start).value
+    hour_ns = 3600 * 10**9
+    index = t0 + np.arange(table.size, dtype=np.int64) * hour_ns
+    return index, {"pu": table.ravel()}
+
+
+_READERS: Dict[str, Reader] = {
+    ".csv": read_timeseries_csv,
+    ".xlsx": read_hourly_pu_table,
+    ".xls": read_hourly_pu_table,
+}
+
+
+@dataclass
+class Profile:
+    """
+    캐시에서 꺼낸 프로파일. index/columns 는 읽기 전용 memmap 이다 (수정하려면 np.array 로 복사).
+    index 는 정렬된 int64 epoch ns (naive 현지 시각).
+    """
+    source: str
+    index: np.ndarray
+    columns: Dict[str, np.ndarray] = field(default_factory=dict)
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def find_column(self, *keywords: str) -> str:
+        # 이름에 keyword 가 들어간 첫 열 (대소문자 무시)
+        for c in self.columns:
+            if any(k in c.lower() for k in keywords):
+                return c
+        raise KeyError(f"{self.source}: no column matching {keywords} (have {list(self.columns)})")
+
+    def timestamps(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(np.asarray(self.index).view("datetime64[ns]"))
+
+    def window(self, start, end) -> "Profile":
+        # [start, end) 구간만 잘라낸 Profile (memmap view 라 그 구간 바이트만 디스크에서 읽힌다)
+        sl = window_slice(self.index, start, end)
+        return Profile(self.source, self.index[sl], {k: v[sl] for k, v in self.columns.items()}, self.meta)
+
+    def to_pandas(self) -> pd.DataFrame:
+        return pd.DataFrame(self.columns, index=self.timestamps().rename("timestamp"), copy=False)
+
+
+class ProfileStore:
+    """
+    원본 파일(+ reader, 인자) → .npy 캐시 디렉토리.
+    항목 하나 = <cache_dir>/<key>/ 아래 meta.json + <내용 해시>.index.npy + <내용 해시>.<열 번호>.npy.
+    파일 이름에 내용 해시를 넣어, 다른 프로세스가 예전 파일을 memmap 하고 있어도 새 파일을 옆에 쓸 수 있게 한다.
+    """
+
+    META = "meta.json"
+
+    def __init__(self, cache_dir: str = DEFAULT_STORE_DIR, verify_hash: bool = False):
+        self.cache_dir = cache_dir
+        # True 면 mtime/size 가 같아도 매번 내용 해시를 확인 (mtime 을 믿을 수 없는 파일시스템용)
+        self.verify_hash = verify_hash
+
+    def _key(self, path: str, reader: Reader, kwargs: Dict[str, Any]) -> str:
+        ident = json.dumps({"version": PROFILE_STORE_VERSION, "path": os.path.abspath(path),
+                            "reader": f"{reader.__module__}.{reader.__qualname__}",
+                            "kwargs": {k: repr(v) for k, v in sorted(kwargs.items())}})
+        name = os.path.splitext(os.path.basename(path))[0]
+        return f"{name}-{xxhash.xxh3_64_hexdigest(ident.encode())}"
+
+    def _read_meta(self, entry: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(entry, self.META), encoding="utf-8") as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        return meta if meta.get("version") == PROFILE_STORE_VERSION else None
+
+    def _write_meta(self, entry: str, meta: Dict[str, Any]):
+        path = os.path.join(entry, self.META)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, path)
+
+    def _is_fresh(self, entry: str, meta: Dict[str, Any], st: os.stat_result, path: str) -> bool:
+        if (st.st_mtime_ns, st.st_size) == (meta["mtime_ns"], meta["size"]) and not self.verify_hash:
+            return True
+        if st.st_size != meta["size"]:
+            return False
+        if file_hash(path) != meta["hash"]:
+            return False
+        # 내용은 그대로 (복사/touch) → mtime 만 갱신하고 재사용
+        if st.st_mtime_ns != meta["mtime_ns"]:
+            meta["mtime_ns"] = st.st_mtime_ns
+            self._write_meta(entry, meta)
+        return True
+
+    def _open(self, entry: str, meta: Dict[str, Any]) -> Profile:
+        index = np.load(os.path.join(entry, meta["index_file"]), mmap_mode="r")
+        columns = {name: np.load(os.path.join(entry, fname), mmap_mode="r")
+                   for name, fname in meta["columns"].items()}
+        return Profile(source=meta["source"], index=index, columns=columns, meta=meta)
+
+    def _build(self, entry: str, path: str, st: os.stat_result, reader: Reader,
+               kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        t0 = time.perf_counter()
+        digest = file_hash(path)
+        index, columns = reader(path, **kwargs)
+        index = np.asarray(index, dtype=np.int64)
+        order = np.argsort(index, kind="stable")
+        if np.any(order != np.arange(len(order))):
+            index = index[order]
+            columns = {k: np.asarray(v)[order] for k, v in columns.items()}
+
+        os.makedirs(entry, exist_ok=True)
+        tag = digest[:16]
+        files = {"index": f"{tag}.index.npy"}
+        np.save(os.path.join(entry, files["index"]), index)
+        col_files = {}
+        for i, (name, values) in enumerate(columns.items()):
+            col_files[name] = f"{tag}.{i}.npy"
+            np.save(os.path.join(entry, col_files[name]), np.asarray(values, dtype=np.float64))
+
+        meta = {
+            "version": PROFILE_STORE_VERSION,
+            "source": os.path.abspath(path),
+            "reader": f"{reader.__module__}.{reader.__qualname__}",
+            "kwargs": {k: repr(v) for k, v in kwargs.items()},
+            "mtime_ns": st.st_mtime_ns,
+            "size": st.st_size,
+            "hash": digest,
+            "rows": int(len(index)),
+            "index_file": files["index"],
+            "columns": col_files,
+            "built": time.time(),
+        }
+        self._write_meta(entry, meta)  # meta 를 마지막에 써야 반쯤 만든 항목을 읽지 않는다
+
+        # 예전 내용의 파일 정리 (다른 프로세스가 memmap 중이면 남겨둔다)
+        for fname in os.listdir(entry):
+            if fname.endswith(".npy") and not fname.startswith(tag):
+                try:
+                    os.remove(os.path.join(entry, fname))
+                except OSError:
+                    pass
+        print(f"   >> [Profile] Converted {os.path.basename(path)} → {len(index):,} rows × {len(columns)} cols "
+              f"({time.perf_counter() - t0:.2f} s)")
+        return meta
+
+    def load(self, path: str, reader: Optional[Reader] = None, **kwargs) -> Profile:
+        """
+        path 의 프로파일을 memmap 으로 연다. 캐시가 없거나 원본 내용이 바뀌었으면 reader 로 다시 변환한다.
+        reader 를 주지 않으면 확장자로 고른다 (.csv → read_timeseries_csv, .xlsx → read_hourly_pu_table).
+        kwargs 는 reader 로 넘어가고 캐시 키에도 들어간다.
+        """
+        if reader is None:
+            ext = os.path.splitext(path)[1].lower()
+            if ext not in _READERS:
+                raise ValueError(f"no default profile reader for '{ext}' files")
+            reader = _READERS[ext]
+        st = os.stat(path)
+        entry = os.path.join(self.cache_dir, self._key(path, reader, kwargs))
+        meta = self._read_meta(entry)
+        if meta is not None:
+            try:
+                if self._is_fresh(entry, meta, st, path):
+                    return self._open(entry, meta)
+            except (OSError, ValueError, KeyError) as e:
+                # 깨진 항목은 다시 만든다
+                print(f"   >> [Profile] Rebuilding unreadable entry {os.path.basename(entry)}: {e}")
+        return self._open(entry, self._build(entry, path, st, reader, kwargs))
+
+    def _entries(self) -> List[Tuple[str, Dict[str, Any]]]:
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        for sub in os.scandir(self.cache_dir):
+            if sub.is_dir():
+                meta = self._read_meta(sub.path)
+                if meta is not None:
+                    entries.append((sub.path, meta))
+        return entries
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self._entries()
+        total = 0
+        for entry, _ in entries:
+            total += sum(e.stat().st_size for e in os.scandir(entry) if e.is_file())
+        return {
+            "cache_dir": os.path.abspath(self.cache_dir),
+            "entries": len(entries),
+            "rows": sum(meta["rows"] for _, meta in entries),
+            "total_bytes": total,
+        }
+
+    def clear(self) -> int:
+        entries = self._entries()
+        for entry, _ in entries:
+            shutil.rmtree(entry, ignore_errors=True)
+        return len(entries)
+
+
+_DEFAULT_STORE: Optional[ProfileStore] = None
+
+
+def load_profile(path: str, reader: Optional[Reader] = None, **kwargs) -> Profile:
+    # 기본 캐시 디렉토리를 쓰는 단축 함수
+    global _DEFAULT_STORE
+    if _DEFAULT_STORE is None:
+        _DEFAULT_STORE = ProfileStore()
+    return _DEFAULT_STORE.load(path, reader, **kwargs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load/PV profile store")
+    parser.add_argument("command", choices=["stats", "list", "clear"])
+    parser.add_argument("--dir", default=DEFAULT_STORE_DIR)
+    args = parser.parse_args(argv)
+
+    store = ProfileStore(args.dir)
+    if args.command == "stats":
+        s = store.stats()
+        print(f"Store dir : {s['cache_dir']}")
+        print(f"Entries   : {s['entries']}")
+        print(f"Rows      : {s['rows']:,}")
+        print(f"Size      : {s['total_bytes'] / 1024:,.1f} KiB")
+    elif args.command == "list":
+        for entry, meta in sorted(store._entries(), key=lambda e: e[1]["built"], reverse=True):
+            built = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(meta["built"]))
+            print(f"{os.path.basename(entry)}  {meta['rows']:>10,} rows  {built}  {meta['source']}")
+    else:
+        print(f"Removed {store.clear()} entries from {os.path.abspath(args.dir)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# utils/pv_profile.py
+"""
+연간 PV 프로파일 생성.
+- 엑셀의 (365일 × 24h) p.u. 표 전체를 한 번에 1시간 시계열로 펼치고 step_min 분 해상도로 벡터 보간
+  (15분이면 365 × 96 = 35,040 step)
+- utils/profile_store 의 reader 로 쓰면 결과가 .npy 로 캐시되고, 엑셀이나 설정(kwargs)이 바뀔 때만 다시 만든다
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+
+from utils.profile_store import read_hourly_pu_table
+
+INTERPOLATIONS = ("ffill", "linear", "energy")
+
+
+def hourly_to_steps(hourly: np.ndarray, steps_per_hour: int, method: str = "ffill") -> np.ndarray:
+    """
+    1시간 평균값 (N,) → (N × steps_per_hour,) 보간.
+    - ffill : 각 시간 값을 그대로 반복 (계단, 시간별 에너지 보존)
+    - linear: 시간 중앙값을 잇는 선형 보간 (매끄럽지만 시간별 에너지는 조금 달라짐)
+    - energy: linear 모양을 시간마다 배율 보정해서 각 시간 평균 = 원래 값 (매끄럽고 에너지 보존, 음수 없음)
+    """
+    if method not in INTERPOLATIONS:
+        raise ValueError(f"unknown interpolation '{method}' (expected one of {INTERPOLATIONS})")
+    y = np.nan_to_num(np.asarray(hourly, dtype=np.float64))
+    if method == "ffill" or steps_per_hour == 1:
+        return np.repeat(y, steps_per_hour)
+
+    n = len(y)
+    centers = (np.arange(n * steps_per_hour) + 0.5) / steps_per_hour     # step 중앙 [h]
+    z = np.interp(centers, np.arange(n) + 0.5, y)
+    if method == "linear":
+        return z
+    z = z.reshape(n, steps_per_hour)
+    m = z.mean(axis=1)
+    scale = np.divide(y, m, out=np.zeros(n), where=m > 0)
+    return (z * scale[:, None]).ravel()
+
+
+def read_pv_year_profile(path: str, start: str = "2021-01-01", p_rated_mw: float = 100.0, step_min: int = 15,
+                         method: str = "ffill", shift_hours: float = 0.0,
+                         sheet=0) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    ProfileStore reader: PV p.u. 엑셀 → step_min 분 PV 출력 [MW] 연간 시계열 "pv_power_MW".
+    엑셀 day d, hour h 는 start + d일 + h시간 + shift_hours 에 놓인다.
+    """
+    if 60 % step_min:
+        raise ValueError(f"step_min must divide 60 (got {step_min})")
+    index_1h, cols = read_hourly_pu_table(path, start=start, sheet=sheet)
+    steps_per_hour = 60 // step_min
+    pv_mw = hourly_to_steps(cols["pu"], steps_per_hour, method) * p_rated_mw
+
+    t0 = index_1h[0] + int(round(shift_hours * 3600)) * 10**9
+    index = t0 + np.arange(len(pv_mw), dtype=np.int64) * (step_min * 60 * 10**9)
+    return index, {"pv_power_MW": pv_mw}
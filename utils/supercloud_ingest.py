@@ -0,0 +1,321 @@
+# utils/supercloud_ingest.py
+"""
+MIT Supercloud GPU trace (gpu/<0001..0099>/*.csv) 집계.
+- CSV 는 pandas C 파서로 chunk 단위, 필요한 두 열(timestamp, power_draw_W)만 float64 로 읽는다
+- 폴더 하나 = 작업 하나, 프로세스 풀에서 병렬 처리 후 부분 집계를 부모에서 병합
+- 출력은 기존 datacenter_load/2025종설1조_plot.py (폴더별 merged_XXXX_power_energy.csv),
+  2025종설1조_한달plot.py (1_month_15min.csv) 와 같은 형식
+- aggregate_supercloud_multi_resolution: 한 번의 스캔으로 여러 해상도 (utils/load_aggregate.py)
+"""
+
+import glob
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.load_aggregate import DEFAULT_RESOLUTIONS, MultiResolutionAggregate
+
+TS_COL = "timestamp"
+POWER_COL = "power_draw_W"
+
+
+@dataclass
+class BinAggregate:
+    """정수 bin key 별 합계/건수. 같은 key 를 가진 부분 집계끼리 merge 로 합칠 수 있다."""
+    keys: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    sums: np.ndarray = field(default_factory=lambda: np.empty(0))
+    counts: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+
+    @classmethod
+    def reduce(cls, keys: np.ndarray, values: np.ndarray, counts: Optional[np.ndarray] = None) -> "BinAggregate":
+        # key 정렬 후 같은 key 끼리 합산 (np.unique + bincount)
+        if len(keys) == 0:
+            return cls()
+        uniq, inv = np.unique(keys, return_inverse=True)
+        sums = np.bincount(inv, weights=values, minlength=len(uniq))
+        cnt = np.bincount(inv, weights=counts, minlength=len(uniq)).astype(np.int64) if counts is not None \
+            else np.bincount(inv, minlength=len(uniq)).astype(np.int64)
+        return cls(uniq.astype(np.int64), sums, cnt)
+
+    def merge(self, *others: "BinAggregate") -> "BinAggregate":
+        parts = [self, *others]
+        return BinAggregate.reduce(np.concatenate([p.keys for p in parts]),
+                                   np.concatenate([p.sums for p in parts]),
+                                   np.concatenate([p.counts for p in parts]))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+@dataclass
+class IngestStats:
+    files: int = 0
+    skipped_files: int = 0
+    unchanged_files: int = 0   # 증분 모드에서 manifest 와 같아 다시 읽지 않은 파일
+    rows: int = 0          # 읽은 행 수
+    kept_rows: int = 0     # 기간 안에 들어온 행 수
+    bytes: int = 0
+    elapsed: float = 0.0
+    write_time: float = 0.0   # merged CSV 쓰기 시간 (elapsed 에 포함)
+
+    def add(self, other: "IngestStats"):
+        self.files += other.files
+        self.skipped_files += other.skipped_files
+        self.unchanged_files += other.unchanged_files
+        self.rows += other.rows
+        self.kept_rows += other.kept_rows
+        self.bytes += other.bytes
+        self.write_time += other.write_time
+
+    @property
+    def rows_per_s(self) -> float:
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def mb_per_s(self) -> float:
+        return self.bytes / 1e6 / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        unchanged = f", {self.unchanged_files} unchanged" if self.unchanged_files else ""
+        return (f"{self.files} files ({self.skipped_files} skipped{unchanged}), {self.rows:,} rows "
+                f"({self.kept_rows:,} in range), {self.bytes / 1e6:,.1f} MB in {self.elapsed:.1f} s "
+                f"(write {self.write_time:.1f} s) → {self.rows_per_s:,.0f} rows/s, {self.mb_per_s:,.1f} MB/s")
+
+
+@dataclass
+class FolderResult:
+    folder: str
+    bins: BinAggregate           # 전체 기간 bin (bin_size 초) 합계/건수
+    stats: IngestStats
+    merged_path: Optional[str] = None
+
+
+def list_gpu_csvs(folder_path: str) -> List[str]:
+    # 이전 실행 결과(merged_*) 는 제외
+    return sorted(f for f in glob.glob(os.path.join(folder_path, "*.csv"))
+                  if not os.path.basename(f).startswith("merged_"))
+
+
+def read_power_chunks(path: str, chunksize: int = 1_000_000) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """(timestamp, power_draw_W) float64 배열 chunk. 숫자가 아닌 값/짧은 행은 NaN → 호출 측에서 제외."""
+    reader = pd.read_csv(path, usecols=[TS_COL, POWER_COL], chunksize=chunksize,
+                         engine="c", on_bad_lines="skip", encoding_errors="replace", low_memory=False)
+    for chunk in reader:
+        ts, pw = chunk[TS_COL], chunk[POWER_COL]
+        if ts.dtype != np.float64 and ts.dtype != np.int64:
+            ts = pd.to_numeric(ts, errors="coerce")
+        if pw.dtype != np.float64 and pw.dtype != np.int64:
+            pw = pd.to_numeric(pw, errors="coerce")
+        yield ts.to_numpy(dtype=np.float64), pw.to_numpy(dtype=np.float64)
+
+
+@dataclass
+class FileBins:
+    rows: int                        # 읽은 행 수
+    kept: int                        # 기간 안에 들어온 행 수
+    bins: BinAggregate               # bin_size 초 bin 별 합계/건수
+    exact: Optional[BinAggregate]    # 0.01 초 timestamp 별 합계 (exact=True 일 때만)
+    t_min: Optional[float] = None    # 파일 전체(기간 필터 전) timestamp 범위
+    t_max: Optional[float] = None
+
+
+def read_file_bins(path: str, start_ts: float, end_ts: float, bin_size: int = 900,
+                   chunksize: int = 1_000_000, exact: bool = False) -> FileBins:
+    """
+    GPU CSV 하나를 [start_ts, end_ts] bin 부분 집계로. 파일이 끝까지 읽혀야 결과를 돌려준다
+    (읽기 실패는 예외 그대로 → 호출 측에서 파일 단위로 건너뜀).
+    """
+    rows = kept = 0
+    t_min, t_max = np.inf, -np.inf
+    exact_parts, bin_parts = [], []
+    for ts, pw in read_power_chunks(path, chunksize):
+        rows += len(ts)
+        fin = np.isfinite(ts)
+        if fin.any():
+            t_min = min(t_min, float(ts[fin].min()))
+            t_max = max(t_max, float(ts[fin].max()))
+        ok = fin & np.isfinite(pw) & (ts >= start_ts) & (ts <= end_ts)
+        ts, pw = ts[ok], pw[ok]
+        kept += len(ts)
+        if len(ts) == 0:
+            continue
+        if exact:
+            exact_parts.append(BinAggregate.reduce(np.rint(ts * 100.0).astype(np.int64), pw))
+        bin_parts.append(BinAggregate.reduce((ts // bin_size).astype(np.int64) * bin_size, pw))
+    return FileBins(
+        rows, kept,
+        BinAggregate().merge(*bin_parts),
+        BinAggregate().merge(*exact_parts) if exact else None,
+        t_min if np.isfinite(t_min) else None,
+        t_max if np.isfinite(t_max) else None,
+    )
+
+
+def aggregate_folder(folder_path: str, start_ts: float, end_ts: float, bin_size: int = 900,
+                     dt: float = 0.1, save_dir: Optional[str] = None,
+                     chunksize: int = 1_000_000) -> FolderResult:
+    """
+    폴더 하나의 GPU CSV 전부를 집계.
+    - 0.01 초로 반올림한 timestamp 별 전력 합 → save_dir 이 있으면 merged_<folder>_power_energy.csv
+    - bin_size 초 bin 별 (전력 합, 샘플 수) → 부모 프로세스에서 폴더끼리 병합
+    """
+    folder = os.path.basename(os.path.normpath(folder_path))
+    stats = IngestStats()
+    t0 = time.perf_counter()
+
+    exact_parts: List[BinAggregate] = []
+    bin_parts: List[BinAggregate] = []
+    for fp in list_gpu_csvs(folder_path):
+        try:
+            res = read_file_bins(fp, start_ts, end_ts, bin_size, chunksize, exact=bool(save_dir))
+        except (ValueError, pd.errors.ParserError, UnicodeDecodeError, OSError):
+            # 필요한 열이 없거나 깨진 파일 → 건너뜀
+            stats.skipped_files += 1
+            continue
+        if res.exact is not None:
+            exact_parts.append(res.exact)
+        bin_parts.append(res.bins)
+        stats.files += 1
+        stats.rows += res.rows
+        stats.kept_rows += res.kept
+        stats.bytes += os.path.getsize(fp)
+        # 부분 집계가 쌓이면 중간 병합해서 메모리를 묶어 둔다
+        if len(exact_parts) > 64:
+            exact_parts = [BinAggregate().merge(*exact_parts)]
+        if len(bin_parts) > 64:
+            bin_parts = [BinAggregate().merge(*bin_parts)]
+
+    bins = BinAggregate().merge(*bin_parts) if bin_parts else BinAggregate()
+    merged_path = None
+    if save_dir and exact_parts:
+        t_write = time.perf_counter()
+        exact = BinAggregate().merge(*exact_parts)
+        df = pd.DataFrame({
+            "timestamp": exact.keys / 100.0,
+            "power_draw_W": exact.sums,
+            "energy_Wh": exact.sums * dt / 3600.0,
+        })
+        merged_path = os.path.join(save_dir, f"merged_{folder}_power_energy.csv")
+        df.to_csv(merged_path, index=False)
+        stats.write_time = time.perf_counter() - t_write
+
+    stats.elapsed = time.perf_counter() - t0
+    return FolderResult(folder, bins, stats, merged_path)
+
+
+def bins_to_frame(bins: BinAggregate) -> pd.DataFrame:
+    # bin 시작 시각(UTC 문자열) + 샘플 평균 전력
+    start = pd.to_datetime(bins.keys, unit="s", utc=True).strftime("%Y-%m-%d %H:%M:%S")
+    avg = np.divide(bins.sums, bins.counts, out=np.zeros(len(bins)), where=bins.counts > 0)
+    return pd.DataFrame({"period_start_UTC": start, "avg_power_draw_W": avg})
+
+
+def _folder_paths(base_dir: str, folders: Sequence[str]) -> List[str]:
+    paths = [os.path.join(base_dir, f) for f in folders if os.path.isdir(os.path.join(base_dir, f))]
+    missing = len(folders) - len(paths)
+    if missing:
+        print(f">> [Ingest] {missing} folders not found, skipped")
+    return paths
+
+
+def _map_folders(fn, paths: Sequence[str], workers: Optional[int], *args) -> Iterator:
+    # 폴더 하나 = 작업 하나. workers=1 이면 현재 프로세스에서, 아니면 spawn 풀에서 끝나는 순서대로
+    workers = max(1, min(workers or os.cpu_count() or 1, len(paths) or 1))
+    print(f">> [Ingest] {len(paths)} folders on {workers} workers")
+    if workers == 1:
+        for p in paths:
+            yield fn(p, *args)
+        return
+    ctx = mp.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        futures = [pool.submit(fn, p, *args) for p in paths]
+        for fut in as_completed(futures):
+            yield fut.result()
+
+
+def aggregate_supercloud(base_dir: str, folders: Sequence[str], start_ts: float, end_ts: float,
+                         bin_size: int = 900, dt: float = 0.1, save_dir: Optional[str] = None,
+                         workers: Optional[int] = None,
+                         chunksize: int = 1_000_000) -> Tuple[BinAggregate, IngestStats]:
+    """
+    base_dir/<folder> 들을 프로세스 풀에서 병렬 집계하고 bin 부분 집계를 병합.
+    save_dir 이 있으면 폴더별 merged_<folder>_power_energy.csv 도 worker 가 직접 쓴다.
+    """
+    t_start = time.perf_counter()
+    paths = _folder_paths(base_dir, folders)
+    if save_dir:
+        os.makedirs(save_dir, exist_ok=True)
+
+    total = IngestStats()
+    parts: List[BinAggregate] = []
+    for res in _map_folders(aggregate_folder, paths, workers, start_ts, end_ts, bin_size, dt, save_dir, chunksize):
+        parts.append(res.bins)
+        total.add(res.stats)
+        print(f"   [{res.folder}] {res.stats.summary()}")
+
+    bins = BinAggregate().merge(*parts) if parts else BinAggregate()
+    total.elapsed = time.perf_counter() - t_start
+    print(f">> [Ingest] done: {total.summary()}")
+    return bins, total
+
+
+def utc_ts(*args) -> float:
+    # datetime(…, tzinfo=UTC).timestamp() 축약
+    return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+
+def aggregate_folder_multi_resolution(folder_path: str, start_ts: float, end_ts: float,
+                                      resolutions: Sequence[float] = DEFAULT_RESOLUTIONS,
+                                      memmap_dir: Optional[str] = None,
+                                      chunksize: int = 1_000_000) -> Tuple[str, MultiResolutionAggregate, IngestStats]:
+    # 폴더 하나를 base 해상도 dense 배열로 누적 (memmap_dir 이 있으면 폴더별 하위 디렉토리에 memmap)
+    folder = os.path.basename(os.path.normpath(folder_path))
+    stats = IngestStats()
+    t0 = time.perf_counter()
+    agg = MultiResolutionAggregate(start_ts, end_ts, resolutions,
+                                   memmap_dir=os.path.join(memmap_dir, f"partial_{folder}") if memmap_dir else None)
+    for fp in list_gpu_csvs(folder_path):
+        # 파일 단위로 모았다가 끝까지 읽힌 파일만 반영 (dense 배열은 되돌리기 어려우므로 chunk 를 먼저 다 읽는다)
+        try:
+            chunks = list(read_power_chunks(fp, chunksize))
+        except (ValueError, pd.errors.ParserError, UnicodeDecodeError, OSError):
+            stats.skipped_files += 1
+            continue
+        for ts, pw in chunks:
+            stats.rows += len(ts)
+            stats.kept_rows += agg.add(ts, pw)
+        stats.files += 1
+        stats.bytes += os.path.getsize(fp)
+    stats.elapsed = time.perf_counter() - t0
+    return folder, agg, stats
+
+
+def aggregate_supercloud_multi_resolution(base_dir: str, folders: Sequence[str], start_ts: float, end_ts: float,
+                                          resolutions: Sequence[float] = DEFAULT_RESOLUTIONS,
+                                          workers: Optional[int] = None, memmap_dir: Optional[str] = None,
+                                          chunksize: int = 1_000_000) -> Tuple[MultiResolutionAggregate, IngestStats]:
+    """
+    원시 GPU trace 를 한 번만 읽어 모든 해상도(기본 0.1 s, 1 s, 10 s, 1 min, 15 min, 1 h)를 만들 수 있는
+    base 해상도 집계를 반환. 해상도별 표는 .frames() 로 꺼낸다 (utils/load_aggregate.py).
+    """
+    t_start = time.perf_counter()
+    paths = _folder_paths(base_dir, folders)
+    total = IngestStats()
+    agg = MultiResolutionAggregate(start_ts, end_ts, resolutions,
+                                   memmap_dir=os.path.join(memmap_dir, "total") if memmap_dir else None)
+    for folder, part, stats in _map_folders(aggregate_folder_multi_resolution, paths, workers,
+                                            start_ts, end_ts, resolutions, memmap_dir, chunksize):
+        agg.merge(part)
+        part.close(remove=True)
+        total.add(stats)
+        print(f"   [{folder}] {stats.summary()}")
+    total.elapsed = time.perf_counter() - t_start
+    print(f">> [Ingest] done: {total.summary()}")
+    return agg, total
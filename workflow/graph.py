@@ -10,14 +10,14 @@ from agents.formulation_agent import FormulationAgent
 from agents.solver_agent import SolverAgent
 from agents.explanation_agent import ExplanationAgent
 
-def build_graph():
+def build_graph(gt_cost_mode: str = "quadratic"):
     # 1. 그래프 초기화
     # [확인] StateGraph 안에 AgentState를 넣어야 합니다.
     workflow = StateGraph(AgentState)
 
     # 2. 에이전트 생성
     parser = ParsingAgent()
-    formulator = FormulationAgent()
+    formulator = FormulationAgent(gt_cost_mode=gt_cost_mode)
     solver = SolverAgent()
     explainer = ExplanationAgent()
 